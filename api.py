@@ -0,0 +1,193 @@
+"""
+Headless HTTP API for FinChat: the app's features as async JSON endpoints for programmatic
+clients, without a Streamlit session.
+
+    uvicorn api:app --workers 4
+
+The feature functions are synchronous (Gemini and FAISS calls), so each request runs them
+on the thread pool; many requests proceed concurrently in one process, up to
+MAX_CONCURRENT_CALLS. Their caches (modules/cache.py) are shared by all requests, and by
+all workers with FINCHAT_CACHE_BACKEND=shared; the news store, fetcher and stock universe
+are built once per worker at startup.
+"""
+import asyncio
+import contextlib
+import copy
+import json
+import math
+import os
+from starlette.applications import Starlette
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from modules.chat import (
+    analyze_ipo_document,
+    analyze_news_sentiment,
+    generate_retirement_plan,
+    get_comprehensive_response,
+    stream_comprehensive_response,
+)
+from modules.data_fetcher import EnhancedFinancialDataFetcher
+from modules.doc_qa import user_input
+from modules.news_ingester import NewsIngester
+from modules.news_store import NewsStore
+from modules.retirement import project_retirement, simulate_retirement
+from modules.stock_universe import StockUniverse
+
+# --- Configuration ---
+MAX_CONCURRENT_CALLS = int(os.environ.get("FINCHAT_API_MAX_CONCURRENCY", "32"))  # Feature calls in flight per process
+# Every worker may start one; only the worker holding the news store's lease polls
+RUN_NEWS_INGESTER = os.environ.get("FINCHAT_API_INGEST_NEWS", "1") == "1"
+RETIREMENT_FIELDS = ("current_age", "retirement_age", "monthly_salary_inr", "monthly_expenses_inr",
+                     "current_savings_inr", "expected_salary_growth_percent", "expected_inflation_percent")
+
+_call_slots = None
+
+async def call(func, *args, **kwargs):
+    """Runs a blocking feature function on the thread pool, bounded by MAX_CONCURRENT_CALLS."""
+    async with _call_slots:
+        return await run_in_threadpool(func, *args, **kwargs)
+
+async def stream(iterator):
+    """Streams a blocking iterator's items from the thread pool, holding one call slot until it is exhausted."""
+    async with _call_slots:
+        async for item in iterate_in_threadpool(iterator):
+            yield item
+
+async def _json_body(request: Request, *required: str) -> dict:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(400, "Request body must be JSON.")
+    if not isinstance(body, dict):
+        raise HTTPException(400, "Request body must be a JSON object.")
+    missing = [field for field in required if body.get(field) in (None, "")]
+    if missing:
+        raise HTTPException(400, f"Missing field(s): {', '.join(missing)}.")
+    return body
+
+def _stock(request: Request, symbol: str) -> dict:
+    stock_info = request.app.state.fetcher.get_stock_info(symbol)
+    if stock_info is None:
+        raise HTTPException(404, f"Unknown stock symbol '{symbol}'.")
+    return stock_info
+
+# --- Endpoints ---
+
+async def health(request: Request):
+    return JSONResponse({"status": "ok", "stocks": len(request.app.state.stocks)})
+
+async def list_stocks(request: Request):
+    """Stock list, optionally filtered by ?country= and ?sector=."""
+    country, sector = request.query_params.get("country"), request.query_params.get("sector")
+    stocks = [
+        {key: stock.get(key) for key in ("symbol", "name", "country", "sector", "industry", "market_cap_usd_b", "pe_ratio")}
+        for stock in request.app.state.stocks
+        if (not country or stock.get("country") == country) and (not sector or stock.get("sector") == sector)
+    ]
+    return JSONResponse({"stocks": stocks})
+
+async def stock_overview(request: Request):
+    """Aggregates for a (country, sector) slice, precomputed by StockUniverse."""
+    universe = request.app.state.stock_universe
+    aggregates = universe.aggregate(request.query_params.get("country", "All"), request.query_params.get("sector", "All"))
+    if aggregates is None:
+        raise HTTPException(404, "No stocks match the given country and sector.")
+    nan_to_none = lambda value: None if isinstance(value, float) and math.isnan(value) else value
+    return JSONResponse({
+        "count": aggregates["count"],
+        "mean_market_cap": nan_to_none(aggregates["mean_market_cap"]),
+        "mean_pe": nan_to_none(aggregates["mean_pe"]),
+        "top_by_market_cap": aggregates["top_by_market_cap"].to_dict(orient="records"),
+        "sector_counts": aggregates["sector_counts"].to_dict(),
+        "company_names": aggregates["company_names"],
+    })
+
+async def chat(request: Request):
+    """
+    FinChat answer to {"question", "file_context"?}. With ?stream=true the answer is streamed
+    as plain text chunks while Gemini generates it; otherwise it is returned (and cached) whole.
+    """
+    body = await _json_body(request, "question")
+    fetcher, file_context = request.app.state.fetcher, body.get("file_context", "")
+    if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+        chunks = stream(stream_comprehensive_response(body["question"], fetcher, file_context))
+        return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+    answer = await call(get_comprehensive_response, body["question"], fetcher, file_context)
+    return JSONResponse({"answer": answer})
+
+async def news_sentiment(request: Request):
+    """Sentiment for {"symbol"} (the stock's hybrid news) or for a given {"news": [{"headline", ...}]}."""
+    body = await _json_body(request)
+    if body.get("symbol"):
+        news = await call(request.app.state.fetcher.get_hybrid_news, _stock(request, body["symbol"]))
+    elif isinstance(body.get("news"), list):
+        news = copy.deepcopy(body["news"])   # analyze_news_sentiment annotates its input
+    else:
+        raise HTTPException(400, "Provide a stock 'symbol' or a 'news' list.")
+    return JSONResponse({"news": await call(analyze_news_sentiment, news)})
+
+async def ipo_analysis(request: Request):
+    body = await _json_body(request, "document_text")
+    report = await call(analyze_ipo_document, body["document_text"], body.get("language", "en"))
+    return JSONResponse({"report": report})
+
+async def retirement_plan(request: Request):
+    """Projection, Monte Carlo summary and narrated plan for {"user_data", "language"?}."""
+    body = await _json_body(request, "user_data")
+    user_data = body["user_data"]
+    missing = [field for field in RETIREMENT_FIELDS if field not in user_data]
+    if missing:
+        raise HTTPException(400, f"user_data is missing: {', '.join(missing)}.")
+    try:
+        projection, simulation = await asyncio.gather(call(project_retirement, user_data), call(simulate_retirement, user_data))
+    except (ValueError, TypeError) as e:   # Ages out of order, non-numeric fields
+        raise HTTPException(400, f"Invalid user_data: {e}")
+    plan = await call(generate_retirement_plan, user_data, body.get("language", "en"), projection, simulation)
+    return JSONResponse({"projection": projection["summary"], "simulation": simulation["summary"], "plan": plan})
+
+async def document_query(request: Request):
+    """Answer to {"question"} from the processed document's FAISS index (built in the app's Document Q&A)."""
+    body = await _json_body(request, "question")
+    options = {key: body[key] for key in ("k", "fetch_k", "alpha", "mmr_lambda", "max_context_tokens", "use_mmr") if key in body}
+    return JSONResponse({"answer": await call(user_input, body["question"], **options)})
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    global _call_slots
+    _call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    app.state.news_store = NewsStore()
+    app.state.fetcher = EnhancedFinancialDataFetcher(news_store=app.state.news_store)
+    app.state.stocks = app.state.fetcher.get_all_stocks()
+    app.state.stock_universe = StockUniverse(app.state.stocks)
+    ingester = NewsIngester(app.state.news_store, app.state.stocks) if RUN_NEWS_INGESTER else None
+    if ingester:
+        ingester.start()
+    print(f"[SUCCESS] FinChat API ready ({len(app.state.stocks)} stocks, {MAX_CONCURRENT_CALLS} concurrent calls).")
+    yield
+    if ingester:
+        ingester.stop(timeout=5)
+
+async def http_error(request: Request, exc: HTTPException):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/stocks", list_stocks),
+        Route("/stocks/overview", stock_overview),
+        Route("/chat", chat, methods=["POST"]),
+        Route("/news/sentiment", news_sentiment, methods=["POST"]),
+        Route("/ipo/analyze", ipo_analysis, methods=["POST"]),
+        Route("/retirement/plan", retirement_plan, methods=["POST"]),
+        Route("/documents/query", document_query, methods=["POST"]),
+    ],
+    exception_handlers={HTTPException: http_error},
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run("api:app", host=os.environ.get("FINCHAT_API_HOST", "127.0.0.1"), port=int(os.environ.get("FINCHAT_API_PORT", "8000")))
@@ -1,12 +1,18 @@
+import re
+import json
+import hashlib
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.io as pio
 import plotly.graph_objects as go
 
 # Import all necessary functions from your modules
-from modules.data_fetcher import EnhancedFinancialDataFetcher
+from modules.app_context import RerunTimer, configure_streamlit, get_app_context
+from modules.lazy_imports import lazy_import
 from modules import visualizations
+from modules.figure_cache import figure_cache
+from modules.precomputed import CHART_PERIOD
+from modules.downsampling import PERIOD_LABELS, PERIOD_OPTIONS
+from modules.indicators import INDICATOR_OPTIONS
 from modules.chat import (
     get_comprehensive_response, 
     translate_text, 
@@ -16,31 +22,34 @@ from modules.chat import (
     generate_retirement_plan,
     process_uploaded_file
 )
+from modules.retirement import (
+    LIFE_EXPECTANCY,
+    RISK_PROFILES,
+    earliest_retirement_age,
+    project_retirement,
+    projection_table,
+    required_monthly_investment,
+    sensitivity_grid,
+    simulate_retirement,
+)
 from modules.doc_qa import (
     get_document_text, 
-    get_text_chunks, 
+    get_document_pages,
+    get_document_chunks, 
     get_vector_store, 
     summarize_document_with_full_context, 
-    user_input
-)
-
-# --- PAGE CONFIGURATION & DATA LOADING ---
-st.set_page_config(
-    page_title="FinChat - AI Financial Assistant", 
-    layout="wide", 
-    initial_sidebar_state="collapsed",
-    page_icon="🚀"
+    user_input,
+    get_corpus,
+    add_document_to_corpus,
+    corpus_user_input
 )
 
-fetcher = EnhancedFinancialDataFetcher()
-all_stocks_list = fetcher.get_all_stocks()
-if not all_stocks_list:
-    st.error("Failed to load stock database. The application cannot start.")
-    st.stop()
-all_stocks_df = pd.DataFrame(all_stocks_list)
+rerun_timer = RerunTimer()
+configure_streamlit()
+px = lazy_import("plotly.express")
 
 # --- ENHANCED CUSTOM THEMES & STYLING ---
-st.markdown("""
+APP_CSS = """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -373,36 +382,27 @@ st.markdown("""
         border-radius: 10px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Enhanced Plotly Theme
-pio.templates["finchat_premium"] = go.layout.Template(
-    layout=go.Layout(
-        font={"color": "#ffffff", "family": "Inter, sans-serif"},
-        title={"font": {"color": "#ffffff", "size": 18, "family": "Inter, sans-serif"}},
-        paper_bgcolor="rgba(26, 26, 46, 0.8)",
-        plot_bgcolor="rgba(26, 26, 46, 0.8)",
-        xaxis={
-            "gridcolor": "rgba(255, 255, 255, 0.1)", 
-            "linecolor": "rgba(255, 255, 255, 0.2)",
-            "tickcolor": "rgba(255, 255, 255, 0.3)",
-            "zerolinecolor": "rgba(255, 255, 255, 0.2)"
-        },
-        yaxis={
-            "gridcolor": "rgba(255, 255, 255, 0.1)", 
-            "linecolor": "rgba(255, 255, 255, 0.2)",
-            "tickcolor": "rgba(255, 255, 255, 0.3)",
-            "zerolinecolor": "rgba(255, 255, 255, 0.2)"
-        },
-        legend={
-            "bgcolor": "rgba(26, 26, 46, 0.8)", 
-            "bordercolor": "rgba(255, 255, 255, 0.2)",
-            "font": {"color": "#ffffff"}
-        },
-        colorway=['#00ff7f', '#28a745', '#17a2b8', '#ffc107', '#dc3545', '#6f42c1', '#fd7e14', '#20c997']
-    )
+# --- PAGE CONFIGURATION & DATA LOADING ---
+# Everything that does not change between reruns (fetcher, stock universe, Plotly template,
+# minified CSS) is built once per process; a rerun only looks it up.
+st.set_page_config(
+    page_title="FinChat - AI Financial Assistant", 
+    layout="wide", 
+    initial_sidebar_state="collapsed",
+    page_icon="🚀"
 )
-pio.templates.default = "finchat_premium"
+
+try:
+    app_context = get_app_context(APP_CSS)
+except RuntimeError:
+    st.error("Failed to load stock database. The application cannot start.")
+    st.stop()
+fetcher = app_context.fetcher
+stock_universe = app_context.stock_universe
+precomputed = app_context.precomputed
+st.markdown(app_context.css, unsafe_allow_html=True)
 
 # --- PAGE RENDERING FUNCTIONS ---
 
@@ -579,35 +579,27 @@ def render_stock_analyzer_page():
     with st.expander("🔍 Show Analysis Filters", expanded=True):
         col1, col2, col3 = st.columns(3)
         with col1:
-            selected_country = st.selectbox("🌍 Market Region", ["All", "India", "USA"])
+            selected_country = st.selectbox("🌍 Market Region", stock_universe.countries)
         with col2:
-            unique_sectors = sorted(all_stocks_df['sector'].unique())
-            selected_sector = st.selectbox("🏢 Industry Sector", ["All"] + unique_sectors)
+            selected_sector = st.selectbox("🏢 Industry Sector", stock_universe.sectors)
         
-        # Filter company list based on the selections above
-        temp_df = all_stocks_df.copy()
-        if selected_country != "All": temp_df = temp_df[temp_df['country'] == selected_country]
-        if selected_sector != "All": temp_df = temp_df[temp_df['sector'] == selected_sector]
-        available_company_names = sorted(temp_df['name'].unique())
+        # Every filter combination is precomputed, so this is a lookup rather than a filter pass
+        aggregates = stock_universe.aggregate(selected_country, selected_sector)
+        available_company_names = aggregates["company_names"] if aggregates else []
         
         with col3:
             selected_company = st.selectbox("🔍 Select Stock for Deep Dive", ["None"] + available_company_names)
 
-    # --- FILTERING LOGIC (for the main charts) ---
-    filtered_df = all_stocks_df.copy()
-    if selected_country != "All": filtered_df = filtered_df[filtered_df['country'] == selected_country]
-    if selected_sector != "All": filtered_df = filtered_df[filtered_df['sector'] == selected_sector]
-
-    if filtered_df.empty:
+    if aggregates is None:
         st.warning("⚠️ No stocks match the selected filters.")
         st.stop()
 
     # --- RENDER DASHBOARD ---
     st.subheader("📈 Market Overview")
     kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
-    kpi_col1.metric("Companies Shown", f"{filtered_df.shape[0]}")
-    kpi_col2.metric("Average Market Cap (USD B)", f"{filtered_df['market_cap_usd_b'].mean():.2f}")
-    kpi_col3.metric("Average P/E Ratio", f"{filtered_df['pe_ratio'].mean():.2f}")
+    kpi_col1.metric("Companies Shown", f"{aggregates['count']}")
+    kpi_col2.metric("Average Market Cap (USD B)", f"{aggregates['mean_market_cap']:.2f}")
+    kpi_col3.metric("Average P/E Ratio", f"{aggregates['mean_pe']:.2f}")
 
     st.divider()
     
@@ -617,22 +609,28 @@ def render_stock_analyzer_page():
         
         # --- CHANGE IS HERE ---
         # The 'labels' argument is updated to your exact specifications.
-        fig1 = px.bar(
-            filtered_df.nlargest(15, 'market_cap_usd_b'), 
-            x='name', 
-            y='market_cap_usd_b', 
-            color='sector',
-            labels={
-                "name": "Company Name",
-                "market_cap_usd_b": "Market Cap (USD B)" # Kept B for billions for clarity
-            }
+        fig1 = figure_cache.get_or_build(
+            "top_market_cap", (selected_country, selected_sector), stock_universe.data_version,
+            lambda: px.bar(
+                aggregates["top_by_market_cap"], 
+                x='name', 
+                y='market_cap_usd_b', 
+                color='sector',
+                labels={
+                    "name": "Company Name",
+                    "market_cap_usd_b": "Market Cap (USD B)" # Kept B for billions for clarity
+                }
+            )
         )
         st.plotly_chart(fig1, use_container_width=True)
     
     with chart_col2:
         st.subheader("🥧 Sector Distribution")
-        sector_counts = filtered_df['sector'].value_counts()
-        fig2 = px.pie(values=sector_counts.values, names=sector_counts.index, title="Companies by Sector")
+        sector_counts = aggregates["sector_counts"]
+        fig2 = figure_cache.get_or_build(
+            "sector_pie", (selected_country, selected_sector), stock_universe.data_version,
+            lambda: px.pie(values=sector_counts.values, names=sector_counts.index, title="Companies by Sector")
+        )
         st.plotly_chart(fig2, use_container_width=True)
     
     # --- INDIVIDUAL STOCK ANALYSIS ---
@@ -640,30 +638,52 @@ def render_stock_analyzer_page():
         st.divider()
         st.header(f"🔍 Deep Dive: {selected_company}")
         
-        stock_data = all_stocks_df[all_stocks_df['name'] == selected_company]
+        stock_info = stock_universe.get_stock(selected_company)
         
-        if not stock_data.empty:
-            stock_info = stock_data.iloc[0].to_dict()
+        if stock_info:
             ticker = stock_info.get('symbol', '')
             
             with st.spinner("🧠 Generating AI analysis..."):
                 st.subheader("🤖 AI-Powered Analysis")
-                summary = generate_stock_summary(stock_info)
+                summary = precomputed.get_or_compute("summary", ticker, lambda: generate_stock_summary(stock_info))
                 st.success(summary)
             
             charts_col1, charts_col2 = st.columns([2, 1])
             with charts_col1:
                 st.subheader("📈 Price Chart")
+                price_period = st.select_slider(
+                    "Range",
+                    options=PERIOD_OPTIONS,
+                    value="3mo",
+                    format_func=lambda period: PERIOD_LABELS[period],
+                    key=f"price_period_{ticker}"
+                )
+                selected_indicators = st.multiselect(
+                    "Indicators",
+                    INDICATOR_OPTIONS,
+                    key=f"price_indicators_{ticker}",
+                    help="Overlays are drawn on the price chart; RSI, MACD and ATR get their own panels"
+                )
                 with st.spinner("Loading price data..."):
-                    fig = visualizations.create_candlestick_chart(ticker, selected_company)
+                    precomputed_chart = None
+                    if price_period == CHART_PERIOD and not selected_indicators:
+                        precomputed_chart = precomputed.latest(f"chart:{CHART_PERIOD}", ticker)
+                    if precomputed_chart:
+                        fig = go.Figure(json.loads(precomputed_chart["value"]), _validate=False)
+                    else:
+                        fig = visualizations.create_candlestick_chart(
+                            ticker, selected_company, price_period, indicators=tuple(selected_indicators)
+                        )
                     if fig: st.plotly_chart(fig, use_container_width=True)
             
             with charts_col2:
                 st.subheader("📰 News Sentiment")
                 with st.spinner("Analyzing market sentiment..."):
-                    news = analyze_news_sentiment(fetcher.get_hybrid_news(stock_info))
+                    news = precomputed.get_or_compute(
+                        "sentiment", ticker, lambda: analyze_news_sentiment(fetcher.get_hybrid_news(stock_info))
+                    )
                     if news:
-                        fig_sentiment = visualizations.create_sentiment_pie_chart(news)
+                        fig_sentiment = visualizations.create_sentiment_pie_chart(news, cache_key=ticker)
                         if fig_sentiment: st.plotly_chart(fig_sentiment, use_container_width=True)
             
             st.subheader("📰 Latest News & Analysis")
@@ -680,6 +700,17 @@ def render_doc_chat_page():
     st.title("📄 Intelligent Document Chat")
     st.markdown("Upload financial documents and get instant AI-powered insights")
     
+    chat_mode = st.radio(
+        "Chat Mode",
+        ["Single Document", "Multi-Document Corpus"],
+        horizontal=True,
+        help="Corpus mode lets you ask questions across several reports at once, e.g. five annual reports"
+    )
+    if chat_mode == "Multi-Document Corpus":
+        render_doc_corpus_section()
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    
     # Enhanced file uploader
     st.markdown("### 📁 Upload Your Document")
     uploaded_file = st.file_uploader(
@@ -700,14 +731,15 @@ def render_doc_chat_page():
                     
                     # Simulate progress
                     progress_bar.progress(25)
-                    raw_text = get_document_text(uploaded_file)
+                    pages = get_document_pages(uploaded_file)
                     
-                    if raw_text:
+                    if any(text.strip() for _, text in pages):
                         progress_bar.progress(50)
-                        text_chunks = get_text_chunks(raw_text)
+                        chunks = get_document_chunks(pages)
+                        text_chunks = [chunk["text"] for chunk in chunks]
                         
                         progress_bar.progress(75)
-                        get_vector_store(text_chunks)
+                        get_vector_store(text_chunks, metadatas=[chunk["metadata"] for chunk in chunks])
                         
                         progress_bar.progress(90)
                         st.session_state.doc_summary = summarize_document_with_full_context(text_chunks)
@@ -735,6 +767,26 @@ def render_doc_chat_page():
         # Chat Interface
         st.subheader("💬 Ask Questions About Your Document")
         
+        # Retrieval settings (applied per question)
+        with st.expander("⚙️ Retrieval Settings"):
+            set_col1, set_col2, set_col3 = st.columns(3)
+            with set_col1:
+                retrieval_k = st.slider("Chunks in context", min_value=1, max_value=15, value=5)
+                retrieval_alpha = st.slider(
+                    "Semantic vs keyword weight", min_value=0.0, max_value=1.0, value=0.5, step=0.05,
+                    help="1.0 = pure vector search, 0.0 = pure keyword (BM25) search"
+                )
+            with set_col2:
+                use_mmr = st.checkbox("Diversify results (MMR)", value=True)
+                mmr_lambda = st.slider(
+                    "Relevance vs diversity", min_value=0.0, max_value=1.0, value=0.7, step=0.05,
+                    disabled=not use_mmr
+                )
+            with set_col3:
+                max_context_tokens = st.number_input(
+                    "Context token budget", min_value=500, max_value=30000, value=6000, step=500
+                )
+
         # Initialize chat history if not exists
         if "doc_chat_history" not in st.session_state:
             st.session_state.doc_chat_history = []
@@ -754,7 +806,14 @@ def render_doc_chat_page():
             
             with st.chat_message("assistant"):
                 with st.spinner("🔍 Searching through document..."):
-                    response = user_input(user_question)
+                    response = user_input(
+                        user_question,
+                        k=retrieval_k,
+                        alpha=retrieval_alpha,
+                        mmr_lambda=mmr_lambda,
+                        max_context_tokens=max_context_tokens,
+                        use_mmr=use_mmr
+                    )
                     st.markdown(response)
                     
                     # Add assistant response to chat history
@@ -792,6 +851,85 @@ def render_doc_chat_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def render_doc_corpus_section():
+    """Corpus mode of Doc Chat: index several documents and query them together with filters."""
+    st.markdown("### 📚 Build Your Document Corpus")
+    uploaded_files = st.file_uploader(
+        "Add financial PDF or DOCX files (e.g. the last five annual reports)",
+        type=['pdf', 'docx'],
+        accept_multiple_files=True,
+        help="New documents are appended to the corpus; existing ones are not re-processed"
+    )
+    
+    corpus = get_corpus()
+    if uploaded_files:
+        pending = []
+        for uploaded in uploaded_files:
+            doc_id = hashlib.sha1(uploaded.getvalue()).hexdigest()[:12]
+            if doc_id in corpus.documents:
+                continue
+            year_match = re.search(r"(19|20)\d{2}", uploaded.name)
+            year = st.number_input(
+                f"Fiscal year for {uploaded.name}",
+                min_value=1990, max_value=2100,
+                value=int(year_match.group(0)) if year_match else 2024,
+                key=f"corpus_year_{doc_id}"
+            )
+            pending.append((doc_id, uploaded, int(year)))
+        
+        if pending and st.button(f"➕ Add {len(pending)} Document(s) to Corpus", use_container_width=True):
+            progress_bar = st.progress(0)
+            for i, (doc_id, uploaded, year) in enumerate(pending, 1):
+                with st.spinner(f"🧠 Indexing {uploaded.name}..."):
+                    pages = get_document_pages(uploaded)
+                    if any(text.strip() for _, text in pages):
+                        add_document_to_corpus(doc_id, uploaded.name, year, pages)
+                    else:
+                        st.error(f"❌ Failed to extract text from {uploaded.name}.")
+                progress_bar.progress(i / len(pending))
+            st.success("✅ Corpus updated!")
+    
+    if not corpus.documents:
+        st.info("📭 The corpus is empty. Upload one or more documents to get started.")
+        return
+    
+    st.divider()
+    st.subheader("🗂️ Documents in Corpus")
+    corpus_df = pd.DataFrame([
+        {"Document": info["name"], "Year": info["year"], "Chunks": info["n_chunks"], "Shard": info["shard"]}
+        for info in corpus.documents.values()
+    ])
+    st.dataframe(corpus_df, use_container_width=True, hide_index=True)
+    
+    filter_col1, filter_col2 = st.columns(2)
+    with filter_col1:
+        doc_names = {doc_id: info["name"] for doc_id, info in corpus.documents.items()}
+        selected_docs = st.multiselect(
+            "Restrict to documents", list(doc_names.keys()), format_func=doc_names.get,
+            help="Leave empty to search every document"
+        )
+    with filter_col2:
+        available_years = sorted({info["year"] for info in corpus.documents.values() if info["year"]})
+        selected_years = st.multiselect("Restrict to years", available_years, help="Leave empty to search every year")
+    
+    st.subheader("💬 Ask Questions Across Your Documents")
+    if "corpus_chat_history" not in st.session_state:
+        st.session_state.corpus_chat_history = []
+    
+    for message in st.session_state.corpus_chat_history:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    if corpus_question := st.chat_input("💭 Ask across the selected documents..."):
+        st.session_state.corpus_chat_history.append({"role": "user", "content": corpus_question})
+        with st.chat_message("user"):
+            st.markdown(corpus_question)
+        with st.chat_message("assistant"):
+            with st.spinner("🔍 Searching across the corpus..."):
+                response = corpus_user_input(corpus_question, doc_ids=selected_docs or None, years=selected_years or None)
+                st.markdown(response)
+                st.session_state.corpus_chat_history.append({"role": "assistant", "content": response})
+
 def render_ipo_analyzer_page():
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
     st.title("📈 Advanced IPO Analyzer")
@@ -897,6 +1035,120 @@ def render_ipo_analyzer_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def render_retirement_results(plan: dict):
+    """Renders a generated retirement plan: computed figures, charts and the narrated roadmap."""
+    user_data, projection, simulation, response = plan["user_data"], plan["projection"], plan["simulation"], plan["response"]
+    st.divider()
+    st.subheader("📋 Your Personalized Retirement Roadmap")
+
+    # Deterministic projection figures
+    summary = projection["summary"]
+    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+    metric_col1.metric("Corpus at Retirement", f"₹{summary['corpus_at_retirement'] / 1e7:,.2f} Cr")
+    metric_col2.metric("Required Corpus", f"₹{summary['required_corpus'] / 1e7:,.2f} Cr")
+    metric_col3.metric(
+        "Surplus / Shortfall",
+        f"₹{summary['surplus_or_shortfall'] / 1e7:,.2f} Cr",
+        delta="On track" if summary["on_track"] else "Shortfall",
+        delta_color="normal" if summary["on_track"] else "inverse"
+    )
+    metric_col4.metric("Money Lasts Until Age", f"{summary['money_lasts_until_age']}")
+    st.plotly_chart(visualizations.create_retirement_projection_chart(projection), use_container_width=True)
+    with st.expander("📅 Year-by-Year Projection"):
+        st.dataframe(projection_table(projection).round(0), use_container_width=True)
+
+    # Monte Carlo outcome range for the chosen risk profile
+    sim_summary = simulation["summary"]
+    sim_col1, sim_col2 = st.columns([1, 3])
+    with sim_col1:
+        st.metric(f"Success Probability ({user_data['risk_appetite']})", f"{sim_summary['success_probability']:.1%}",
+                  help=f"Share of {sim_summary['paths']:,} simulated scenarios in which the corpus lasts until age {summary['life_expectancy']}")
+        st.metric("Corpus at Retirement (p10)", f"₹{sim_summary['corpus_at_retirement_p10'] / 1e7:,.2f} Cr")
+        st.metric("Corpus at Retirement (p50)", f"₹{sim_summary['corpus_at_retirement_p50'] / 1e7:,.2f} Cr")
+        st.metric("Corpus at Retirement (p90)", f"₹{sim_summary['corpus_at_retirement_p90'] / 1e7:,.2f} Cr")
+    with sim_col2:
+        st.plotly_chart(visualizations.create_retirement_fan_chart(simulation), use_container_width=True)
+
+    # Display in styled container
+    st.markdown(f"""
+    <div style="background: rgba(26, 26, 46, 0.8); border-radius: 16px; 
+                padding: 30px; border: 1px solid rgba(255, 255, 255, 0.1);
+                box-shadow: 0 8px 25px rgba(0, 255, 127, 0.1);">
+        {response}
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Quick action buttons
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.info("💡 **Next Step:** Review and implement the suggested investment strategy")
+    with col2:
+        st.info("📅 **Reminder:** Review your plan annually and adjust as needed")
+    with col3:
+        st.info("🎯 **Goal:** Stay disciplined and consistent with your savings")
+
+def render_retirement_what_if(plan: dict):
+    """
+    Goal seeking and what-if analysis on top of a generated plan. Everything here is computed
+    locally from the projection model, so changing an input never triggers a new model call.
+    """
+    user_data = plan["user_data"]
+    st.divider()
+    st.subheader("🔍 What-If Explorer")
+    
+    goal = required_monthly_investment(user_data)
+    earliest_age = earliest_retirement_age(user_data)
+    goal_col1, goal_col2, goal_col3 = st.columns(3)
+    goal_col1.metric(
+        "Required Monthly Investment",
+        f"₹{goal['required_monthly_investment']:,.0f}",
+        help="Monthly investment today, stepped up each year with your salary growth, that funds expenses until life expectancy"
+    )
+    goal_col2.metric(
+        "Current Monthly Surplus",
+        f"₹{goal['current_monthly_investment']:,.0f}",
+        delta=f"₹{goal['additional_monthly_investment']:,.0f} more needed" if goal["additional_monthly_investment"] > 0 else "Sufficient",
+        delta_color="inverse" if goal["additional_monthly_investment"] > 0 else "normal"
+    )
+    goal_col3.metric("Earliest Feasible Retirement Age", f"{earliest_age}" if earliest_age else f"Not before {LIFE_EXPECTANCY}")
+    
+    what_if_col1, what_if_col2 = st.columns(2)
+    with what_if_col1:
+        what_if_age = st.slider(
+            "What if I retire at...",
+            min_value=int(user_data["current_age"]) + 1,
+            max_value=LIFE_EXPECTANCY - 1,
+            value=int(user_data["retirement_age"]),
+            key="what_if_retirement_age"
+        )
+    with what_if_col2:
+        what_if_risk = st.selectbox(
+            "...with a risk appetite of",
+            list(RISK_PROFILES),
+            index=list(RISK_PROFILES).index(user_data["risk_appetite"]),
+            key="what_if_risk_appetite"
+        )
+    what_if = project_retirement({**user_data, "retirement_age": what_if_age, "risk_appetite": what_if_risk})["summary"]
+    base = plan["projection"]["summary"]
+    what_if_col1, what_if_col2, what_if_col3 = st.columns(3)
+    what_if_col1.metric(
+        "Corpus at Retirement",
+        f"₹{what_if['corpus_at_retirement'] / 1e7:,.2f} Cr",
+        delta=f"{(what_if['corpus_at_retirement'] - base['corpus_at_retirement']) / 1e7:+,.2f} Cr"
+    )
+    what_if_col2.metric(
+        "Surplus / Shortfall",
+        f"₹{what_if['surplus_or_shortfall'] / 1e7:,.2f} Cr",
+        delta="On track" if what_if["on_track"] else "Shortfall",
+        delta_color="normal" if what_if["on_track"] else "inverse"
+    )
+    what_if_col3.metric("Money Lasts Until Age", f"{what_if['money_lasts_until_age']}")
+    
+    st.plotly_chart(
+        visualizations.create_retirement_sensitivity_heatmap(sensitivity_grid({**user_data, "risk_appetite": what_if_risk})),
+        use_container_width=True
+    )
+
 def render_retirement_planner_page():
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
     st.title("💰 Smart Retirement Planner")
@@ -1047,40 +1299,35 @@ def render_retirement_planner_page():
                 
                 status_text.text("💰 Calculating retirement corpus requirements...")
                 progress_bar.progress(50)
+                projection = project_retirement(user_data)
                 
-                status_text.text("📈 Optimizing investment strategy...")
+                status_text.text("📈 Simulating market scenarios...")
                 progress_bar.progress(75)
+                simulation = simulate_retirement(user_data)
                 
                 status_text.text(f"🌐 Generating report in {selected_lang_name}...")
                 progress_bar.progress(90)
                 
-                response = generate_retirement_plan(user_data, target_lang_code)
+                response = generate_retirement_plan(user_data, target_lang_code, projection, simulation)
                 
                 progress_bar.progress(100)
                 status_text.text("✅ Your retirement plan is ready!")
-                
-                st.divider()
-                st.subheader("📋 Your Personalized Retirement Roadmap")
-                
-                # Display in styled container
-                st.markdown(f"""
-                <div style="background: rgba(26, 26, 46, 0.8); border-radius: 16px; 
-                            padding: 30px; border: 1px solid rgba(255, 255, 255, 0.1);
-                            box-shadow: 0 8px 25px rgba(0, 255, 127, 0.1);">
-                    {response}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Quick action buttons
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.info("💡 **Next Step:** Review and implement the suggested investment strategy")
-                with col2:
-                    st.info("📅 **Reminder:** Review your plan annually and adjust as needed")
-                with col3:
-                    st.info("🎯 **Goal:** Stay disciplined and consistent with your savings")
-    
-    else:
+            
+            # Kept across reruns so the what-if explorer can change inputs without regenerating the plan
+            st.session_state.retirement_plan = {
+                "user_data": user_data,
+                "projection": projection,
+                "simulation": simulation,
+                "response": response,
+            }
+            # Start the what-if explorer from the newly submitted inputs
+            for key in ("what_if_retirement_age", "what_if_risk_appetite"):
+                st.session_state.pop(key, None)
+    
+    if "retirement_plan" in st.session_state:
+        render_retirement_results(st.session_state.retirement_plan)
+        render_retirement_what_if(st.session_state.retirement_plan)
+    elif not submitted:
         # Show retirement planning tips when form is not submitted
         st.markdown("### 💡 Retirement Planning Tips")
         
@@ -1266,6 +1513,7 @@ if "current_page" not in st.session_state:
 
 # Render navigation and get pages
 PAGES = render_navigation()
+rerun_timer.check()
 
 # Add some spacing
 st.markdown("<br>", unsafe_allow_html=True)
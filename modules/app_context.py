@@ -0,0 +1,115 @@
+import re
+import time
+from typing import Dict, List
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from .config import configure
+from .data_fetcher import EnhancedFinancialDataFetcher
+from .news_ingester import NewsIngester
+from .news_store import NewsStore
+from .precomputed import PrecomputedStore
+from .stock_universe import StockUniverse
+
+# --- Configuration ---
+# Time allowed for the work app.py does on every rerun before a page starts rendering
+# (context lookup, CSS, navigation). Reruns over budget are logged.
+RERUN_OVERHEAD_BUDGET_MS = 25.0
+PLOTLY_TEMPLATE_NAME = "finchat_premium"
+
+# Enhanced Plotly Theme
+PLOTLY_TEMPLATE = go.layout.Template(
+    layout=go.Layout(
+        font={"color": "#ffffff", "family": "Inter, sans-serif"},
+        title={"font": {"color": "#ffffff", "size": 18, "family": "Inter, sans-serif"}},
+        paper_bgcolor="rgba(26, 26, 46, 0.8)",
+        plot_bgcolor="rgba(26, 26, 46, 0.8)",
+        xaxis={
+            "gridcolor": "rgba(255, 255, 255, 0.1)",
+            "linecolor": "rgba(255, 255, 255, 0.2)",
+            "tickcolor": "rgba(255, 255, 255, 0.3)",
+            "zerolinecolor": "rgba(255, 255, 255, 0.2)"
+        },
+        yaxis={
+            "gridcolor": "rgba(255, 255, 255, 0.1)",
+            "linecolor": "rgba(255, 255, 255, 0.2)",
+            "tickcolor": "rgba(255, 255, 255, 0.3)",
+            "zerolinecolor": "rgba(255, 255, 255, 0.2)"
+        },
+        legend={
+            "bgcolor": "rgba(26, 26, 46, 0.8)",
+            "bordercolor": "rgba(255, 255, 255, 0.2)",
+            "font": {"color": "#ffffff"}
+        },
+        colorway=['#00ff7f', '#28a745', '#17a2b8', '#ffc107', '#dc3545', '#6f42c1', '#fd7e14', '#20c997']
+    )
+)
+
+def minify_css(css: str) -> str:
+    """Strips comments and redundant whitespace so the per-rerun <style> message stays small."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+class AppContext:
+    """
+    Process-wide state shared by every session and rerun: the data fetcher, the stock
+    list and its precomputed universe, the news store and its background ingester, the
+    batch job's precomputed results, the registered Plotly template and the minified CSS.
+    Built once by get_app_context(); reruns only look it up.
+    """
+    def __init__(self, css: str):
+        start = time.perf_counter()
+        self.news_store = NewsStore()
+        self.fetcher = EnhancedFinancialDataFetcher(news_store=self.news_store)
+        self.stocks: List[Dict] = self.fetcher.get_all_stocks()
+        if not self.stocks:
+            # Raised rather than cached, so the next rerun retries the load
+            raise RuntimeError("Failed to load stock database.")
+        self.stock_universe = StockUniverse(self.stocks)
+        # Every replica starts one, but only the holder of the news store's lease polls
+        self.news_ingester = NewsIngester(self.news_store, self.stocks)
+        self.news_ingester.start()
+        self.precomputed = PrecomputedStore()
+        pio.templates[PLOTLY_TEMPLATE_NAME] = PLOTLY_TEMPLATE
+        pio.templates.default = PLOTLY_TEMPLATE_NAME
+        self.css = minify_css(css)
+        self.build_ms = (time.perf_counter() - start) * 1000
+        print(f"[SUCCESS] App context built in {self.build_ms:.1f} ms ({len(self.stocks)} stocks, "
+              f"CSS {len(css):,} -> {len(self.css):,} bytes).")
+
+def _streamlit_error(message: str, level: str = "error"):
+    if level == "warning":
+        st.warning(message, icon="⚠️")
+    else:
+        st.error(message)
+
+def configure_streamlit():
+    """
+    Streamlit adapter for modules/: settings come from st.secrets (environment as fallback,
+    read on first use) and library errors and warnings render in the page.
+    """
+    configure(secrets=st.secrets, error_handler=_streamlit_error)
+
+@st.cache_resource(show_spinner=False)
+def get_app_context(css: str) -> AppContext:
+    """The process-level AppContext (built on first use, then shared)."""
+    return AppContext(css)
+
+class RerunTimer:
+    """
+    Measures the fixed overhead of a rerun, from the top of app.py to the point where the
+    selected page starts rendering, against RERUN_OVERHEAD_BUDGET_MS.
+    """
+    def __init__(self, budget_ms: float = RERUN_OVERHEAD_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.start = time.perf_counter()
+
+    def check(self) -> float:
+        """Records the overhead so far in session state and logs it if over budget."""
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        st.session_state.rerun_overhead_ms = elapsed_ms
+        if elapsed_ms > self.budget_ms:
+            print(f"[WARN] Rerun overhead {elapsed_ms:.1f} ms exceeds the {self.budget_ms:.0f} ms budget.")
+        return elapsed_ms
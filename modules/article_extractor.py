@@ -0,0 +1,241 @@
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import lxml.html
+
+# --- Configuration ---
+MIN_PARAGRAPH_CHARS = 25        # Shorter text blocks are not scored (bylines, captions, buttons)
+MIN_ARTICLE_CHARS = 250         # Less extracted text than this counts as a failed extraction
+SIBLING_SCORE_RATIO = 0.2       # Siblings scoring this share of the best candidate are merged in
+EXTRACTION_WORKERS = None       # Process pool size (None: one per CPU)
+# Elements that never hold article text
+STRIP_TAGS = ["script", "style", "noscript", "iframe", "form", "button", "svg", "nav", "footer", "aside", "header"]
+NEGATIVE_HINTS = re.compile(r"comment|footer|sidebar|share|social|related|promo|sponsor|advert|\bads?\b|newsletter|"
+                            r"subscribe|cookie|consent|menu|nav|breadcrumb|popup|modal|widget|outbrain|taboola", re.I)
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text|blog", re.I)
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre"}
+
+def _class_weight(element) -> int:
+    hints = f"{element.get('class', '')} {element.get('id', '')}"
+    weight = 0
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    return weight
+
+def _text(element) -> str:
+    return " ".join(element.text_content().split())
+
+def _link_density(element) -> float:
+    text_length = len(_text(element))
+    if not text_length:
+        return 0.0
+    return sum(len(_text(link)) for link in element.iter("a")) / text_length
+
+def _clean(doc):
+    """Drops non-content tags and boilerplate containers (negative class/id hints without positive ones)."""
+    for element in doc.xpath("//" + " | //".join(STRIP_TAGS)):
+        element.drop_tree()
+    for element in list(doc.iter()):
+        if not isinstance(element.tag, str) or element.tag in ("html", "body", "article", "main"):
+            continue
+        hints = f"{element.get('class', '')} {element.get('id', '')}"
+        if NEGATIVE_HINTS.search(hints) and not POSITIVE_HINTS.search(hints) and element.getparent() is not None:
+            element.drop_tree()
+
+def _best_candidate(doc):
+    """
+    Readability scoring: every paragraph-like block gives its parent 1 point plus one per
+    comma plus one per 100 characters (max 3), and half that to its grandparent. Candidates
+    start from a tag and class/id prior and are discounted by their link density.
+    """
+    scores: Dict = {}
+    for block in doc.iter("p", "pre", "td"):
+        text = _text(block)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        points = 1 + text.count(",") + min(len(text) / 100, 3)
+        for ancestor, share in ((block.getparent(), 1.0), (block.getparent().getparent() if block.getparent() is not None else None, 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                prior = {"article": 10, "main": 5, "div": 5, "section": 3, "td": 3}.get(ancestor.tag, 0)
+                scores[ancestor] = prior + _class_weight(ancestor)
+            scores[ancestor] += points * share
+    if not scores:
+        return None, scores
+    for candidate in scores:
+        scores[candidate] *= 1 - _link_density(candidate)
+    return max(scores, key=scores.get), scores
+
+def _to_markdown(elements) -> str:
+    lines = []
+    for element in elements:
+        blocks = [element] if element.tag in BLOCK_TAGS else element.iter(*BLOCK_TAGS)
+        for block in blocks:
+            if any(ancestor.tag in BLOCK_TAGS for ancestor in block.iterancestors()) and block is not element:
+                continue   # Nested block (a <p> inside an <li>): already part of its ancestor's text
+            text = _text(block)
+            if not text:
+                continue
+            if block.tag[0] == "h" and block.tag[1:].isdigit():
+                lines.append(f"{'#' * int(block.tag[1:])} {text}")
+            elif block.tag == "li":
+                lines.append(f"- {text}")
+            elif block.tag == "blockquote":
+                lines.append(f"> {text}")
+            elif block.tag == "pre":
+                lines.append(f"```\n{block.text_content().strip()}\n```")
+            elif _link_density(block) < 0.5:
+                lines.append(text)
+    return "\n\n".join(lines)
+
+def _title(doc) -> Optional[str]:
+    for xpath in ("//meta[@property='og:title']/@content", "//h1", "//title"):
+        found = doc.xpath(xpath)
+        if found:
+            title = found[0] if isinstance(found[0], str) else _text(found[0])
+            if title.strip():
+                return " ".join(title.split())
+    return None
+
+def extract_markdown(page_html: str) -> Optional[str]:
+    """
+    Main article of an HTML page as markdown (title as a heading, then headings, paragraphs,
+    lists and quotes of the best-scoring container and its qualifying siblings), or None
+    if no container holds MIN_ARTICLE_CHARS of text.
+    """
+    if not page_html or not page_html.strip():
+        return None
+    try:
+        doc = lxml.html.document_fromstring(page_html)
+    except Exception:
+        return None
+    title = _title(doc)
+    _clean(doc)
+    best, scores = _best_candidate(doc)
+    if best is None:
+        return None
+
+    threshold = max(10.0, scores[best] * SIBLING_SCORE_RATIO)
+    parent = best.getparent()
+    selected = []
+    for sibling in (parent if parent is not None else [best]):
+        if sibling is best or scores.get(sibling, 0) >= threshold:
+            selected.append(sibling)
+        elif sibling.tag == "p" and len(_text(sibling)) > 80 and _link_density(sibling) < 0.25:
+            selected.append(sibling)
+    body = _to_markdown(selected)
+    if len(body) < MIN_ARTICLE_CHARS:
+        return None
+    if title and not body.startswith("#"):
+        body = f"# {title}\n\n{body}"
+    return body
+
+_pool = None
+
+def extraction_pool() -> ProcessPoolExecutor:
+    """Shared process pool for extract_markdown, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    return _pool
+
+def extract_many(pages: List[str], max_workers: int = EXTRACTION_WORKERS) -> List[Optional[str]]:
+    """extract_markdown over many pages in a process pool (parsing is CPU-bound and holds the GIL)."""
+    if len(pages) <= 1:
+        return [extract_markdown(page) for page in pages]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(extract_markdown, pages, chunksize=max(1, len(pages) // 32)))
+
+def token_overlap(candidate: str, reference: str) -> float:
+    """Bag-of-words F1 between two extractions (1.0 = same words, markdown syntax ignored)."""
+    tokenize = lambda text: Counter(re.findall(r"\w+", (text or "").lower()))
+    a, b = tokenize(candidate), tokenize(reference)
+    common = sum((a & b).values())
+    if not common:
+        return 0.0
+    precision, recall = common / sum(a.values()), common / sum(b.values())
+    return 2 * precision * recall / (precision + recall)
+
+# Benchmark: python -m modules.article_extractor [--fixtures DIR] [--record URL ...]
+# A fixture is NAME.html (the saved page) plus, optionally, NAME.jina.md / NAME.firecrawl.md
+# (the remote extractors' output for it). Without fixtures, synthetic pages are generated.
+if __name__ == '__main__':
+    import argparse
+    import glob
+    import os
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark local extraction against saved remote extractions.")
+    parser.add_argument("--fixtures", help="Directory of NAME.html and NAME.<extractor>.md files.")
+    parser.add_argument("--record", nargs="+", metavar="URL", help="Save page HTML and Jina output for URLs into --fixtures.")
+    args = parser.parse_args()
+
+    if args.record:
+        import hashlib
+        import requests
+        os.makedirs(args.fixtures, exist_ok=True)
+        session = requests.Session()
+        session.headers["User-Agent"] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+        for url in args.record:
+            name = os.path.join(args.fixtures, hashlib.sha1(url.encode()).hexdigest()[:12])
+            with open(f"{name}.html", "w", encoding="utf-8") as f:
+                f.write(session.get(url, timeout=15).text)
+            with open(f"{name}.jina.md", "w", encoding="utf-8") as f:
+                f.write(session.get(f"https://r.jina.ai/{url}", timeout=30).text)
+            print(f"Recorded {url} -> {name}.*")
+        raise SystemExit
+
+    pages, references = [], []   # references: {extractor: markdown} per page
+    if args.fixtures:
+        for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+            name = path[:-len(".html")]
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+            refs = {}
+            for ref_path in glob.glob(f"{glob.escape(name)}.*.md"):
+                with open(ref_path, encoding="utf-8") as f:
+                    refs[ref_path[len(name) + 1:-len(".md")]] = f.read()
+            references.append(refs)
+    else:
+        rng = random.Random(4)
+        words = [f"w{i}" for i in range(3000)]
+        sentence = lambda n: " ".join(rng.choices(words, k=n)).capitalize() + ", " + " ".join(rng.choices(words, k=8)) + "."
+        for i in range(200):
+            paragraphs = [sentence(rng.randint(20, 45)) for _ in range(rng.randint(6, 14))]
+            nav = "".join(f"<li><a href='/s/{j}'>Section {j}</a></li>" for j in range(30))
+            related = "".join(f"<li><a href='/r/{j}'>{sentence(6)}</a></li>" for j in range(10))
+            pages.append(
+                f"<html><head><title>Story {i}</title><script>var x = {i};</script></head><body>"
+                f"<header><ul class='menu'>{nav}</ul></header>"
+                f"<div class='layout'><div class='story-body article'><h1>Story {i}</h1>"
+                + "".join(f"<p>{p}</p>" for p in paragraphs) +
+                f"</div><div class='sidebar related'><ul>{related}</ul></div>"
+                f"<div class='comments'><p>{sentence(30)}</p></div></div>"
+                f"<footer><p>Copyright notice and {sentence(20)}</p></footer></body></html>"
+            )
+            references.append({"ground truth": f"# Story {i}\n\n" + "\n\n".join(paragraphs)})
+    if not pages:
+        raise SystemExit("No fixtures found.")
+
+    start = time.perf_counter()
+    serial = [extract_markdown(page) for page in pages]
+    serial_s = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = extract_many(pages)
+    pooled_s = time.perf_counter() - start
+    assert pooled == serial
+    size_mb = sum(map(len, pages)) / 1e6
+    print(f"{len(pages)} pages ({size_mb:.1f} MB HTML): serial {serial_s * 1000 / len(pages):.1f} ms/page, "
+          f"process pool ({os.cpu_count()} CPUs) {pooled_s:.2f} s total; {sum(r is None for r in serial)} failed")
+    by_extractor: Dict[str, List[float]] = {}
+    for markdown, refs in zip(serial, references):
+        for extractor, reference in refs.items():
+            by_extractor.setdefault(extractor, []).append(token_overlap(markdown or "", reference))
+    for extractor, overlaps in by_extractor.items():
+        print(f"Token F1 vs {extractor}: mean {sum(overlaps) / len(overlaps):.3f}, "
+              f"min {min(overlaps):.3f} over {len(overlaps)} pages")
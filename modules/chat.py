@@ -1,19 +1,19 @@
 import os
 import re
 import json
-import google.generativeai as genai
-import streamlit as st
 from .data_fetcher import EnhancedFinancialDataFetcher
 import asyncio
-from googletrans import Translator
-from PIL import Image
+from .cache import cached
+from .config import configure_gemini, get_settings
+from .lazy_imports import lazy_import
 # We reuse the PDF text extraction from our doc_qa module
 from .doc_qa import get_document_text
+from .retirement import project_retirement, simulate_retirement
 
-# --- Configuration ---
-GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY", os.environ.get("GEMINI_API_KEY"))
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Heavy SDKs load on first use, not when the app starts
+genai = lazy_import("google.generativeai", on_load=configure_gemini)
+Translator = lazy_import("googletrans", "Translator")
+Image = lazy_import("PIL.Image")
 
 # --- Core Utility Functions ---
 
@@ -32,12 +32,12 @@ def translate_text(text: str, target_language_code: str, source_language: str =
         print(f"[ERROR] Translation failed: {e}")
         return f"Translation Error: Could not translate text."
 
-@st.cache_data(ttl=1800)
+@cached(ttl=1800)
 def generate_stock_summary(stock_info: dict) -> str:
     """
     Generates a concise summary for a single stock for the dashboard.
     """
-    if not GEMINI_API_KEY:
+    if not get_settings().gemini_api_key:
         return "Gemini API key is not configured."
     model = genai.GenerativeModel('gemini-1.5-flash')
     news_context = "\n".join([f"- {item['headline']}: {item['summary']}" for item in stock_info.get('news', [])])
@@ -60,12 +60,12 @@ def generate_stock_summary(stock_info: dict) -> str:
     except Exception as e:
         return f"Could not generate AI summary: {e}"
 
-@st.cache_data(ttl=1800)
+@cached(ttl=1800)
 def analyze_news_sentiment(news_list: list) -> list:
     """
     Analyzes sentiment for a list of news items.
     """
-    if not news_list or not GEMINI_API_KEY:
+    if not news_list or not get_settings().gemini_api_key:
         return []
     model = genai.GenerativeModel('gemini-1.5-flash')
     headlines_to_analyze = "\n".join([f"Article {i+1}: {item['headline']}" for i, item in enumerate(news_list)])
@@ -89,7 +89,7 @@ def _expand_query_with_gemini(question: str) -> list[str]:
     """
     Uses Gemini to expand a user question into search keywords.
     """
-    if not GEMINI_API_KEY: return [question]
+    if not get_settings().gemini_api_key: return [question]
     try:
         model = genai.GenerativeModel('gemini-1.5-flash')
         prompt = f'Based on the user\'s financial question, generate 3-5 specific search keywords. Return ONLY a Python list of strings.\n\nQUESTION: "{question}"\n\nKEYWORDS:'
@@ -115,14 +115,14 @@ def _search_internal_database(keywords: list[str], fetcher: EnhancedFinancialDat
 
 # --- Main Feature Functions ---
 
-@st.cache_data(ttl=600)
+@cached(ttl=600)
 def process_uploaded_file(uploaded_file) -> str:
     """
     Extracts text and key information from an uploaded image or PDF file.
     """
     if uploaded_file is None: return ""
     file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-    if not GEMINI_API_KEY: return "Cannot process file: Gemini API key is missing."
+    if not get_settings().gemini_api_key: return "Cannot process file: Gemini API key is missing."
     try:
         if file_extension == ".pdf":
             extracted_text = get_document_text(uploaded_file)
@@ -141,15 +141,11 @@ def process_uploaded_file(uploaded_file) -> str:
             return "Unsupported file type."
     except Exception as e: return f"An error occurred while processing the file: {e}"
 
-@st.cache_data(ttl=600)
-def get_comprehensive_response(question_in_english: str, _fetcher: EnhancedFinancialDataFetcher, uploaded_file_context: str = ""):
+def _comprehensive_request(question_in_english: str, fetcher: EnhancedFinancialDataFetcher, uploaded_file_context: str = ""):
     """
-    The main RAG function for the FinChat AI, now with file context.
+    Builds the FinChat model and prompt for a question (shared by the cached and streaming paths).
     """
-    if not GEMINI_API_KEY:
-        return "Gemini API key is not configured."
-
-    news_context = _search_internal_database(_expand_query_with_gemini(question_in_english), _fetcher)
+    news_context = _search_internal_database(_expand_query_with_gemini(question_in_english), fetcher)
     system_instruction = "You are 'FinChat', an expert financial analyst AI. You MUST provide a structured, insightful, and data-driven response based on all context provided (internal database news and uploaded file data). Begin with a direct summary, then a detailed analysis. Never say you have 'insufficient information'. Synthesize all information to form a conclusive analysis. Always include a disclaimer that this is not financial advice."
     model = genai.GenerativeModel(model_name="gemini-1.5-flash", system_instruction=system_instruction)
     
@@ -167,18 +163,44 @@ def get_comprehensive_response(question_in_english: str, _fetcher: EnhancedFinan
     ---
     **YOUR COMPREHENSIVE ANALYSIS (Synthesize all provided context to answer):**
     """
+    return model, prompt
+
+@cached(ttl=600)
+def get_comprehensive_response(question_in_english: str, _fetcher: EnhancedFinancialDataFetcher, uploaded_file_context: str = ""):
+    """
+    The main RAG function for the FinChat AI, now with file context.
+    """
+    if not get_settings().gemini_api_key:
+        return "Gemini API key is not configured."
+
+    model, prompt = _comprehensive_request(question_in_english, _fetcher, uploaded_file_context)
     try:
         response = model.generate_content(prompt)
         return response.text
     except Exception as e:
         return f"Sorry, I encountered an error: {e}"
 
-@st.cache_data(ttl=600)
+def stream_comprehensive_response(question_in_english: str, fetcher: EnhancedFinancialDataFetcher, uploaded_file_context: str = ""):
+    """
+    Yields the FinChat answer in chunks as Gemini generates them (not cached).
+    """
+    if not get_settings().gemini_api_key:
+        yield "Gemini API key is not configured."
+        return
+    model, prompt = _comprehensive_request(question_in_english, fetcher, uploaded_file_context)
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        yield f"Sorry, I encountered an error: {e}"
+
+@cached(ttl=600)
 def analyze_ipo_document(document_text: str, target_language: str) -> str:
     """
     Analyzes the text of an IPO document.
     """
-    if not GEMINI_API_KEY or not document_text:
+    if not get_settings().gemini_api_key or not document_text:
         return "Gemini API key is not configured or the document is empty."
     system_instruction = "You are an expert IPO Analyst. Analyze the provided IPO prospectus text and create a structured, unbiased report covering: Business Overview, Financial Health, Industry Outlook, Objectives of the Offer, Key Risks, and Valuation. If info is missing, state that. End with a neutral summary."
     model = genai.GenerativeModel(model_name="gemini-1.5-flash", system_instruction=system_instruction)
@@ -189,16 +211,28 @@ def analyze_ipo_document(document_text: str, target_language: str) -> str:
     except Exception as e:
         return f"An error occurred during IPO analysis: {e}"
 
-@st.cache_data(ttl=600)
-def generate_retirement_plan(user_data: dict, target_language: str) -> str:
+@cached(ttl=600)
+def generate_retirement_plan(user_data: dict, target_language: str, _projection: dict = None, _simulation: dict = None) -> str:
     """
-    Generates a personalized retirement plan.
+    Generates a personalized retirement plan. All figures come from the deterministic
+    projection and the Monte Carlo simulation; the model only narrates them.
+    Both are pure functions of user_data, so callers that already computed them can pass them in.
     """
-    if not GEMINI_API_KEY:
+    if not get_settings().gemini_api_key:
         return "Gemini API key is not configured."
-    system_instruction = "You are a helpful Financial Planning AI. Create a simplified, illustrative retirement plan based on the user's data. Structure it into: Financial Snapshot, Retirement Goal, Investment Strategy, and Projected Outcome. End with actionable next steps and a bold disclaimer that this is not professional financial advice."
+    projection = _projection or project_retirement(user_data)
+    simulation = _simulation or simulate_retirement(user_data)
+    system_instruction = "You are a helpful Financial Planning AI. Create a simplified, illustrative retirement plan based on the user's data and the pre-computed projection and Monte Carlo results. Use ONLY the numbers provided; never recalculate or invent figures. Structure it into: Financial Snapshot, Retirement Goal, Investment Strategy, and Projected Outcome (including the probability of success and the range of outcomes). End with actionable next steps and a bold disclaimer that this is not professional financial advice."
     model = genai.GenerativeModel(model_name="gemini-1.5-flash", system_instruction=system_instruction)
-    prompt = f"Please generate a retirement plan for the following user:\n\n{json.dumps(user_data, indent=2)}"
+    prompt = f"""Please generate a retirement plan for the following user:
+
+{json.dumps(user_data, indent=2)}
+
+**Computed projection (all amounts in INR, nominal):**
+{json.dumps(projection["summary"], indent=2)}
+
+**Monte Carlo simulation (market and inflation uncertainty):**
+{json.dumps(simulation["summary"], indent=2)}"""
     try:
         english_response = model.generate_content(prompt).text
         return translate_text(english_response, target_language, source_language="English")
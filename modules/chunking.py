@@ -0,0 +1,200 @@
+import os
+import re
+import time
+
+# --- Configuration ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# The fast (Rust) tokenizer bundled with the FinBERT model; override with FINCHAT_TOKENIZER_PATH.
+DEFAULT_TOKENIZER_PATH = os.environ.get(
+    "FINCHAT_TOKENIZER_PATH", os.path.join(script_dir, "..", "finbert-model", "tokenizer.json")
+)
+# Gemini's embedding-001 accepts ~2048 input tokens, so chunks stay comfortably below that.
+DEFAULT_CHUNK_TOKENS = 1500
+DEFAULT_OVERLAP_TOKENS = 150
+
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+# The BERT pre-tokenizer splits on whitespace before anything else, so tokens never cross
+# whitespace and a paragraph's token count is the sum of its whitespace-separated words' counts.
+WORD_PATTERN = re.compile(r"\S+")
+# Upper bound on memoized word counts per tokenizer; the memo starts over once it is reached.
+WORD_CACHE_MAX_WORDS = 200_000
+
+_tokenizers = {}
+_word_token_counts = {}
+
+def load_tokenizer(tokenizer_path: str = DEFAULT_TOKENIZER_PATH):
+    """
+    Loads (once per path) a HuggingFace fast tokenizer from a tokenizer.json file.
+    Returns None when the `tokenizers` package or the file is unavailable.
+    """
+    if tokenizer_path in _tokenizers:
+        return _tokenizers[tokenizer_path]
+    tokenizer = None
+    try:
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_file(tokenizer_path)
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+    except Exception as e:
+        print(f"[WARN] Could not load tokenizer from '{tokenizer_path}', falling back to word counts: {e}")
+    _tokenizers[tokenizer_path] = tokenizer
+    _word_token_counts[tokenizer_path] = {}
+    return tokenizer
+
+def _token_counter(vocabulary: set, tokenizer_path: str):
+    """
+    Word -> real token count lookup covering vocabulary. Counts are memoized per distinct
+    word, so the tokenizer only ever sees a document's vocabulary, not its full text.
+    The memo is replaced by a fresh one once it would exceed WORD_CACHE_MAX_WORDS.
+    Without a tokenizer every word counts as one token.
+    """
+    tokenizer = load_tokenizer(tokenizer_path)
+    if tokenizer is None:
+        return lambda word: 1
+    cache = _word_token_counts[tokenizer_path]
+    unseen = list(vocabulary.difference(cache))
+    if len(cache) + len(unseen) > WORD_CACHE_MAX_WORDS:
+        # Swap in a new dict rather than clearing: lookups already handed out keep theirs
+        cache = _word_token_counts[tokenizer_path] = {}
+        unseen = list(vocabulary)
+    if unseen:
+        for word, encoding in zip(unseen, tokenizer.encode_batch(unseen, add_special_tokens=False)):
+            cache[word] = max(1, len(encoding.ids))
+    return cache.__getitem__
+
+def count_tokens(text: str, tokenizer_path: str = DEFAULT_TOKENIZER_PATH) -> int:
+    """Counts tokens in a single string with the configured tokenizer."""
+    words = text.split()
+    return sum(map(_token_counter(set(words), tokenizer_path), words))
+
+def _split_paragraphs(pages: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    """Flattens pages into (page_number, paragraph) units in document order."""
+    units = []
+    for page_number, page_text in pages:
+        for paragraph in PARAGRAPH_SPLIT.split(page_text):
+            paragraph = paragraph.strip()
+            if paragraph:
+                units.append((page_number, paragraph))
+    return units
+
+def chunk_pages(pages: list[tuple[int, str]], max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                tokenizer_path: str = DEFAULT_TOKENIZER_PATH) -> list[dict]:
+    """
+    Packs paragraphs into chunks of at most max_tokens real tokens in a single
+    linear pass. Paragraphs are never cut unless a single one exceeds the limit,
+    in which case it is windowed on word boundaries. Trailing paragraphs (up to
+    overlap_tokens) are repeated at the start of the next chunk.
+
+    Returns a list of {"text": ..., "metadata": {"chunk_id", "page_start", "page_end", "token_count"}}.
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    units = _split_paragraphs(pages)
+    # str.split, set union and map all run in C: no per-word Python work on the common path
+    unit_words = [text.split() for _, text in units]
+    token_count = _token_counter(set().union(*unit_words), tokenizer_path)
+
+    # Expand oversized paragraphs into word-aligned token windows so every unit fits in a chunk
+    pieces = []  # (page_number, text, token_count)
+    for (page_number, text), words in zip(units, unit_words):
+        total = sum(map(token_count, words))
+        if total <= max_tokens:
+            pieces.append((page_number, text, total))
+            continue
+        word_counts = list(map(token_count, words))
+        spans = [m.span() for m in WORD_PATTERN.finditer(text)]
+        start = 0
+        while start < len(spans):
+            end, window_tokens = start, 0
+            while end < len(spans) and (end == start or window_tokens + word_counts[end] <= max_tokens):
+                window_tokens += word_counts[end]
+                end += 1
+            pieces.append((page_number, text[spans[start][0]:spans[end - 1][1]], window_tokens))
+            if end >= len(spans):
+                break
+            # Step back far enough to repeat ~overlap_tokens at the start of the next window
+            back, back_tokens = end, 0
+            while back - 1 > start and back_tokens + word_counts[back - 1] <= overlap_tokens:
+                back -= 1
+                back_tokens += word_counts[back]
+            start = back
+
+    chunks, current, current_tokens = [], [], 0
+
+    def flush():
+        chunks.append({
+            "text": "\n\n".join(text for _, text, _ in current),
+            "metadata": {
+                "chunk_id": len(chunks),
+                "page_start": current[0][0],
+                "page_end": current[-1][0],
+                "token_count": current_tokens,
+            },
+        })
+
+    for piece in pieces:
+        if current and current_tokens + piece[2] > max_tokens:
+            flush()
+            # Carry trailing pieces forward as overlap
+            carried, carried_tokens = [], 0
+            for prev in reversed(current):
+                if carried_tokens + prev[2] > overlap_tokens or carried_tokens + prev[2] + piece[2] > max_tokens:
+                    break
+                carried.insert(0, prev)
+                carried_tokens += prev[2]
+            current, current_tokens = carried, carried_tokens
+        current.append(piece)
+        current_tokens += piece[2]
+    if current:
+        flush()
+    return chunks
+
+def chunk_text(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+               tokenizer_path: str = DEFAULT_TOKENIZER_PATH) -> list[str]:
+    """Token-aware chunking of a plain string (treated as a single page)."""
+    return [c["text"] for c in chunk_pages([(1, text)], max_tokens, overlap_tokens, tokenizer_path)]
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import random
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    random.seed(0)
+    words = ["revenue", "EBITDA", "FY24", "margin", "growth", "12.5%", "crore", "segment", "outlook",
+             "the", "company", "reported", "board", "dividend", "risk", "capital", "expenditure", "1,234"]
+    paragraphs = [" ".join(random.choices(words, k=random.randint(30, 120))) + "." for _ in range(20000)]
+    pages, page = [], []
+    for i, paragraph in enumerate(paragraphs, 1):
+        page.append(paragraph)
+        if i % 8 == 0:
+            pages.append((len(pages) + 1, "\n\n".join(page)))
+            page = []
+    # PDF text extraction rarely yields blank lines, so also benchmark single-newline pages
+    scenarios = {
+        "paragraphs": pages,
+        "pdf-like lines": [(n, text.replace("\n\n", "\n")) for n, text in pages],
+    }
+    load_tokenizer()  # Exclude the one-off tokenizer load from the timing
+    for scenario, scenario_pages in scenarios.items():
+        full_text = "\n\n".join(text for _, text in scenario_pages)
+        size_mb = len(full_text.encode()) / 1e6
+        print(f"Benchmark corpus ({scenario}): {size_mb:.1f} MB, {len(scenario_pages)} pages")
+
+        start = time.perf_counter()
+        token_chunks = chunk_pages(scenario_pages)
+        elapsed = time.perf_counter() - start
+        print(f"  token-aware chunker: {len(token_chunks)} chunks in {elapsed:.2f}s ({size_mb / elapsed:.1f} MB/s)")
+
+        # The splitter Doc Chat used before (character lengths, so chunks have no token guarantee),
+        # then the same splitter measuring tokens, which is what this module replaces it for
+        baselines = {
+            "characters": RecursiveCharacterTextSplitter(chunk_size=10000, chunk_overlap=1000),
+            "token length": RecursiveCharacterTextSplitter(chunk_size=DEFAULT_CHUNK_TOKENS, chunk_overlap=DEFAULT_OVERLAP_TOKENS,
+                                                           length_function=count_tokens),
+        }
+        for name, splitter in baselines.items():
+            start = time.perf_counter()
+            lc_chunks = splitter.split_text(full_text)
+            elapsed = time.perf_counter() - start
+            print(f"  RecursiveCharacterTextSplitter ({name}): {len(lc_chunks)} chunks in {elapsed:.2f}s "
+                  f"({size_mb / elapsed:.1f} MB/s)")
@@ -0,0 +1,85 @@
+import os
+import threading
+from typing import Callable, Mapping, Optional
+
+# --- Configuration ---
+# Settings resolve from the injected secrets mapping first, then the environment
+DEFAULT_CACHE_BACKEND = "memory"      # "memory" (per process), "disk" (survives restarts) or "shared" (all replicas on the host)
+DEFAULT_CACHE_DIR = ".finchat_cache"
+DEFAULT_SHARED_CACHE_PATH = "finchat_cache.db"
+
+class Settings:
+    """
+    Everything modules/ reads from the deployment: API keys and the cache backend.
+    Built from a secrets mapping (e.g. st.secrets) and environment variables, never from
+    a UI framework, so the same code runs in Streamlit, the API, worker processes and batch jobs.
+    """
+    def __init__(self, gemini_api_key: str = None, finnhub_api_key: str = None,
+                 cache_backend: str = DEFAULT_CACHE_BACKEND, cache_dir: str = DEFAULT_CACHE_DIR,
+                 shared_cache_path: str = DEFAULT_SHARED_CACHE_PATH):
+        self.gemini_api_key = gemini_api_key
+        self.finnhub_api_key = finnhub_api_key
+        self.cache_backend = cache_backend
+        self.cache_dir = cache_dir
+        self.shared_cache_path = shared_cache_path
+
+    @classmethod
+    def from_sources(cls, secrets: Optional[Mapping] = None) -> "Settings":
+        def lookup(name, default=None):
+            try:
+                value = secrets.get(name) if secrets is not None else None
+            except Exception:   # st.secrets raises when no secrets.toml exists
+                value = None
+            return value if value is not None else os.environ.get(name, default)
+
+        return cls(
+            gemini_api_key=lookup("GEMINI_API_KEY"),
+            finnhub_api_key=lookup("FINNHUB_API_KEY"),
+            cache_backend=lookup("FINCHAT_CACHE_BACKEND", DEFAULT_CACHE_BACKEND),
+            cache_dir=lookup("FINCHAT_CACHE_DIR", DEFAULT_CACHE_DIR),
+            shared_cache_path=lookup("FINCHAT_SHARED_CACHE_PATH", DEFAULT_SHARED_CACHE_PATH),
+        )
+
+    def __repr__(self):
+        keys = {name: bool(getattr(self, name)) for name in ("gemini_api_key", "finnhub_api_key")}
+        return f"Settings(keys={keys}, cache_backend={self.cache_backend!r}, cache_dir={self.cache_dir!r})"
+
+def _print_error(message: str, level: str = "error"):
+    print(f"[{level.upper()}] {message}")
+
+_settings: Optional[Settings] = None
+_secrets: Optional[Mapping] = None
+_error_handler: Callable[[str, str], None] = _print_error
+_lock = threading.Lock()
+
+def configure(settings: Settings = None, secrets: Mapping = None, error_handler: Callable[[str, str], None] = None):
+    """
+    Injects the process configuration. Pass ready Settings, or a secrets mapping that is
+    read (with environment fallback) on first use, so reading it costs nothing at import.
+    error_handler(message, level) receives user-facing errors and warnings from library code.
+    """
+    global _settings, _secrets, _error_handler
+    with _lock:
+        if settings is not None or secrets is not None:
+            _settings, _secrets = settings, secrets
+        if error_handler is not None:
+            _error_handler = error_handler
+
+def get_settings() -> Settings:
+    """The injected Settings, or Settings built from secrets/environment on first call."""
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = Settings.from_sources(_secrets)
+    return _settings
+
+def report_error(message: str, level: str = "error"):
+    """Surfaces a user-facing error ("error") or warning ("warning") through the configured handler."""
+    _error_handler(message, level)
+
+def configure_gemini(genai_module):
+    """on_load hook for the lazily imported google.generativeai: applies the configured API key."""
+    api_key = get_settings().gemini_api_key
+    if api_key:
+        genai_module.configure(api_key=api_key)
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# --- Configuration ---
+DEFAULT_CACHE_PATH = os.environ.get("FINCHAT_CONTENT_CACHE_PATH", "content_cache.db")
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60     # Published articles rarely change; re-extract weekly
+MAX_CACHE_BYTES = 64 * 1024 * 1024         # Compressed bytes kept before least-recently-used eviction
+COMPRESSION_LEVEL = 6
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid",
+                   "ref", "ref_src", "cmpid", "ocid", "guccounter", "guce_referrer", "guce_referrer_sig", "taid"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extracted_content (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    method TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extracted_content_accessed ON extracted_content (accessed_at);
+-- Running total of stored bytes, kept by triggers so a put checks the cap without a SUM
+CREATE TABLE IF NOT EXISTS extracted_content_size (id INTEGER PRIMARY KEY CHECK (id = 1), bytes INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS extracted_content_size_insert AFTER INSERT ON extracted_content
+BEGIN UPDATE extracted_content_size SET bytes = bytes + new.size; END;
+CREATE TRIGGER IF NOT EXISTS extracted_content_size_update AFTER UPDATE OF size ON extracted_content
+BEGIN UPDATE extracted_content_size SET bytes = bytes + new.size - old.size; END;
+CREATE TRIGGER IF NOT EXISTS extracted_content_size_delete AFTER DELETE ON extracted_content
+BEGIN UPDATE extracted_content_size SET bytes = bytes - old.size; END;
+INSERT OR IGNORE INTO extracted_content_size SELECT 1, COALESCE(SUM(size), 0) FROM extracted_content;
+"""
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so trivially different links share one cache entry: lowercase scheme
+    and host, no default port, fragment or tracking parameters (utm_* and TRACKING_PARAMS),
+    remaining query parameters sorted, no trailing slash on non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme, host = parts.scheme.lower(), (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def cache_key(url: str, method: str) -> str:
+    return hashlib.sha256(f"{method}\n{canonicalize_url(url)}".encode("utf-8")).hexdigest()
+
+class ContentCache:
+    """
+    Persistent cache of extracted article content, keyed by (extraction method, canonical
+    URL). Bodies are zlib-compressed in SQLite; entries expire after ttl seconds (reads
+    ignore them), and once the compressed total exceeds max_bytes, expired and then least
+    recently read entries are evicted.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL_SECONDS, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str, method: str) -> Optional[str]:
+        """Cached content, or None if absent or expired."""
+        key, now = cache_key(url, method), time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT body, stored_at FROM extracted_content WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        with conn:
+            conn.execute("UPDATE extracted_content SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, url: str, method: str, content: str):
+        now = time.time()
+        body = zlib.compress(content.encode("utf-8"), COMPRESSION_LEVEL)
+        with self._connect() as conn:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would bypass the size triggers
+            conn.execute(
+                """INSERT INTO extracted_content VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET url = excluded.url, method = excluded.method, body = excluded.body,
+                   size = excluded.size, stored_at = excluded.stored_at, accessed_at = excluded.accessed_at""",
+                (cache_key(url, method), canonicalize_url(url), method, body, len(body), now, now),
+            )
+            if self._stored_bytes(conn) > self.max_bytes:
+                self._evict(conn, now)
+
+    def get_or_extract(self, url: str, method: str, extract: Callable[[], Optional[str]]) -> Optional[str]:
+        """Cached content, else extract() (cached unless it returns None)."""
+        content = self.get(url, method)
+        if content is None:
+            content = extract()
+            if content is not None:
+                self.put(url, method, content)
+        return content
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT bytes FROM extracted_content_size").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drops expired entries, then the least recently read ones until under max_bytes."""
+        conn.execute("DELETE FROM extracted_content WHERE stored_at < ?", (now - self.ttl,))
+        total = self._stored_bytes(conn)
+        if total <= self.max_bytes:
+            return
+        excess, doomed = total - self.max_bytes, []
+        for key, size in conn.execute("SELECT key, size FROM extracted_content ORDER BY accessed_at"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM extracted_content WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        entries, compressed = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extracted_content").fetchone()
+        return {"entries": entries, "compressed_bytes": compressed, "hits": self.hits, "misses": self.misses}
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import random
+    import tempfile
+
+    rng = random.Random(3)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    articles = {f"https://www.example.com/markets/story-{i}": " ".join(rng.choices(vocabulary, k=900)) for i in range(300)}
+    cache = ContentCache(os.path.join(tempfile.mkdtemp(), "content.db"), max_bytes=256 * 1024)
+
+    start = time.perf_counter()
+    for url, text in articles.items():
+        cache.put(url, "jina", text)
+    put_ms = (time.perf_counter() - start) * 1000 / len(articles)
+    raw = sum(len(text.encode()) for text in articles.values())
+
+    start = time.perf_counter()
+    hits = sum(cache.get(url + "/?utm_source=twitter&fbclid=abc#comments", "jina") is not None for url in articles)
+    get_ms = (time.perf_counter() - start) * 1000 / len(articles)
+    stats = cache.stats()
+    print(f"{len(articles)} articles, {raw / 1e6:.1f} MB raw: put {put_ms:.2f} ms, get {get_ms:.2f} ms; "
+          f"{stats['entries']} kept in {stats['compressed_bytes'] / 1e6:.2f} MB (256 KB cap, least recently read evicted), "
+          f"{hits} hits via tracking-param URLs")
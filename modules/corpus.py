@@ -0,0 +1,265 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .lazy_imports import lazy_import
+from .vector_index import build_index, choose_index_spec
+from .retrieval import (
+    HybridRetriever,
+    apply_token_budget,
+    estimate_tokens,
+    DEFAULT_K,
+    DEFAULT_FETCH_K,
+    DEFAULT_ALPHA,
+    DEFAULT_MMR_LAMBDA,
+    DEFAULT_MAX_CONTEXT_TOKENS,
+)
+
+# --- Configuration ---
+DEFAULT_CORPUS_PATH = "faiss_corpus"
+# A shard is closed once it holds this many chunks; new documents then open a new shard,
+# so adding a document only ever touches (and re-saves) the newest shard.
+SHARD_CAPACITY = 5000
+RRF_K = 60  # Reciprocal Rank Fusion constant used to merge per-shard rankings
+SEARCH_WORKERS = 8
+
+FAISS = lazy_import("langchain_community.vectorstores", "FAISS")
+InMemoryDocstore = lazy_import("langchain_community.docstore.in_memory", "InMemoryDocstore")
+faiss = lazy_import("faiss")
+
+class DocumentCorpus:
+    """
+    A multi-document vector index made of FAISS shards plus a JSON manifest.
+    Every chunk carries doc_id, doc_name, year and page metadata, so searches can
+    be restricted to some documents or years. Shards that cannot match a filter
+    are skipped entirely, and the remaining shards are searched in parallel on a
+    persistent thread pool, each through its cached retriever.
+    Each shard's FAISS index is chosen by vector_index.build_index for its size
+    (and the optional quantization).
+    Safe to share between threads: writes hold a lock, searches use a snapshot.
+    """
+    def __init__(self, embeddings, path: str = DEFAULT_CORPUS_PATH, count_tokens=estimate_tokens,
+                 quantization: str | None = None):
+        self.embeddings = embeddings
+        self.path = path
+        self.count_tokens = count_tokens
+        self.quantization = quantization
+        self.manifest = {"documents": {}, "shards": []}
+        self._retrievers = {}
+        self._lock = threading.RLock()
+        self._pool = None
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+    # --- Manifest helpers ---
+
+    @property
+    def documents(self) -> dict:
+        """doc_id -> {"name", "year", "shard", "n_chunks"} for every indexed document."""
+        return self.manifest["documents"]
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, "manifest.json"))
+
+    def _shard_path(self, shard_name: str) -> str:
+        return os.path.join(self.path, shard_name)
+
+    def _load_store(self, shard_name: str):
+        return FAISS.load_local(self._shard_path(shard_name), self.embeddings, allow_dangerous_deserialization=True)
+
+    def _retriever(self, shard_name: str) -> HybridRetriever:
+        """Loads a shard (once) and wraps it in a hybrid retriever."""
+        retriever = self._retrievers.get(shard_name)
+        if retriever is None:
+            with self._lock:
+                if shard_name not in self._retrievers:
+                    self._retrievers[shard_name] = HybridRetriever(self._load_store(shard_name), count_tokens=self.count_tokens)
+                retriever = self._retrievers[shard_name]
+        return retriever
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="corpus-search")
+        return self._pool
+
+    def _new_store(self, texts: list, vectors: list, metadatas: list):
+        """A shard store whose index build_index chose for its size."""
+        store = FAISS.from_embeddings(list(zip(texts, vectors)), self.embeddings, metadatas=metadatas)
+        store.index = build_index(np.asarray(vectors, dtype=np.float32), quantization=self.quantization)
+        return store
+
+    def _extended_store(self, shard: dict, texts: list, vectors: list, metadatas: list):
+        """
+        A copy of a loaded shard with the chunks appended; the shard in use is left as-is,
+        so searches in flight keep a consistent view and nothing is reloaded from disk.
+        The index is added to in place unless the grown shard calls for another index type,
+        in which case it is rebuilt from the stored vectors.
+        """
+        current = self._retriever(shard["name"]).vector_store
+        store = FAISS(self.embeddings, faiss.clone_index(current.index), InMemoryDocstore(dict(current.docstore._dict)),
+                      dict(current.index_to_docstore_id))
+        store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        dim, total = store.index.d, store.index.ntotal
+        if choose_index_spec(total, dim, self.quantization) != choose_index_spec(current.index.ntotal, dim, self.quantization):
+            store.index = build_index(store.index.reconstruct_n(0, total), quantization=self.quantization)
+        return store
+
+    # --- Indexing ---
+
+    def add_document(self, doc_id: str, doc_name: str, year: int | None, chunks: list[dict]) -> bool:
+        """
+        Embeds and appends one document's chunks (as produced by chunking.chunk_pages).
+        Existing shards are never rebuilt: chunks go into the newest shard while it has
+        room, otherwise into a new one. Returns False if the document is already indexed.
+        Embedding runs outside the lock; the shard and manifest update holds it.
+        """
+        if doc_id in self.documents:
+            print(f"ℹ️ CORPUS: '{doc_name}' is already in the corpus, skipping.")
+            return False
+        if not chunks:
+            return False
+
+        texts = [chunk["text"] for chunk in chunks]
+        metadatas = [
+            {**chunk["metadata"], "doc_id": doc_id, "doc_name": doc_name, "year": year}
+            for chunk in chunks
+        ]
+        print(f"📚 CORPUS: Embedding {len(texts)} chunks for '{doc_name}'...")
+        vectors = self.embeddings.embed_documents(texts)
+
+        with self._lock:
+            if doc_id in self.documents:   # Added by another thread while this one was embedding
+                return False
+            shards = self.manifest["shards"]
+            if shards and shards[-1]["n_chunks"] + len(texts) <= SHARD_CAPACITY:
+                shard = dict(shards[-1], doc_ids=list(shards[-1]["doc_ids"]))
+                store = self._extended_store(shard, texts, vectors, metadatas)
+            else:
+                shard = {"name": f"shard_{len(shards):04d}", "n_chunks": 0, "doc_ids": []}
+                store = self._new_store(texts, vectors, metadatas)
+
+            store.save_local(self._shard_path(shard["name"]))
+            shard["n_chunks"] += len(texts)
+            shard["doc_ids"].append(doc_id)
+            # Searches snapshot the manifest, so it is replaced rather than edited in place
+            documents = {**self.documents, doc_id: {"name": doc_name, "year": year, "shard": shard["name"],
+                                                    "n_chunks": len(texts)}}
+            shards = shards[:-1] + [shard] if shards and shards[-1]["name"] == shard["name"] else shards + [shard]
+            self.manifest = {**self.manifest, "documents": documents, "shards": shards}
+            # Only this shard's BM25 statistics changed, so only its retriever is rebuilt
+            self._retrievers[shard["name"]] = HybridRetriever(store, count_tokens=self.count_tokens)
+            self._save_manifest()
+        print(f"✅ CORPUS: Added '{doc_name}' to {shard['name']} ({len(documents)} documents total).")
+        return True
+
+    # --- Search ---
+
+    def matching_doc_ids(self, doc_ids=None, years=None) -> set:
+        """Documents allowed by a doc_id / year filter (None means no restriction)."""
+        return {
+            doc_id for doc_id, info in self.documents.items()
+            if (not doc_ids or doc_id in doc_ids) and (not years or info["year"] in years)
+        }
+
+    def search(self, query: str, doc_ids=None, years=None, k: int = DEFAULT_K, fetch_k: int = DEFAULT_FETCH_K,
+               alpha: float = DEFAULT_ALPHA, mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+               max_context_tokens: int = DEFAULT_MAX_CONTEXT_TOKENS, use_mmr: bool = True) -> list:
+        """
+        Hybrid search across the corpus, optionally filtered by document ids and/or years.
+        Each relevant shard returns its own top-k; rankings are merged with Reciprocal
+        Rank Fusion because per-shard fused scores are not comparable.
+        """
+        manifest = self.manifest   # Snapshot: add_document replaces it, never edits it
+        allowed_docs = self.matching_doc_ids(doc_ids, years)
+        shard_names = [shard["name"] for shard in manifest["shards"] if allowed_docs & set(shard["doc_ids"])]
+        if not shard_names:
+            return []
+
+        shard_docs = {shard["name"]: set(shard["doc_ids"]) for shard in manifest["shards"]}
+        # Embed once and share the query vector across shards
+        query_vector = self._retriever(shard_names[0]).embed_query(query)
+
+        def search_shard(shard_name):
+            retriever = self._retriever(shard_name)
+            allowed = None
+            if not shard_docs[shard_name] <= allowed_docs:
+                allowed = retriever.metadata_mask({"doc_id": list(allowed_docs)})
+            return retriever.search_with_scores(query, k, fetch_k, alpha, mmr_lambda, use_mmr, allowed, query_vector)
+
+        if len(shard_names) == 1:
+            ranked_lists = [search_shard(shard_names[0])]
+        else:
+            ranked_lists = list(self._executor().map(search_shard, shard_names))
+
+        fused = {}
+        for results in ranked_lists:
+            for rank, (doc, _) in enumerate(results):
+                key = (doc.metadata.get("doc_id"), doc.metadata.get("chunk_id"))
+                score = fused.get(key, (doc, 0.0))[1] + 1.0 / (RRF_K + rank + 1)
+                fused[key] = (doc, score)
+        ranked = [doc for doc, _ in sorted(fused.values(), key=lambda item: -item[1])[:k]]
+        kept = apply_token_budget([doc.page_content for doc in ranked], max_context_tokens, self.count_tokens)
+        return [ranked[i] for i in kept]
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+    import zlib
+    import numpy as np
+    from langchain_core.embeddings import Embeddings
+    from .retrieval import tokenize
+
+    class HashingEmbeddings(Embeddings):
+        """Offline bag-of-words hashing embeddings so the benchmark needs no API key."""
+        def _embed(self, text):
+            vector = np.zeros(256, dtype=np.float32)
+            for token in tokenize(text):
+                vector[zlib.crc32(token.encode()) % 256] += 1.0
+            return (vector / max(float(np.linalg.norm(vector)), 1e-12)).tolist()
+
+        def embed_documents(self, texts):
+            return [self._embed(t) for t in texts]
+
+        def embed_query(self, text):
+            return self._embed(text)
+
+    rng = np.random.default_rng(3)
+    segments = ["revenue", "margin", "capex", "guidance", "debt", "dividend", "EBITDA", "headcount"]
+    workdir = tempfile.mkdtemp()
+    corpus = DocumentCorpus(HashingEmbeddings(), path=os.path.join(workdir, "corpus"))
+    print(f"{'documents':>9} {'chunks':>7} {'add s':>7} {'first ms':>9} {'search ms':>10} {'filtered ms':>12}")
+    try:
+        for n, year in enumerate(range(2000, 2040)):
+            chunks = [
+                {"text": f"Annual report {year}. {segment} was {rng.integers(100, 9999)} crore in FY{year % 100:02d}. " * 5,
+                 "metadata": {"chunk_id": i, "page_start": i + 1, "page_end": i + 1}}
+                for i, segment in enumerate(segments * 40)
+            ]
+            start = time.perf_counter()
+            corpus.add_document(f"report-{year}", f"Annual Report {year}", year, chunks)
+            add_seconds = time.perf_counter() - start
+            if (n + 1) % 5 == 0:
+                start = time.perf_counter()
+                corpus.search("warm-up")   # First query after an add
+                first_ms = (time.perf_counter() - start) * 1000
+                timings = {}
+                for label, years in (("all", None), ("filtered", [year - 1, year])):
+                    start = time.perf_counter()
+                    for _ in range(20):
+                        corpus.search("What was EBITDA?", years=years)
+                    timings[label] = (time.perf_counter() - start) * 1000 / 20
+                total_chunks = sum(s["n_chunks"] for s in corpus.manifest["shards"])
+                print(f"{n + 1:>9} {total_chunks:>7} {add_seconds:>7.2f} {first_ms:>9.2f} {timings['all']:>10.2f} {timings['filtered']:>12.2f}")
+    finally:
+        shutil.rmtree(workdir)
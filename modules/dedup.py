@@ -0,0 +1,206 @@
+import re
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional
+import numpy as np
+
+# --- Configuration ---
+SHINGLE_SIZE = 4            # Character n-grams: robust to reworded, re-punctuated syndicated headlines
+JACCARD_THRESHOLD = 0.4     # Shingle-set similarity at which two headlines are the same story
+NUM_PERM = 120              # MinHash permutations
+ROWS_PER_BAND = 3           # LSH banding: 40 bands of 3 rows catch ~93% of pairs at J=0.4
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+# Google News appends " - Source" to headlines; syndicated copies differ only there.
+# Stripped only when it names the article's source or a known publisher, so headlines
+# like "Infosys Q2 - what to expect" keep their tail
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+([^-|–—]{2,60})$")
+KNOWN_PUBLISHERS = frozenset({
+    "reuters", "bloomberg", "cnbc", "cnbc tv18", "cnbctv18", "mint", "livemint", "the economic times",
+    "economic times", "business standard", "the hindu businessline", "moneycontrol", "ndtv profit",
+    "financial express", "the financial express", "yahoo finance", "marketwatch", "barron's", "forbes",
+    "the wall street journal", "wsj", "financial times", "seeking alpha", "the motley fool", "benzinga",
+    "investing com", "zacks", "google news",
+})
+
+# Headline vocabulary that says what happened, not to whom; the rest are a headline's salient words
+_COMMON_WORDS = frozenset("""
+a an the and or of to in on at for by with from as after before over amid into up down is are be its it
+this that new says said report reportedly today sharply top key vs via than more less
+q1 q2 q3 q4 fy quarter quarterly annual year month week results result earnings profit net revenue sales
+loss losses margin margins guidance outlook forecast dividend buyback deal contract order orders stake
+shares share stock stocks price target rating market markets investors analysts crore lakh billion million
+percent rises rise rose jumps jump jumped gains gain gained surges surge soars climbs falls fall fell drops
+drop slips slides plunges tumbles declines cuts cut raises raise beats beat misses miss hits hit record high
+low strong weak higher lower announces announced wins win signs launches plans expects posts reports
+government demand growth
+""".split())
+
+def _publisher_name(text: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9']+", " ", (text or "").lower()).split())
+
+def normalize_headline(text: str, source: str = None) -> str:
+    """Lowercased alphanumeric words of a headline, without a trailing " - Publisher"."""
+    text = text or ""
+    suffix = _SOURCE_SUFFIX.search(text)
+    if suffix:
+        publisher = _publisher_name(suffix.group(1))
+        if publisher in KNOWN_PUBLISHERS or (source and publisher == _publisher_name(source)):
+            text = text[:suffix.start()]
+    return " ".join(re.sub(r"[^a-z0-9%]+", " ", text.lower()).split())
+
+def shingles(text: str, k: int = SHINGLE_SIZE, source: str = None) -> set:
+    normalized = normalize_headline(text, source)
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+def minhash_signature(shingle_set: set) -> np.ndarray:
+    """NUM_PERM-value MinHash signature, vectorized over shingles x permutations."""
+    if not shingle_set:
+        return np.full(NUM_PERM, _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    hashes %= np.uint64(_MERSENNE_PRIME)
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % np.uint64(_MERSENNE_PRIME)).min(axis=0)
+
+def story_anchors(text: str, source: str = None) -> tuple:
+    """
+    (salient words, numbers) of a headline. Character shingles alone would merge "TCS profit
+    rises 10%" with "Infosys profit rises 10%" or "... rises 12%" with "... rises 13%", so
+    near-duplicates must also share their figures and their subject. Salient words are the
+    headline's words minus common headline vocabulary (usually the company and other names);
+    as a set they do not depend on word order.
+    """
+    normalized = normalize_headline(text, source)
+    numbers = frozenset(re.findall(r"\d+(?:\.\d+)?", normalized))
+    salient = frozenset(word for word in normalized.split() if word not in _COMMON_WORDS and not word[0].isdigit())
+    return salient, numbers
+
+def same_story(anchors: tuple, other: tuple) -> bool:
+    """Equal numbers, and one headline's salient words contain the other's (an added "reportedly" is fine)."""
+    (salient, numbers), (other_salient, other_numbers) = anchors, other
+    return numbers == other_numbers and (salient <= other_salient or other_salient <= salient)
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of headline shingle sets. add() returns the key of an already
+    indexed near-duplicate (or None and indexes the new item), in expected constant time
+    per item: LSH buckets propose candidates and only those with the same story anchors
+    are compared exactly.
+    Keys are arbitrary, so one index can span tickers and sources; remove() or retain()
+    evicts items whose articles are gone.
+    """
+    def __init__(self, threshold: float = JACCARD_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[tuple, Dict[Hashable, None]] = {}   # Dicts: insertion-ordered, O(1) removal
+        self._items: Dict[Hashable, tuple] = {}   # key -> (shingle set, story anchors, signature)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(NUM_PERM // ROWS_PER_BAND):
+            yield (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+
+    def find(self, text: str, source: str = None) -> Optional[Hashable]:
+        """Key of the most similar indexed item at or above the threshold, if any."""
+        return self._find(shingles(text, source=source), story_anchors(text, source))[0]
+
+    def _find(self, shingle_set: set, anchors: tuple):
+        signature = minhash_signature(shingle_set)
+        best_key, best_score = None, self.threshold
+        seen = set()
+        for band_key in self._band_keys(signature):
+            for key in self._buckets.get(band_key, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                candidate_shingles, candidate_anchors, _ = self._items[key]
+                if not same_story(anchors, candidate_anchors):
+                    continue
+                score = jaccard(shingle_set, candidate_shingles)
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return best_key, signature
+
+    def add(self, key: Hashable, text: str, source: str = None) -> Optional[Hashable]:
+        """
+        Indexes text under key unless it near-duplicates an indexed item, whose key is returned.
+        source (the article's publisher) lets a matching " - Publisher" suffix be ignored.
+        """
+        shingle_set, anchors = shingles(text, source=source), story_anchors(text, source)
+        duplicate_of, signature = self._find(shingle_set, anchors)
+        if duplicate_of is not None:
+            return duplicate_of
+        self.remove(key)
+        self._items[key] = (shingle_set, anchors, signature)
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, {})[key] = None
+        return None
+
+    def remove(self, key: Hashable) -> bool:
+        """Drops key from the index. Returns whether it was indexed."""
+        item = self._items.pop(key, None)
+        if item is None:
+            return False
+        for band_key in self._band_keys(item[2]):
+            bucket = self._buckets[band_key]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[band_key]
+        return True
+
+    def retain(self, keys: Iterable[Hashable]) -> int:
+        """Drops every indexed key not in keys. Returns the number dropped."""
+        keys = set(keys)
+        stale = [key for key in self._items if key not in keys]
+        for key in stale:
+            self.remove(key)
+        return len(stale)
+
+def merge_news(*article_lists: Iterable[Dict]) -> List[Dict]:
+    """
+    Concatenates article lists into a new list, dropping near-duplicate headlines
+    (the first occurrence wins, so list order sets priority). Inputs are never modified;
+    articles are shallow-copied.
+    """
+    index = NearDuplicateIndex()
+    merged = []
+    for articles in article_lists:
+        for article in articles:
+            if index.add(len(merged), article.get("headline", ""), article.get("source")) is None:
+                merged.append(dict(article))
+    return merged
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import random
+    import time
+
+    companies = ["Infosys", "TCS", "Reliance", "Apple", "Microsoft", "HDFC Bank", "Tesla", "Wipro"]
+    events = ["Q2 profit rises {n}%", "shares jump {n}% after strong results", "announces {n} billion buyback",
+              "cuts guidance by {n}%", "stock falls {n}% on weak demand", "wins {n} crore government contract"]
+    sources = ["Reuters", "Mint", "Economic Times", "CNBC", "Bloomberg"]
+    random.seed(5)
+    stories = [f"{random.choice(companies)} {random.choice(events).format(n=random.randint(2, 40))}" for _ in range(2000)]
+
+    def rewrite(headline):
+        words = headline.split()
+        if random.random() < 0.5:
+            words.insert(random.randint(1, len(words)), random.choice(["reportedly", "sharply", "today"]))
+        return " ".join(words) + f" - {random.choice(sources)}"
+
+    for n_articles in (1_000, 10_000, 50_000):
+        articles = [{"headline": rewrite(random.choice(stories))} for _ in range(n_articles)]
+        start = time.perf_counter()
+        merged = merge_news(articles)
+        elapsed = time.perf_counter() - start
+        print(f"{n_articles:>6} articles -> {len(merged):>5} unique stories in {elapsed * 1000:.0f} ms "
+              f"({elapsed * 1e6 / n_articles:.0f} µs per article)")
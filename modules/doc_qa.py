@@ -1,64 +1,104 @@
 import os
-import google.generativeai as genai
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from pypdf import PdfReader
-import docx
-import streamlit as st
-
-# --- Configuration ---
-GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY", os.environ.get('GEMINI_API_KEY'))
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("[ERROR] Gemini API Key not found for Doc Q&A module.")
+import threading
+from .config import configure_gemini, get_settings, report_error
+from .lazy_imports import lazy_import
+from .retrieval import (
+    HybridRetriever,
+    DEFAULT_K,
+    DEFAULT_FETCH_K,
+    DEFAULT_ALPHA,
+    DEFAULT_MMR_LAMBDA,
+    DEFAULT_MAX_CONTEXT_TOKENS,
+)
+from .chunking import chunk_pages, chunk_text, count_tokens
+from .vector_index import build_index, FLAT_MAX_VECTORS
+from .corpus import DocumentCorpus, DEFAULT_CORPUS_PATH
 
-def get_document_text(uploaded_file):
-    """Extracts text from an uploaded PDF or DOCX file."""
-    text = ""
+# Heavy dependencies load on first use, not when the app starts
+genai = lazy_import("google.generativeai", on_load=configure_gemini)
+GoogleGenerativeAIEmbeddings = lazy_import("langchain_google_genai", "GoogleGenerativeAIEmbeddings")
+FAISS = lazy_import("langchain_community.vectorstores", "FAISS")
+PdfReader = lazy_import("pypdf", "PdfReader")
+docx = lazy_import("docx")
+
+FAISS_INDEX_PATH = "faiss_index"
+
+# Hybrid retrievers are cached per saved index so BM25 is built once per document, not per question.
+_retriever_cache = {}
+_corpus = None
+_corpus_lock = threading.Lock()
+
+def get_document_pages(uploaded_file):
+    """
+    Extracts text from an uploaded PDF or DOCX file as a list of (page_number, text).
+    DOCX files have no fixed pagination, so their paragraphs are reported as page 1.
+    """
+    pages = []
     if uploaded_file is None:
-        return text
+        return pages
     
     file_extension = os.path.splitext(uploaded_file.name)[1]
     
     try:
         if file_extension == '.pdf':
             pdf_reader = PdfReader(uploaded_file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() or ""
+            for page_number, page in enumerate(pdf_reader.pages, 1):
+                pages.append((page_number, page.extract_text() or ""))
         elif file_extension == '.docx':
             doc = docx.Document(uploaded_file)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        print(f"[SUCCESS] Extracted {len(text)} characters from {uploaded_file.name}")
+            # Blank lines between paragraphs so chunking sees DOCX paragraph boundaries
+            pages.append((1, "\n\n".join(para.text for para in doc.paragraphs)))
+        print(f"[SUCCESS] Extracted {sum(len(text) for _, text in pages)} characters from {uploaded_file.name}")
     except Exception as e:
-        st.error(f"Error reading file: {e}")
+        report_error(f"Error reading file: {e}")
         print(f"[ERROR] Could not read text from file: {e}")
-        return ""
-    return text
+        return []
+    return pages
+
+def get_document_text(uploaded_file):
+    """Extracts text from an uploaded PDF or DOCX file."""
+    return "".join(text for _, text in get_document_pages(uploaded_file))
 
 def get_text_chunks(text):
-    """Splits text into manageable chunks."""
+    """Splits text into manageable chunks, sized by real token counts."""
     print("[INFO] Splitting text into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=10000, chunk_overlap=1000)
-    chunks = text_splitter.split_text(text)
+    chunks = chunk_text(text)
     print(f"[SUCCESS] Text split into {len(chunks)} chunks.")
     return chunks
 
-def get_vector_store(text_chunks):
-    """Creates and saves a vector store from text chunks."""
-    if not text_chunks or not GEMINI_API_KEY:
-        st.error("Cannot create vector store. Check API key or document content.")
+def get_document_chunks(pages):
+    """
+    Splits extracted pages into token-sized chunks that respect paragraph boundaries.
+    Each chunk is {"text": ..., "metadata": {"chunk_id", "page_start", "page_end", "token_count"}}.
+    """
+    print("[INFO] Splitting document pages into chunks...")
+    chunks = chunk_pages(pages)
+    print(f"[SUCCESS] {len(pages)} pages split into {len(chunks)} chunks.")
+    return chunks
+
+def get_vector_store(text_chunks, metadatas=None, quantization=None):
+    """
+    Creates and saves a vector store from text chunks (and optional per-chunk metadata).
+    Large corpora get an approximate index (HNSW or IVF, optionally quantized) tuned to a recall target.
+    """
+    if not text_chunks or not get_settings().gemini_api_key:
+        report_error("Cannot create vector store. Check API key or document content.")
         return
     try:
         print("[INFO] Creating vector store...")
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=GEMINI_API_KEY)
-        vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
-        vector_store.save_local("faiss_index")
-        print("[SUCCESS] Vector store created and saved to 'faiss_index'.")
+        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=get_settings().gemini_api_key)
+        vector_store = FAISS.from_texts(text_chunks, embedding=embeddings, metadatas=metadatas)
+        if vector_store.index.ntotal >= FLAT_MAX_VECTORS:
+            # Re-index the same vectors; ids stay positional so the docstore mapping is unchanged
+            vectors = vector_store.index.reconstruct_n(0, vector_store.index.ntotal)
+            vector_store.index = build_index(vectors, quantization=quantization)
+        elif quantization:
+            print(f"[INFO] Keeping the exact index: {vector_store.index.ntotal} vectors is below "
+                  f"{FLAT_MAX_VECTORS}, where '{quantization}' quantization is not applied.")
+        vector_store.save_local(FAISS_INDEX_PATH)
+        print(f"[SUCCESS] Vector store created and saved to '{FAISS_INDEX_PATH}'.")
     except Exception as e:
-        st.error(f"Error creating vector store: {e}")
+        report_error(f"Error creating vector store: {e}")
         print(f"[ERROR] Vector store creation failed: {e}")
 
 def summarize_document_with_full_context(text_chunks):
@@ -67,8 +107,8 @@ def summarize_document_with_full_context(text_chunks):
     This approach leverages the model's large context window.
     """
     print(f"📄 DOC: Starting full-context summary with {len(text_chunks)} chunks")
-    if not text_chunks or not GEMINI_API_KEY:
-        print(f"❌ DOC: Missing text_chunks or GEMINI_API_KEY")
+    if not text_chunks or not get_settings().gemini_api_key:
+        print(f"❌ DOC: Missing text_chunks or API key")
         return "Document is empty, could not be read, or Gemini API key is missing."
 
     try:
@@ -100,50 +140,132 @@ def summarize_document_with_full_context(text_chunks):
         
     except Exception as e:
         print(f"❌ DOC: Error generating summary: {e}")
-        st.error(f"An error occurred during summarization: {e}")
+        report_error(f"An error occurred during summarization: {e}")
         return f"Error generating summary: {str(e)}"
 
-def user_input(user_question):
+def _load_retriever():
+    """Loads the saved FAISS index and wraps it in a (cached) hybrid retriever."""
+    index_file = os.path.join(FAISS_INDEX_PATH, "index.faiss")
+    version = os.path.getmtime(index_file)
+    cached = _retriever_cache.get(FAISS_INDEX_PATH)
+    if cached and cached[0] == version:
+        return cached[1]
+    print("    -> Loading FAISS index...")
+    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=get_settings().gemini_api_key)
+    db = FAISS.load_local(FAISS_INDEX_PATH, embeddings, allow_dangerous_deserialization=True)
+    retriever = HybridRetriever(db, count_tokens=count_tokens)
+    _retriever_cache[FAISS_INDEX_PATH] = (version, retriever)
+    return retriever
+
+def _chunk_label(meta):
+    """Human-readable source label for a chunk, e.g. 'Annual Report, 2024, p. 12-13'."""
+    parts = [meta.get("doc_name"), meta.get("year")]
+    if meta.get("page_start"):
+        pages = f"p. {meta['page_start']}"
+        if meta.get("page_end", meta["page_start"]) != meta["page_start"]:
+            pages += f"-{meta['page_end']}"
+        parts.append(pages)
+    return ", ".join(str(part) for part in parts if part)
+
+def _answer_from_chunks(user_question, docs):
+    """Generates an answer grounded in the retrieved chunks, labelled with their sources."""
+    sections = []
+    for doc in docs:
+        label = _chunk_label(doc.metadata)
+        sections.append(f"[{label}]\n{doc.page_content}" if label else doc.page_content)
+    context = "\n\n".join(sections)
+
+    # Build the prompt and generate the response
+    model = genai.GenerativeModel('gemini-1.5-flash')
+    prompt = f"""
+    You are a financial analyst assistant. Answer the question as detailed as possible based *only* on the provided context below.
+    If the answer is not in the context, state that clearly and do not make up information.
+    When the context is labelled with a document, year or page, cite it.
+
+    CONTEXT:
+    ---
+    {context}
+    ---
+
+    QUESTION: {user_question}
+
+    DETAILED ANSWER:
+    """
+    
+    print("    -> Generating answer with Gemini...")
+    response = model.generate_content(prompt)
+    print("✅ DOC: Answer generated successfully.")
+    return response.text
+
+def user_input(user_question, k=DEFAULT_K, fetch_k=DEFAULT_FETCH_K, alpha=DEFAULT_ALPHA,
+               mmr_lambda=DEFAULT_MMR_LAMBDA, max_context_tokens=DEFAULT_MAX_CONTEXT_TOKENS, use_mmr=True):
     """
     Handles user queries against the document by retrieving relevant chunks and generating an answer.
+    Retrieval fuses BM25 and FAISS scores (alpha = vector weight), diversifies with MMR and
+    trims the context to max_context_tokens.
     """
     print(f"📄 DOC: Answering question: '{user_question}'")
-    if not GEMINI_API_KEY:
+    if not get_settings().gemini_api_key:
         return "Gemini API key is not configured."
         
     try:
         # Load the vector store and find relevant documents
-        print("    -> Loading FAISS index...")
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=GEMINI_API_KEY)
-        db = FAISS.load_local("faiss_index", embeddings, allow_dangerous_deserialization=True)
-        print("    -> Searching for relevant chunks...")
-        docs = db.similarity_search(user_question, k=5) # Retrieve top 5 relevant chunks
+        retriever = _load_retriever()
+        print("    -> Searching for relevant chunks (hybrid BM25 + vector, MMR)...")
+        docs = retriever.search(user_question, k=k, fetch_k=fetch_k, alpha=alpha, mmr_lambda=mmr_lambda,
+                                max_context_tokens=max_context_tokens, use_mmr=use_mmr)
         
-        context = "\n\n".join([doc.page_content for doc in docs])
         print(f"    -> Found {len(docs)} relevant chunks to form context.")
+        return _answer_from_chunks(user_question, docs)
         
-        # Build the prompt and generate the response
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""
-        You are a financial analyst assistant. Answer the question as detailed as possible based *only* on the provided context below.
-        If the answer is not in the context, state that clearly and do not make up information.
+    except Exception as e:
+        print(f"❌ DOC: Error during user query: {e}")
+        report_error(f"An error occurred while querying the document: {e}")
+        return f"Could not query the document. Ensure it was processed correctly. Error: {e}"
 
-        CONTEXT:
-        ---
-        {context}
-        ---
+# --- Multi-document corpus mode ---
 
-        QUESTION: {user_question}
+def get_corpus():
+    """Returns the process-wide document corpus, loading its manifest on first use."""
+    global _corpus
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001",
+                                                          google_api_key=get_settings().gemini_api_key)
+                _corpus = DocumentCorpus(embeddings, path=DEFAULT_CORPUS_PATH, count_tokens=count_tokens)
+    return _corpus
 
-        DETAILED ANSWER:
-        """
-        
-        print("    -> Generating answer with Gemini...")
-        response = model.generate_content(prompt)
-        print("✅ DOC: Answer generated successfully.")
-        return response.text
-        
+def add_document_to_corpus(doc_id, doc_name, year, pages):
+    """Chunks a document's pages and appends them to the corpus without touching older shards."""
+    if not get_settings().gemini_api_key:
+        report_error("Cannot add document to corpus. Gemini API key is missing.")
+        return False
+    try:
+        return get_corpus().add_document(doc_id, doc_name, year, get_document_chunks(pages))
     except Exception as e:
-        print(f"❌ DOC: Error during user query: {e}")
-        st.error(f"An error occurred while querying the document: {e}")
-        return f"Could not query the document. Ensure it was processed correctly. Error: {e}"
\ No newline at end of file
+        report_error(f"Error adding document to corpus: {e}")
+        print(f"[ERROR] Adding '{doc_name}' to corpus failed: {e}")
+        return False
+
+def corpus_user_input(user_question, doc_ids=None, years=None, k=DEFAULT_K, fetch_k=DEFAULT_FETCH_K,
+                      alpha=DEFAULT_ALPHA, mmr_lambda=DEFAULT_MMR_LAMBDA,
+                      max_context_tokens=DEFAULT_MAX_CONTEXT_TOKENS, use_mmr=True):
+    """
+    Answers a question across every document in the corpus, optionally restricted
+    to some document ids and/or years.
+    """
+    print(f"📚 CORPUS: Answering question: '{user_question}' (docs={doc_ids}, years={years})")
+    if not get_settings().gemini_api_key:
+        return "Gemini API key is not configured."
+    try:
+        docs = get_corpus().search(user_question, doc_ids=doc_ids, years=years, k=k, fetch_k=fetch_k, alpha=alpha,
+                                   mmr_lambda=mmr_lambda, max_context_tokens=max_context_tokens, use_mmr=use_mmr)
+        if not docs:
+            return "No documents in the corpus match the selected filters."
+        print(f"    -> Found {len(docs)} relevant chunks across the corpus.")
+        return _answer_from_chunks(user_question, docs)
+    except Exception as e:
+        print(f"❌ CORPUS: Error during corpus query: {e}")
+        report_error(f"An error occurred while querying the corpus: {e}")
+        return f"Could not query the corpus. Error: {e}"
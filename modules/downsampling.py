@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+# Price history ranges offered by the chart, as yfinance periods.
+PERIOD_OPTIONS = ["3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+PERIOD_LABELS = {"3mo": "3 Months", "6mo": "6 Months", "1y": "1 Year", "2y": "2 Years",
+                 "5y": "5 Years", "10y": "10 Years", "max": "All Time"}
+# Streamlit does not report a chart's rendered width to the server, so charts are reduced for
+# a nominal width: the price chart column of the wide layout on a ~1400 px wide window
+DEFAULT_TARGET_WIDTH_PX = 900
+PX_PER_CANDLE = 5               # Narrower candles are unreadable, so more bars only add payload
+PX_PER_POINT = 1                # Lines keep at most about one point per pixel
+# Bar sizes (pandas resample rule, label, approximate trading days per bar), finest first.
+OHLC_RULES = [("D", "daily", 1), ("W-FRI", "weekly", 5), ("ME", "monthly", 21), ("QE", "quarterly", 63)]
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of the n_out points
+    that best preserve the line's visual shape; the first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket i spans [bounds[i], bounds[i + 1]); the mean of the following bucket is fixed
+    # up front from prefix sums, so the loop only has to pick each bucket's best point.
+    bounds = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    next_ends = np.append(bounds[2:], n)
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_ends - bounds[1:]
+    avg_x = (x_sums[next_ends] - x_sums[bounds[1:]]) / counts
+    avg_y = (y_sums[next_ends] - y_sums[bounds[1:]]) / counts
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = bounds[i], bounds[i + 1]
+        xs, ys = x[start:end], y[start:end]
+        # Twice the triangle area spanned by the previous pick, each candidate and the next bucket's mean
+        area = np.abs((x[a] - avg_x[i]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+def downsample_line(series: pd.Series, target_width_px: int = DEFAULT_TARGET_WIDTH_PX) -> pd.Series:
+    """LTTB-downsamples a time-indexed series to about one point per pixel."""
+    n_out = max(3, target_width_px // PX_PER_POINT)
+    if len(series) <= n_out:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(), n_out)]
+
+def resample_ohlc(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Aggregates OHLC(V) bars to a coarser period; bars are labelled by their last trading day."""
+    aggregation = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}
+    if "Volume" in df.columns:
+        aggregation["Volume"] = "sum"
+    # The last trading day of each bar is aggregated in the same resampling pass
+    bars = df[list(aggregation)].assign(_last_day=df.index).resample(rule).agg({**aggregation, "_last_day": "max"})
+    return bars.dropna(subset=["Close"]).set_index("_last_day").rename_axis(None)
+
+def downsample_ohlc(df: pd.DataFrame, target_width_px: int = DEFAULT_TARGET_WIDTH_PX) -> tuple[pd.DataFrame, str]:
+    """
+    Picks the finest bar size (daily, weekly, monthly, quarterly) whose bar count fits the
+    target width at PX_PER_CANDLE and returns (bars, bar size label).
+    """
+    max_bars = max(1, target_width_px // PX_PER_CANDLE)
+    # The bar count of each rule is estimated from trading days, so only one resample runs
+    rule, label, _ = next((r for r in OHLC_RULES if len(df) / r[2] <= max_bars), OHLC_RULES[-1])
+    return (df if rule == "D" else resample_ohlc(df, rule)), label
+
+def payload_bytes(fig) -> int:
+    """Size of the figure JSON that Streamlit ships to the browser."""
+    return len(fig.to_json())
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+    import plotly.graph_objects as go
+
+    rng = np.random.default_rng(7)
+    n_days = 252 * 25
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_days)))
+    spread = close * rng.uniform(0.002, 0.02, n_days)
+    history = pd.DataFrame(
+        {"Open": close + rng.normal(0, 0.3, n_days) * spread, "High": close + spread,
+         "Low": close - spread, "Close": close, "Volume": rng.integers(1e5, 1e7, n_days)},
+        index=pd.bdate_range("2000-01-03", periods=n_days),
+    )
+
+    def full_figure(df):
+        return go.Figure(data=[go.Candlestick(x=df.index, open=df["Open"], high=df["High"], low=df["Low"], close=df["Close"])])
+
+    def downsample(df):
+        bars, label = downsample_ohlc(df)
+        return bars, label, downsample_line(df["Close"]) if len(bars) < len(df) else None
+
+    def downsampled_figure(df, frames=None):
+        bars, _, line = frames or downsample(df)
+        fig = go.Figure(data=[go.Candlestick(x=bars.index, open=bars["Open"], high=bars["High"], low=bars["Low"], close=bars["Close"])])
+        if line is not None:
+            fig.add_trace(go.Scattergl(x=line.index, y=line.values, mode="lines", name="Close"))
+        return fig
+
+    # "reused": the downsampled frames come from a cache (as in visualizations.downsample_chart_data)
+    print(f"{'period':>7} {'days':>6} {'candles drawn':>14} {'full KB':>8} {'full ms':>8} {'down KB':>8} {'down ms':>8} {'reused ms':>10}")
+    for period, days in (("1y", 252), ("2y", 504), ("5y", 1260), ("10y", 2520), ("max", n_days)):
+        df = history.iloc[-days:]
+        frames = downsample(df)
+        timings = {}
+        for name, build in (("full", full_figure), ("down", downsampled_figure),
+                            ("reused", lambda df: downsampled_figure(df, frames))):
+            start = time.perf_counter()
+            for _ in range(5):
+                size = payload_bytes(build(df))
+            timings[name] = ((time.perf_counter() - start) * 1000 / 5, size / 1024)
+        bars, label, _ = frames
+        print(f"{period:>7} {days:>6} {f'{len(bars)} {label}':>14} {timings['full'][1]:>8.0f} {timings['full'][0]:>8.1f} "
+              f"{timings['down'][1]:>8.0f} {timings['down'][0]:>8.1f} {timings['reused'][0]:>10.1f}")
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+import plotly.graph_objects as go
+import plotly.io as pio
+from .cache import get_cache
+
+# --- Configuration ---
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Total size of cached figure JSON before LRU eviction
+SHARED_FIGURE_TTL_SECONDS = 60 * 60        # Lifetime of figures published to a shared cache backend
+
+class FigureCache:
+    """
+    Process-wide LRU cache of serialized Plotly figures keyed by
+    (chart type, ticker/filter key, data version, theme).
+
+    A figure is rebuilt only when its data version changes; storing a new version drops
+    the superseded ones for the same chart. Entries are kept as JSON so their size is
+    known (eviction is by total bytes) and every hit returns an independent figure,
+    rebuilt without Plotly's property validation. When the process cache backend is
+    shared (disk or SQLite), figures built by one process are reused by the others.
+    """
+    def __init__(self, max_bytes: int = FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remove(self, cache_key):
+        self._bytes -= len(self._entries.pop(cache_key))
+
+    def get_or_build(self, chart_type: str, key: Hashable, data_version: Hashable,
+                     build: Callable[[], Optional[go.Figure]], theme: Optional[str] = None) -> Optional[go.Figure]:
+        """
+        Returns the cached figure for this data version, or calls build() and caches its result.
+        A build returning None (e.g. no data) is not cached.
+        """
+        theme = theme or pio.templates.default
+        cache_key = (chart_type, key, data_version, theme)
+        with self._lock:
+            spec = self._entries.get(cache_key)
+            if spec is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if spec is not None:
+            return go.Figure(json.loads(spec), _validate=False)
+
+        backend = get_cache()
+        shared_key = hashlib.sha256(repr(cache_key).encode("utf-8")).hexdigest() if backend.shared else None
+        if shared_key:
+            _, spec = backend.get("figures", shared_key)
+        if spec is not None:
+            fig = go.Figure(json.loads(spec), _validate=False)
+        else:
+            fig = build()
+            if fig is None:
+                return None
+            spec = pio.to_json(fig, validate=False)
+            if shared_key:
+                try:
+                    backend.set("figures", shared_key, spec, SHARED_FIGURE_TTL_SECONDS)
+                except Exception as e:
+                    print(f"[WARN] FIGURE CACHE: Could not publish figure to the shared cache: {e}")
+        with self._lock:
+            for stale_key in [k for k in self._entries if k[:2] == cache_key[:2] and k != cache_key]:
+                self._remove(stale_key)
+            if cache_key in self._entries:
+                self._remove(cache_key)
+            if len(spec) <= self.max_bytes:
+                self._entries[cache_key] = spec
+                self._bytes += len(spec)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+# Shared by every session of the Streamlit process
+figure_cache = FigureCache()
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    cache = FigureCache()
+    print(f"{'bars':>7} {'JSON KB':>8} {'build ms':>9} {'hit ms':>7}")
+    for n_bars in (60, 1_000, 10_000):
+        close = 100 + np.cumsum(rng.normal(size=n_bars))
+        prices = pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close},
+            index=pd.date_range("2000-01-03", periods=n_bars, freq="B"),
+        )
+
+        def build():
+            fig = go.Figure(data=[go.Candlestick(x=prices.index, open=prices['Open'], high=prices['High'],
+                                                 low=prices['Low'], close=prices['Close'], name='Price')])
+            fig.update_layout(title="Benchmark", xaxis_rangeslider_visible=False, template="plotly_dark")
+            return fig
+
+        runs = 10
+        start = time.perf_counter()
+        for _ in range(runs):
+            pio.to_json(build(), validate=False)
+        build_ms = (time.perf_counter() - start) * 1000 / runs
+        cache.get_or_build("candlestick", ("BENCH", n_bars), 1, build)
+        start = time.perf_counter()
+        for _ in range(runs):
+            cache.get_or_build("candlestick", ("BENCH", n_bars), 1, build)
+        hit_ms = (time.perf_counter() - start) * 1000 / runs
+        print(f"{n_bars:>7} {cache.stats()['bytes'] / 1024:>8.0f} {build_ms:>9.1f} {hit_ms:>7.1f}")
+        cache.clear()
@@ -0,0 +1,139 @@
+import http.server
+import json
+import random
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+from urllib.parse import parse_qs, urlparse
+
+# --- Configuration ---
+FIXTURE_PATH = "/api/v1/company-news"
+
+def record_fixtures(client, tickers: Iterable[str], start: date, end: date, path: str) -> Dict[str, List[Dict]]:
+    """Records real company_news responses (a finnhub.Client) to a JSON file for replay."""
+    fixtures = {ticker: client.company_news(ticker, _from=start.isoformat(), to=end.isoformat()) for ticker in tickers}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f)
+    return fixtures
+
+def load_fixtures(path: str) -> Dict[str, List[Dict]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def synthetic_fixtures(tickers: Iterable[str], start: date, end: date, per_day: int = 3, seed: int = 7) -> Dict[str, List[Dict]]:
+    """Deterministic Finnhub-shaped articles for every ticker and day in [start, end]."""
+    rng = random.Random(seed)
+    fixtures = {}
+    for ticker in tickers:
+        articles = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+            for i in range(per_day):
+                articles.append({
+                    "category": "company", "datetime": int(midnight + rng.randint(0, 86_399)),
+                    "headline": f"{ticker} headline {day.isoformat()} #{i}", "id": rng.randint(1, 10 ** 9),
+                    "image": "", "related": ticker, "source": rng.choice(["Reuters", "Bloomberg", "CNBC"]),
+                    "summary": f"Summary of {ticker} story {i} on {day.isoformat()}.",
+                    "url": f"https://example.com/{ticker}/{day.isoformat()}/{i}",
+                })
+        fixtures[ticker] = sorted(articles, key=lambda a: a["datetime"], reverse=True)
+    return fixtures
+
+class FinnhubFixtureServer:
+    """
+    Local HTTP server that replays recorded company-news fixtures with Finnhub's API shape,
+    so FinnhubNewsClient can be exercised (base_url=server.url) without a key or network.
+    It filters by the from/to query like the real API, can add latency, and answers 429
+    (with Retry-After) once more than quota_per_minute requests arrive within a minute;
+    tests can shorten that window with quota_window. Every served request is logged in
+    .requests as (symbol, from, to).
+    """
+    def __init__(self, fixtures: Dict[str, List[Dict]], latency: float = 0.0, quota_per_minute: int = None,
+                 quota_window: float = 60.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.quota_window = quota_window
+        self.requests: List[tuple] = []
+        self.rate_limited = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/v1"
+
+    def _retry_after(self) -> float:
+        """0 if the request is within quota (and counts it), else seconds until a slot frees up."""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > self.quota_window:
+                self._recent.popleft()
+            if self.quota_per_minute is not None and len(self._recent) >= self.quota_per_minute:
+                self.rate_limited += 1
+                return self.quota_window - (now - self._recent[0])
+            self._recent.append(now)
+            return 0.0
+
+    def _articles(self, symbol: str, start: str, end: str) -> List[Dict]:
+        first = datetime.fromisoformat(start).replace(tzinfo=timezone.utc).timestamp()
+        last = datetime.fromisoformat(end).replace(tzinfo=timezone.utc).timestamp() + 24 * 60 * 60
+        return [a for a in self.fixtures.get(symbol, []) if first <= a["datetime"] < last]
+
+    def _handler(self):
+        fixture_server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status, payload, headers=()):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if fixture_server.latency:
+                    time.sleep(fixture_server.latency)
+                # finnhub.Client joins API_URL and "/company-news" with a double slash
+                if "/" + "/".join(filter(None, url.path.split("/"))) != FIXTURE_PATH:
+                    return self._send(404, {"error": "Not found"})
+                retry_after = fixture_server._retry_after()
+                if retry_after:
+                    return self._send(429, {"error": "API limit reached. Please try again later."},
+                                      [("Retry-After", f"{retry_after:.2f}")])
+                symbol, start, end = query.get("symbol", ""), query.get("from"), query.get("to")
+                with fixture_server._lock:
+                    fixture_server.requests.append((symbol, start, end))
+                self._send(200, fixture_server._articles(symbol, start, end))
+
+            def log_message(self, *_):
+                pass
+
+        return Handler
+
+    def start(self) -> "FinnhubFixtureServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="finnhub-fixtures", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from .lazy_imports import lazy_import
+
+# --- Configuration ---
+DEFAULT_CACHE_PATH = os.environ.get("FINCHAT_FINNHUB_CACHE_PATH", "finnhub_cache.db")
+REQUESTS_PER_MINUTE = 60          # Finnhub free-tier quota
+BURST = 10                        # Requests allowed back-to-back before the bucket throttles
+RECENT_TTL_SECONDS = 15 * 60      # Days that may still receive articles are refetched after this
+FINAL_AFTER_SECONDS = 24 * 60 * 60  # A day is treated as complete this long after it ends (UTC)
+MAX_RETRIES = 3                   # Retries of a rate-limited (429) request
+FAN_OUT_WORKERS = 8
+
+finnhub = lazy_import("finnhub")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS company_news_days (
+    ticker TEXT NOT NULL,
+    day TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    articles TEXT NOT NULL,
+    PRIMARY KEY (ticker, day)
+);
+"""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at rate_per_minute, holds at most burst tokens.
+    acquire() blocks until a token is available, so callers sharing a bucket stay within
+    the quota however many threads they run on.
+    """
+    def __init__(self, rate_per_minute: float = REQUESTS_PER_MINUTE, burst: int = BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes one token, sleeping as needed. Returns the time spent waiting (s)."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+def _day_range(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+def _contiguous_runs(days: List[date]) -> List[Tuple[date, date]]:
+    """Groups sorted days into (first, last) runs of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+def _article_day(article: Dict) -> Optional[date]:
+    timestamp = article.get("datetime")
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date() if timestamp else None
+
+class FinnhubNewsClient:
+    """
+    Wrapper around finnhub.Client.company_news that caches responses per (ticker, UTC day)
+    in SQLite and only requests days it does not hold yet: overlapping windows (this
+    week, then this week again tomorrow) cost one request for the new days. Consecutive
+    missing days are fetched in one request. Every request takes a token from a shared
+    TokenBucket, and 429 responses are retried after the bucket's refill interval.
+    Days that can still receive articles (today, yesterday) are refetched after
+    RECENT_TTL_SECONDS.
+    """
+    def __init__(self, api_key: str = None, client: "finnhub.Client" = None, base_url: str = None,
+                 cache_path: str = DEFAULT_CACHE_PATH, bucket: TokenBucket = None):
+        self.client = client or finnhub.Client(api_key=api_key)
+        if base_url:
+            self.client.API_URL = base_url
+        self.bucket = bucket or TokenBucket()
+        self.cache_path = cache_path
+        self.requests_made = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (fan-out requests write from pool threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _is_fresh(self, day: date, fetched_at: float, now: float) -> bool:
+        day_end = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() + 24 * 60 * 60
+        return fetched_at >= day_end + FINAL_AFTER_SECONDS or now - fetched_at < RECENT_TTL_SECONDS
+
+    def _cached_days(self, ticker: str, start: date, end: date) -> Dict[date, List[Dict]]:
+        """Fresh cached days in [start, end] -> their articles."""
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT day, fetched_at, articles FROM company_news_days WHERE ticker = ? AND day BETWEEN ? AND ?",
+            (ticker, start.isoformat(), end.isoformat()),
+        ).fetchall()
+        cached = {}
+        for day_text, fetched_at, articles in rows:
+            day = date.fromisoformat(day_text)
+            if self._is_fresh(day, fetched_at, now):
+                cached[day] = json.loads(articles)
+        return cached
+
+    def _request(self, ticker: str, start: date, end: date) -> List[Dict]:
+        for attempt in range(MAX_RETRIES + 1):
+            self.bucket.acquire()
+            try:
+                self.requests_made += 1
+                return self.client.company_news(ticker, _from=start.isoformat(), to=end.isoformat())
+            except finnhub.FinnhubAPIException as e:
+                if e.status_code != 429 or attempt == MAX_RETRIES:
+                    raise
+                retry_after = e.response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after else 1 / self.bucket.rate
+                print(f"[WARN] FINNHUB: Rate limited on {ticker}, retrying in {delay:.1f} s.")
+                time.sleep(delay)
+
+    def _fetch_run(self, ticker: str, start: date, end: date) -> Dict[date, List[Dict]]:
+        """Fetches [start, end] and stores every day in it (empty days too, so they are not refetched)."""
+        by_day = {day: [] for day in _day_range(start, end)}
+        for article in self._request(ticker, start, end) or []:
+            day = _article_day(article)
+            if day in by_day:
+                by_day[day].append(article)
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO company_news_days VALUES (?, ?, ?, ?)",
+                [(ticker, day.isoformat(), now, json.dumps(articles)) for day, articles in by_day.items()],
+            )
+        return by_day
+
+    def company_news(self, ticker: str, start: date, end: date) -> List[Dict]:
+        """Articles for ticker between start and end (inclusive, UTC days), newest first."""
+        by_day = self._cached_days(ticker, start, end)
+        missing = [day for day in _day_range(start, end) if day not in by_day]
+        for run_start, run_end in _contiguous_runs(missing):
+            by_day.update(self._fetch_run(ticker, run_start, run_end))
+        articles = [article for day_articles in by_day.values() for article in day_articles]
+        return sorted(articles, key=lambda a: a.get("datetime") or 0, reverse=True)
+
+    def company_news_many(self, tickers: Iterable[str], start: date, end: date,
+                          max_workers: int = FAN_OUT_WORKERS) -> Dict[str, List[Dict]]:
+        """
+        company_news for many tickers concurrently. The shared bucket still caps the request
+        rate, so concurrency only overlaps request latency. A ticker whose fetch fails maps
+        to an empty list.
+        """
+        tickers = list(dict.fromkeys(tickers))
+
+        def fetch(ticker):
+            try:
+                return self.company_news(ticker, start, end)
+            except Exception as e:
+                print(f"[WARN] FINNHUB: News fetch failed for {ticker}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finnhub") as pool:
+            return dict(zip(tickers, pool.map(fetch, tickers)))
+
+# Example Usage (for benchmarking): replays recorded fixtures through the local server
+if __name__ == '__main__':
+    import tempfile
+    from .finnhub_fixtures import FinnhubFixtureServer, synthetic_fixtures
+
+    tickers = [f"TICK{i}" for i in range(40)]
+    end = datetime.now(timezone.utc).date() - timedelta(days=2)
+    with FinnhubFixtureServer(synthetic_fixtures(tickers, end - timedelta(days=30), end),
+                              latency=0.2, quota_per_minute=600) as server:
+        news = FinnhubNewsClient(api_key="fixture", base_url=server.url,
+                                 cache_path=os.path.join(tempfile.mkdtemp(), "finnhub.db"),
+                                 bucket=TokenBucket(rate_per_minute=600, burst=20))
+        start_time = time.perf_counter()
+        for ticker in tickers[:10]:
+            news.company_news(ticker, end - timedelta(days=6), end)
+        sequential = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        results = news.company_news_many(tickers[10:], end - timedelta(days=6), end)
+        fan_out = time.perf_counter() - start_time
+        print(f"7-day window: 10 tickers sequential {sequential:.2f} s, 30 tickers fanned out {fan_out:.2f} s "
+              f"({sum(map(len, results.values()))} articles)")
+
+        before = news.requests_made
+        start_time = time.perf_counter()
+        news.company_news_many(tickers, end - timedelta(days=8), end)
+        print(f"Shifted 9-day window over all {len(tickers)} tickers: {news.requests_made - before} requests "
+              f"(2 new days each) in {time.perf_counter() - start_time:.2f} s; server saw "
+              f"{server.rate_limited} rate-limited requests")
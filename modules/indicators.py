@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+SMA_WINDOWS = (20, 50)
+EMA_SPAN = 20
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_WINDOW, BOLLINGER_STD = 20, 2.0
+ATR_PERIOD = 14
+# Rows of history a rolling-window indicator needs to recompute a new bar.
+MAX_WINDOW = max(*SMA_WINDOWS, BOLLINGER_WINDOW)
+
+# Overlays drawn on the price panel vs. indicators drawn in their own panel below it.
+PRICE_OVERLAYS = ("SMA 20", "SMA 50", "EMA 20", "Bollinger Bands", "VWAP")
+PANEL_INDICATORS = ("RSI", "MACD", "ATR")
+INDICATOR_OPTIONS = PRICE_OVERLAYS + PANEL_INDICATORS
+
+# --- Rolling-window indicators ---
+
+def sma(values: pd.Series, window: int) -> pd.Series:
+    return values.rolling(window, min_periods=window).mean()
+
+def bollinger_bands(close: pd.Series, window: int = BOLLINGER_WINDOW, num_std: float = BOLLINGER_STD) -> pd.DataFrame:
+    rolling = close.rolling(window, min_periods=window)
+    mid, std = rolling.mean(), rolling.std(ddof=0)
+    return pd.DataFrame({"BB_mid": mid, "BB_upper": mid + num_std * std, "BB_lower": mid - num_std * std})
+
+# --- Recursive (exponentially smoothed) indicators ---
+
+def ema(values: pd.Series, span: int = None, alpha: float = None) -> pd.Series:
+    """Exponential moving average seeded with the first value (pandas adjust=False)."""
+    return values.ewm(span=span, alpha=alpha, adjust=False).mean()
+
+def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    previous_close = close.shift(1)
+    ranges = np.maximum(high - low, np.maximum((high - previous_close).abs(), (low - previous_close).abs()))
+    return ranges.fillna(high - low)
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+def compute_indicators(ohlcv: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Computes every indicator over an OHLC(V) frame. Returns (indicators, state), where state
+    holds the last value of each recursive smoother so update_indicators() can continue
+    from it. RSI and ATR use Wilder smoothing (alpha = 1 / period); VWAP is anchored to
+    the first bar and needs a Volume column.
+    """
+    close, high, low = ohlcv["Close"], ohlcv["High"], ohlcv["Low"]
+    out = pd.DataFrame(index=ohlcv.index)
+    for window in SMA_WINDOWS:
+        out[f"SMA_{window}"] = sma(close, window)
+    out[f"EMA_{EMA_SPAN}"] = ema(close, span=EMA_SPAN)
+    out = out.join(bollinger_bands(close))
+
+    change = close.diff()
+    avg_gain = ema(change.clip(lower=0), alpha=1 / RSI_PERIOD)
+    avg_loss = ema(-change.clip(upper=0), alpha=1 / RSI_PERIOD)
+    out[f"RSI_{RSI_PERIOD}"] = _rsi_from_averages(avg_gain, avg_loss)
+
+    ema_fast, ema_slow = ema(close, span=MACD_FAST), ema(close, span=MACD_SLOW)
+    out["MACD"] = ema_fast - ema_slow
+    out["MACD_signal"] = ema(out["MACD"], span=MACD_SIGNAL)
+    out["MACD_hist"] = out["MACD"] - out["MACD_signal"]
+
+    atr = ema(true_range(high, low, close), alpha=1 / ATR_PERIOD)
+    out[f"ATR_{ATR_PERIOD}"] = atr
+
+    state = {
+        "last_close": close.iloc[-1], "ema": out[f"EMA_{EMA_SPAN}"].iloc[-1],
+        "avg_gain": avg_gain.iloc[-1], "avg_loss": avg_loss.iloc[-1],
+        "ema_fast": ema_fast.iloc[-1], "ema_slow": ema_slow.iloc[-1],
+        "macd_signal": out["MACD_signal"].iloc[-1], "atr": atr.iloc[-1],
+    }
+    if "Volume" in ohlcv.columns:
+        price_volume = ((high + low + close) / 3 * ohlcv["Volume"]).cumsum()
+        volume = ohlcv["Volume"].cumsum()
+        out["VWAP"] = price_volume / volume.replace(0, np.nan)
+        state.update(cum_price_volume=price_volume.iloc[-1], cum_volume=volume.iloc[-1])
+    return out, state
+
+def _continue_ewm(values: np.ndarray, alpha: float, last: float) -> np.ndarray:
+    """Continues an adjust=False EWM from its last value over a few new observations."""
+    result = np.empty(len(values))
+    for i, value in enumerate(values):
+        if np.isnan(last):
+            last = value
+        elif not np.isnan(value):
+            last = (1 - alpha) * last + alpha * value
+        result[i] = last
+    return result
+
+def _tail_windows(values: np.ndarray, window: int, n_new: int) -> np.ndarray:
+    """The trailing windows ending at each of the last n_new values (NaN-padded if history is short)."""
+    if len(values) < window + n_new - 1:
+        values = np.concatenate((np.full(window + n_new - 1 - len(values), np.nan), values))
+    return np.lib.stride_tricks.sliding_window_view(values, window)[-n_new:]
+
+def update_indicators(ohlcv: pd.DataFrame, indicators: pd.DataFrame, state: dict, new_bars: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Appends new bars and computes indicators for those rows only: rolling indicators from
+    the last MAX_WINDOW rows of history, recursive ones from the saved smoother state.
+    Returns (ohlcv, indicators, state), matching a full compute_indicators() on the result.
+    Only for append-only histories: the app's period-windowed price fetches drop their
+    oldest bar as they gain one, which reseeds every smoother, so they use compute_indicators().
+    """
+    if new_bars.empty:
+        return ohlcv, indicators, state
+    n_new = len(new_bars)
+    new_close = new_bars["Close"].to_numpy(dtype=float)
+    # Plain NumPy over the short tail: pandas' per-call overhead would dominate at this size
+    tail_close = np.concatenate((ohlcv["Close"].to_numpy(dtype=float)[-(MAX_WINDOW - 1):], new_close))
+    out = {}
+    for window in SMA_WINDOWS:
+        out[f"SMA_{window}"] = _tail_windows(tail_close, window, n_new).mean(axis=1)
+    windows = _tail_windows(tail_close, BOLLINGER_WINDOW, n_new)
+    mid, std = windows.mean(axis=1), windows.std(axis=1)
+    out["BB_mid"], out["BB_upper"], out["BB_lower"] = mid, mid + BOLLINGER_STD * std, mid - BOLLINGER_STD * std
+
+    previous_close = np.concatenate(([state["last_close"]], new_close[:-1]))
+    change = new_close - previous_close
+    state = dict(state)
+    ema_values = _continue_ewm(new_close, 2 / (EMA_SPAN + 1), state["ema"])
+    avg_gain = _continue_ewm(np.clip(change, 0, None), 1 / RSI_PERIOD, state["avg_gain"])
+    avg_loss = _continue_ewm(np.clip(-change, 0, None), 1 / RSI_PERIOD, state["avg_loss"])
+    ema_fast = _continue_ewm(new_close, 2 / (MACD_FAST + 1), state["ema_fast"])
+    ema_slow = _continue_ewm(new_close, 2 / (MACD_SLOW + 1), state["ema_slow"])
+    macd = ema_fast - ema_slow
+    macd_signal = _continue_ewm(macd, 2 / (MACD_SIGNAL + 1), state["macd_signal"])
+    new_high, new_low = new_bars["High"].to_numpy(dtype=float), new_bars["Low"].to_numpy(dtype=float)
+    ranges = np.maximum(new_high - new_low, np.maximum(np.abs(new_high - previous_close), np.abs(new_low - previous_close)))
+    atr = _continue_ewm(ranges, 1 / ATR_PERIOD, state["atr"])
+
+    out[f"EMA_{EMA_SPAN}"] = ema_values
+    out[f"RSI_{RSI_PERIOD}"] = _rsi_from_averages(avg_gain, avg_loss)
+    out["MACD"], out["MACD_signal"], out["MACD_hist"] = macd, macd_signal, macd - macd_signal
+    out[f"ATR_{ATR_PERIOD}"] = atr
+    state.update(last_close=new_close[-1], ema=ema_values[-1], avg_gain=avg_gain[-1], avg_loss=avg_loss[-1],
+                 ema_fast=ema_fast[-1], ema_slow=ema_slow[-1], macd_signal=macd_signal[-1], atr=atr[-1])
+    if "cum_volume" in state:
+        price_volume = state["cum_price_volume"] + np.cumsum((new_high + new_low + new_close) / 3 * new_bars["Volume"].to_numpy(dtype=float))
+        volume = state["cum_volume"] + np.cumsum(new_bars["Volume"].to_numpy(dtype=float))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["VWAP"] = np.where(volume > 0, price_volume / volume, np.nan)
+        state.update(cum_price_volume=price_volume[-1], cum_volume=volume[-1])
+
+    out = pd.DataFrame(out, index=new_bars.index)[indicators.columns]
+    return pd.concat([ohlcv, new_bars]), pd.concat([indicators, out]), state
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+    from .database import COMPREHENSIVE_STOCKS_DATABASE
+
+    tickers = list(COMPREHENSIVE_STOCKS_DATABASE["INDIAN_STOCKS"]) + list(COMPREHENSIVE_STOCKS_DATABASE["US_STOCKS"])
+    rng = np.random.default_rng(11)
+    n_days = 252 * 10
+    index = pd.bdate_range("2015-01-01", periods=n_days)
+    histories = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_days)))
+        spread = close * rng.uniform(0.002, 0.02, n_days)
+        histories[ticker] = pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread,
+                                          "Close": close, "Volume": rng.integers(1e5, 1e7, n_days).astype(float)}, index=index)
+
+    compute_indicators(histories[tickers[0]])  # warm-up
+    start = time.perf_counter()
+    results = {ticker: compute_indicators(df) for ticker, df in histories.items()}
+    elapsed = time.perf_counter() - start
+    print(f"Full compute: {len(tickers)} tickers x {n_days} bars in {elapsed * 1000:.0f} ms ({elapsed * 1000 / len(tickers):.1f} ms per ticker)")
+
+    # Incremental: compute on all but the last bar, then append it
+    df = histories[tickers[0]]
+    base, state = compute_indicators(df.iloc[:-1])
+    start = time.perf_counter()
+    runs = 200
+    for _ in range(runs):
+        _, updated, _ = update_indicators(df.iloc[:-1], base, state, df.iloc[-1:])
+    incremental_ms = (time.perf_counter() - start) * 1000 / runs
+    full = results[tickers[0]][0]
+    max_error = float(np.nanmax(np.abs(updated.to_numpy() - full.to_numpy())))
+    print(f"Incremental append of 1 bar: {incremental_ms:.2f} ms (max deviation from full recompute {max_error:.2e})")
@@ -0,0 +1,68 @@
+import importlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Every facade created by lazy_import(), for import_report()
+_registry: List["LazyImport"] = []
+
+class LazyImport:
+    """
+    Stands in for a heavy module (or one attribute of it, e.g. a class) and imports it on
+    first use: attribute access and calls are forwarded to the real object. on_load runs once
+    with the imported module (e.g. to configure an API key). Thread-safe.
+    """
+    def __init__(self, module: str, attribute: str = None, on_load: Optional[Callable] = None):
+        self._module, self._attribute, self._on_load = module, attribute, on_load
+        self._target = None
+        self._lock = threading.Lock()
+        self.load_ms = None
+
+    @property
+    def target_name(self) -> str:
+        return f"{self._module}.{self._attribute}" if self._attribute else self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def _load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._module)
+                    if self._on_load:
+                        self._on_load(module)
+                    target = getattr(module, self._attribute) if self._attribute else module
+                    self.load_ms = (time.perf_counter() - start) * 1000
+                    print(f"[INFO] Lazy import of {self.target_name} took {self.load_ms:.0f} ms.")
+                    self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)   # Keep copy/pickle/introspection probes from triggering the import
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<lazy {self.target_name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+def lazy_import(module: str, attribute: str = None, on_load: Optional[Callable] = None) -> LazyImport:
+    """A facade for `import module` (or `from module import attribute`) that defers the import to first use."""
+    facade = LazyImport(module, attribute, on_load)
+    _registry.append(facade)
+    return facade
+
+def import_report() -> List[Dict]:
+    """Every lazy dependency: whether any facade has loaded it yet and how long the first load took."""
+    report: Dict[str, Dict] = {}
+    for facade in _registry:
+        entry = report.setdefault(facade.target_name, {"target": facade.target_name, "loaded": False, "load_ms": None})
+        if facade.loaded:
+            entry["loaded"] = True
+            entry["load_ms"] = max(entry["load_ms"] or 0.0, facade.load_ms)
+    return [report[name] for name in sorted(report)]
@@ -0,0 +1,266 @@
+import asyncio
+import calendar
+import functools
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+from .dedup import NearDuplicateIndex
+from .lazy_imports import lazy_import
+from .news_store import NewsStore, article_id
+
+# --- Configuration ---
+POLL_INTERVAL_SECONDS = 15 * 60          # Normal refresh interval per feed
+MAX_BACKOFF_SECONDS = 6 * 60 * 60        # Cap for the exponential backoff of failing feeds
+REQUEST_TIMEOUT_SECONDS = 10
+MAX_CONNECTIONS = 32                     # Pooled keep-alive connections shared by a polling pass
+MAX_CONNECTIONS_PER_HOST = 16            # Every feed is on news.google.com; polite cap that still covers a pass in ~2 rounds
+WORKER_THREADS = 4                       # Threads for feedparser and news store writes, keeping blocking work off the event loop
+MAX_ARTICLES_PER_POLL = 10
+IDLE_CHECK_SECONDS = 5                   # Longest sleep between schedule checks
+LEASE_NAME = "news-ingester"             # Lease row in the news store; only its holder polls
+LEASE_TTL_SECONDS = 60                   # Renewed every loop; a crashed holder is replaced after this long
+LEASE_RETRY_SECONDS = 15                 # How often a standby ingester checks whether the lease is free
+USER_AGENT = "FinChat-NewsIngester/1.0"
+
+# Loaded by the ingester thread on its first poll, off the app's startup path
+aiohttp = lazy_import("aiohttp")
+feedparser = lazy_import("feedparser")
+
+def build_feed_url(company_name: str) -> str:
+    """Google News RSS search URL for a company."""
+    query = f'"{company_name}" stock financial earnings revenue'
+    return f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en"
+
+def normalize_entry(entry) -> Dict:
+    """Converts a feedparser entry into the app's news dict (plus link and timestamp)."""
+    published = entry.get("published_parsed")
+    return {
+        "date": datetime(*published[:6]).strftime("%Y-%m-%d") if published else "Recent",
+        "source": entry.source.title if 'source' in entry else "Google News",
+        "headline": entry.title,
+        "summary": entry.get("summary", "No summary available.").split('<')[0], # Clean up HTML tags
+        "link": entry.get("link"),
+        "published_ts": calendar.timegm(published) if published else None,
+    }
+
+def backoff_seconds(failures: int, interval: float = POLL_INTERVAL_SECONDS, cap: float = MAX_BACKOFF_SECONDS) -> float:
+    """Exponential backoff with +/-10% jitter so failing feeds do not retry in lockstep."""
+    return min(interval * 2 ** failures, cap) * random.uniform(0.9, 1.1)
+
+class NewsIngester:
+    """
+    Polls the news feed of every ticker on a schedule and writes normalized articles
+    into the NewsStore. Requests are conditional (ETag / If-Modified-Since), so unchanged
+    feeds cost a 304. Failing feeds back off exponentially, per feed.
+
+    All due feeds are fetched concurrently in one pass over a pooled aiohttp session
+    (keep-alive, capped per host), and XML parsing and store writes run in a thread pool,
+    so a pass takes roughly one feed's latency rather than the sum.
+
+    New articles are matched against a near-duplicate index of every stored headline
+    (rebuilt from the store on start), so syndicated copies of a story share a story_id
+    across tickers and sources. After each pass, stories whose articles the store has
+    pruned (it keeps MAX_ARTICLES_PER_TICKER per ticker) are evicted from the index.
+
+    Every app replica and API worker may start an ingester on the same store, but the
+    background loop only polls while holding the store's LEASE_NAME lease; the others
+    stand by and take over when the holder stops or its lease lapses.
+    """
+    def __init__(self, store: NewsStore, stocks: List[Dict], interval: float = POLL_INTERVAL_SECONDS):
+        self.store = store
+        self.interval = interval
+        self._workers = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="news-worker")
+        self._stop = threading.Event()
+        self._thread = None
+        self.lease_holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._standby = False
+        self._stories = self._load_stories()
+        for stock in stocks:
+            store.register_feed(stock["symbol"], build_feed_url(stock["name"]))
+
+    def _load_stories(self) -> NearDuplicateIndex:
+        stories = NearDuplicateIndex()
+        for story_id, headline, source in self.store.get_story_headlines():
+            stories.add(story_id, headline, source)
+        return stories
+
+    def _hold_lease(self) -> bool:
+        """Takes or renews the polling lease. On taking over from another process, reloads the story index."""
+        held = self.store.acquire_lease(LEASE_NAME, self.lease_holder, LEASE_TTL_SECONDS)
+        if held and self._standby:
+            self._stories = self._load_stories()
+            print(f"[INFO] NEWS: Ingester {self.lease_holder} took over polling.")
+        self._standby = not held
+        return held
+
+    def _assign_stories(self, ticker: str, articles: List[Dict]) -> List[Dict]:
+        """Tags each article with the story_id of an indexed near-duplicate, or its own id."""
+        for article in articles:
+            own_id = article_id(ticker, article)
+            article["story_id"] = self._stories.add(own_id, article["headline"], article.get("source")) or own_id
+        return articles
+
+    async def _off_loop(self, fn, *args, **kwargs):
+        """Runs blocking work (XML parsing, SQLite writes) on the worker threads."""
+        return await asyncio.get_running_loop().run_in_executor(self._workers, functools.partial(fn, *args, **kwargs))
+
+    async def _poll_feed(self, session: "aiohttp.ClientSession", feed: Dict) -> int:
+        """Fetches one feed and stores its new articles. Returns the number of new articles."""
+        ticker, now = feed["ticker"], time.time()
+        headers = {}
+        if feed.get("etag"):
+            headers["If-None-Match"] = feed["etag"]
+        if feed.get("modified"):
+            headers["If-Modified-Since"] = feed["modified"]
+        try:
+            async with session.get(feed["url"], headers=headers) as response:
+                if response.status == 304:
+                    await self._off_loop(self.store.update_feed, ticker, last_polled=now, last_status=304,
+                                         failures=0, next_poll_at=now + self.interval)
+                    return 0
+                response.raise_for_status()
+                body = await response.read()
+            parsed = await self._off_loop(feedparser.parse, body)
+            articles = self._assign_stories(ticker, [normalize_entry(e) for e in parsed.entries[:MAX_ARTICLES_PER_POLL]])
+            added = await self._off_loop(self.store.upsert_articles, ticker, articles)
+            await self._off_loop(
+                self.store.update_feed, ticker, etag=response.headers.get("ETag"), modified=response.headers.get("Last-Modified"),
+                last_polled=now, last_status=response.status, failures=0, next_poll_at=now + self.interval,
+            )
+            return added
+        except Exception as e:
+            failures = feed.get("failures", 0) + 1
+            await self._off_loop(self.store.update_feed, ticker, last_polled=now, last_status=getattr(e, "status", None),
+                                 failures=failures, next_poll_at=now + backoff_seconds(failures, self.interval))
+            print(f"[WARN] NEWS: Poll failed for {ticker} ({failures} in a row): {e}")
+            return 0
+
+    async def _poll_all(self, feeds: List[Dict]) -> Dict[str, int]:
+        connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}) as session:
+            counts = await asyncio.gather(*(self._poll_feed(session, feed) for feed in feeds))
+        return {feed["ticker"]: count for feed, count in zip(feeds, counts)}
+
+    def poll(self, feeds: List[Dict]) -> Dict[str, int]:
+        """Polls the given feeds concurrently. Returns {ticker: new articles}."""
+        if not feeds:
+            return {}
+        results = asyncio.run(self._poll_all(feeds))
+        if any(results.values()):
+            self.prune_stories()
+        return results
+
+    def prune_stories(self) -> int:
+        """Evicts index entries of stories no longer in the store. Returns the number evicted."""
+        return self._stories.retain(self.store.get_story_ids())
+
+    def run_once(self) -> Dict[str, int]:
+        """Polls every feed that is due."""
+        return self.poll(self.store.due_feeds())
+
+    def refresh_all(self) -> Dict[str, int]:
+        """Polls every registered feed now, regardless of schedule (conditional requests still apply)."""
+        return self.poll(self.store.due_feeds(now=float("inf")))
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                if not self._hold_lease():
+                    self._stop.wait(LEASE_RETRY_SECONDS)
+                    continue
+                results = self.run_once()
+                if results:
+                    print(f"[INFO] NEWS: Polled {len(results)} feeds, {sum(results.values())} new articles.")
+                next_due = self.store.next_due_at() or time.time() + self.interval
+                self._stop.wait(max(0.0, min(next_due - time.time(), IDLE_CHECK_SECONDS)))
+        finally:
+            self.store.release_lease(LEASE_NAME, self.lease_holder)
+
+    def start(self):
+        """Starts the polling loop on a daemon thread (idempotent); it polls only while holding the lease."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-ingester", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._workers.shutdown(wait=False)
+
+# Run standalone: python -m modules.news_ingester [--once | --all | --benchmark]
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+    from .database import COMPREHENSIVE_STOCKS_DATABASE
+
+    parser = argparse.ArgumentParser(description="Poll news feeds for every ticker into the local news store.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="Poll due feeds once and exit instead of looping.")
+    mode.add_argument("--all", action="store_true", help="Refresh every feed now and exit.")
+    mode.add_argument("--benchmark", action="store_true",
+                      help="Compare sequential vs. concurrent refresh against a local feed server with simulated latency.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated per-request latency for --benchmark (s).")
+    args = parser.parse_args()
+
+    stocks = [{**data, "symbol": symbol} for market in ("INDIAN_STOCKS", "US_STOCKS")
+              for symbol, data in COMPREHENSIVE_STOCKS_DATABASE.get(market, {}).items()]
+
+    if args.benchmark:
+        import http.server
+        import requests
+
+        item = "<item><title>{0} headline {1}</title><link>http://example.com/{0}/{1}</link></item>"
+        class SlowFeedHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def do_GET(self):
+                time.sleep(args.latency)
+                body = ("<rss version='2.0'><channel>" + "".join(item.format(self.path, i) for i in range(20))
+                        + "</channel></rss>").encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *_):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowFeedHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        workdir = tempfile.mkdtemp()
+        store = NewsStore(os.path.join(workdir, "news.db"))
+        ingester = NewsIngester(store, stocks)
+        for stock in stocks:
+            store.register_feed(stock["symbol"], f"http://127.0.0.1:{server.server_port}/{stock['symbol']}")
+
+        start = time.perf_counter()
+        with requests.Session() as session:
+            for stock in stocks:
+                feedparser.parse(session.get(f"http://127.0.0.1:{server.server_port}/{stock['symbol']}").content)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        results = ingester.refresh_all()
+        concurrent = time.perf_counter() - start
+        print(f"{len(stocks)} feeds at {args.latency * 1000:.0f} ms latency: sequential {sequential:.2f} s, "
+              f"concurrent {concurrent:.2f} s ({sum(results.values())} articles stored)")
+        server.shutdown()
+    else:
+        ingester = NewsIngester(NewsStore(), stocks)
+        if args.once or args.all:
+            start = time.perf_counter()
+            results = ingester.refresh_all() if args.all else ingester.run_once()
+            print(f"Polled {len(results)} feeds in {time.perf_counter() - start:.1f} s, {sum(results.values())} new articles.")
+        else:
+            ingester.start()
+            try:
+                while True:
+                    time.sleep(60)
+            except KeyboardInterrupt:
+                ingester.stop()
@@ -1,29 +1,30 @@
-import os
 import pandas as pd
-import plotly.express as px
-import finnhub
-import google.generativeai as genai
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
-import streamlit as st
+from .finnhub_news import FinnhubNewsClient
+from .config import configure_gemini, get_settings, report_error
+from .lazy_imports import lazy_import
 
-# --- Configuration ---
-FINNHUB_API_KEY = st.secrets.get("FINNHUB_API_KEY", os.environ.get('FINNHUB_API_KEY'))
-GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY", os.environ.get('GEMINI_API_KEY'))
+px = lazy_import("plotly.express")
+genai = lazy_import("google.generativeai", on_load=configure_gemini)
 
-# --- Initialize Clients ---
-finnhub_client = None
-if FINNHUB_API_KEY:
-    finnhub_client = finnhub.Client(api_key=FINNHUB_API_KEY)
+_finnhub_client = None
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+def get_finnhub_client():
+    """
+    The process-wide Finnhub client (None without an API key), built on first use.
+    Rate-limited, cached per (ticker, day): repeated or overlapping windows only fetch new days.
+    """
+    global _finnhub_client
+    if _finnhub_client is None and get_settings().finnhub_api_key:
+        _finnhub_client = FinnhubNewsClient(api_key=get_settings().finnhub_api_key)
+    return _finnhub_client
 
 def get_sentiment_and_summary_from_gemini(headline, content, ticker):
     """
     Analyzes sentiment and generates a summary for a news article using a single Gemini API call.
     """
-    if not GEMINI_API_KEY:
+    if not get_settings().gemini_api_key:
         return {"sentiment": "neutral", "summary": "API key not configured."}
     if not headline or not isinstance(headline, str):
         return {"sentiment": "neutral", "summary": "Invalid headline."}
@@ -71,17 +72,18 @@ def fetch_and_process_news(ticker, days=7):
     """
     print(f"🔍 NEWS: Starting fetch_and_process_news for {ticker}")
     
+    finnhub_client = get_finnhub_client()
     if not ticker or not finnhub_client:
         print(f"❌ NEWS: Missing ticker or Finnhub client is not initialized.")
-        st.error("Finnhub API key is not configured. Please set it as an environment variable or Streamlit secret.")
+        report_error("Finnhub API key is not configured. Please set it as an environment variable or Streamlit secret.")
         return pd.DataFrame()
 
-    today = datetime.now().date()
+    today = datetime.now(timezone.utc).date()
     last_week = today - timedelta(days=days)
     print(f"📅 NEWS: Date range: {last_week.strftime('%Y-%m-%d')} to {today.strftime('%Y-%m-%d')}")
 
     try:
-        all_articles = finnhub_client.company_news(ticker, _from=last_week.strftime('%Y-%m-%d'), to=today.strftime('%Y-%m-%d'))
+        all_articles = finnhub_client.company_news(ticker, last_week, today)
         print(f"✅ NEWS: Fetched {len(all_articles)} raw articles from Finnhub for {ticker}")
         
         if not all_articles:
@@ -90,7 +92,7 @@ def fetch_and_process_news(ticker, days=7):
             
     except Exception as e:
         print(f"❌ NEWS: Error fetching news from Finnhub for {ticker}: {e}")
-        st.error(f"Error fetching news from Finnhub: {e}")
+        report_error(f"Error fetching news from Finnhub: {e}")
         return pd.DataFrame(columns=['Published At', 'Headline', 'Sentiment', 'Summary', 'URL'])
 
     processed_articles = []
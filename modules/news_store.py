@@ -0,0 +1,176 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# --- Configuration ---
+DEFAULT_NEWS_DB_PATH = os.environ.get("FINCHAT_NEWS_DB_PATH", "news_store.db")
+MAX_ARTICLES_PER_TICKER = 50   # Older articles are pruned on every write
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    headline TEXT NOT NULL,
+    summary TEXT,
+    source TEXT,
+    date TEXT,
+    link TEXT,
+    published_ts REAL,
+    fetched_at REAL NOT NULL,
+    story_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_ticker ON articles (ticker, published_ts DESC);
+CREATE TABLE IF NOT EXISTS feeds (
+    ticker TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    modified TEXT,
+    last_polled REAL,
+    last_status INTEGER,
+    next_poll_at REAL NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+def article_id(ticker: str, article: Dict) -> str:
+    """Stable id of an article within a ticker's feed (link if present, else headline)."""
+    identity = article.get("link") or article.get("headline", "")
+    return hashlib.sha1(f"{ticker}\n{identity}".encode("utf-8")).hexdigest()
+
+class NewsStore:
+    """
+    Local SQLite store of normalized news articles and per-feed polling state.
+    Written by the background ingester and read on the request path, so reads never
+    touch the network. WAL mode lets readers proceed while the ingester writes.
+    """
+    def __init__(self, path: str = DEFAULT_NEWS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(articles)")}
+            if "story_id" not in columns:
+                # Stores created before near-duplicate detection: every article is its own story
+                conn.execute("ALTER TABLE articles ADD COLUMN story_id TEXT")
+                conn.execute("UPDATE articles SET story_id = id")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (Streamlit sessions and the ingester run on different threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Articles ---
+
+    def upsert_articles(self, ticker: str, articles: List[Dict]) -> int:
+        """
+        Inserts new articles for a ticker (existing ids are left as-is). Returns the number added.
+        An article's "story_id" groups near-duplicates across tickers and sources; it defaults
+        to the article's own id.
+        """
+        now = time.time()
+        rows = []
+        for a in articles:
+            if a.get("headline"):
+                id_ = article_id(ticker, a)
+                rows.append((id_, ticker, a["headline"], a.get("summary"), a.get("source"), a.get("date"),
+                             a.get("link"), a.get("published_ts"), now, a.get("story_id") or id_))
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            added = conn.total_changes - before
+            conn.execute(
+                """DELETE FROM articles WHERE ticker = ? AND id NOT IN (
+                       SELECT id FROM articles WHERE ticker = ?
+                       ORDER BY published_ts DESC, fetched_at DESC LIMIT ?)""",
+                (ticker, ticker, MAX_ARTICLES_PER_TICKER),
+            )
+        return added
+
+    def get_articles(self, ticker: str, limit: int = 5) -> List[Dict]:
+        """Newest articles for a ticker, one per story, in the app's news dict format."""
+        rows = self._connect().execute(
+            """SELECT date, source, headline, summary, link FROM (
+                   SELECT *, ROW_NUMBER() OVER (PARTITION BY story_id ORDER BY published_ts DESC, fetched_at DESC) AS rank
+                   FROM articles WHERE ticker = ?)
+               WHERE rank = 1 ORDER BY published_ts DESC, fetched_at DESC LIMIT ?""",
+            (ticker, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_story_headlines(self) -> List[tuple]:
+        """(story_id, headline, source) of every stored article, for rebuilding a near-duplicate index."""
+        return [tuple(row) for row in self._connect().execute(
+            "SELECT story_id, headline, source FROM articles ORDER BY fetched_at")]
+
+    def get_story_ids(self) -> set:
+        """story_id of every stored article (pruned articles' stories drop out)."""
+        return {row[0] for row in self._connect().execute("SELECT DISTINCT story_id FROM articles")}
+
+    # --- Feed state ---
+
+    def register_feed(self, ticker: str, url: str):
+        """Adds a feed (due immediately) or updates its URL, keeping its polling state."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO feeds (ticker, url) VALUES (?, ?) ON CONFLICT(ticker) DO UPDATE SET url = excluded.url",
+                (ticker, url),
+            )
+
+    def get_feed(self, ticker: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT * FROM feeds WHERE ticker = ?", (ticker,)).fetchone()
+        return dict(row) if row else None
+
+    def due_feeds(self, now: float = None) -> List[Dict]:
+        """Feeds whose next poll time has passed, most overdue first."""
+        rows = self._connect().execute(
+            "SELECT * FROM feeds WHERE next_poll_at <= ? ORDER BY next_poll_at", (now or time.time(),)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def next_due_at(self) -> Optional[float]:
+        row = self._connect().execute("SELECT MIN(next_poll_at) FROM feeds").fetchone()
+        return row[0]
+
+    def update_feed(self, ticker: str, **fields):
+        """Updates polling state columns (etag, modified, last_polled, last_status, next_poll_at, failures)."""
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE feeds SET {assignments} WHERE ticker = ?", (*fields.values(), ticker))
+
+    # --- Leases ---
+
+    def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """
+        Takes or renews the named lease for holder for ttl seconds, unless another holder's
+        lease is still live. Every process sharing the database file sees the same lease.
+        Returns True if holder now holds it.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                   WHERE leases.holder = excluded.holder OR leases.expires_at <= ?""",
+                (name, holder, now + ttl, now),
+            )
+            row = conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+        return row["holder"] == holder
+
+    def release_lease(self, name: str, holder: str):
+        """Gives up the named lease if holder holds it, so another process can take it at once."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+# --- Configuration ---
+DEFAULT_PRECOMPUTED_PATH = os.environ.get("FINCHAT_PRECOMPUTED_PATH", "precomputed.db")
+MAX_AGE_SECONDS = float(os.environ.get("FINCHAT_PRECOMPUTED_MAX_AGE", str(60 * 60)))  # Older results fall back to on-demand
+FORMAT_VERSION = 1          # Bump when a payload's shape changes; rows of other versions are ignored
+KEEP_VERSIONS = 3           # Runs kept per (kind, symbol), newest first
+BATCH_WORKERS = 4           # Stocks precomputed concurrently (each makes Gemini and Yahoo calls)
+CHART_PERIOD = "3mo"        # The Deep Dive's default chart: the one precomputed
+KINDS = ("summary", "sentiment", f"chart:{CHART_PERIOD}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS precomputed (
+    kind TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    format_version INTEGER NOT NULL,
+    computed_at REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (kind, symbol, run_id)
+);
+CREATE TABLE IF NOT EXISTS precompute_runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    stocks INTEGER NOT NULL,
+    results INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+class PrecomputedStore:
+    """
+    Versioned results of the batch precomputation job (precompute.py): one row per
+    (kind, symbol, run), zlib-compressed JSON, the last KEEP_VERSIONS runs kept. The UI reads
+    the newest row of the current FORMAT_VERSION and falls back to computing on demand when
+    it is missing or older than max_age.
+    """
+    def __init__(self, path: str = DEFAULT_PRECOMPUTED_PATH, max_age: float = MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age = max_age
+        self.hits = self.misses = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, kind: str, symbol: str, run_id: int, value: Any):
+        payload = zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO precomputed VALUES (?, ?, ?, ?, ?, ?)",
+                         (kind, symbol, run_id, FORMAT_VERSION, time.time(), payload))
+            conn.execute(
+                "DELETE FROM precomputed WHERE kind = ? AND symbol = ? AND run_id NOT IN "
+                "(SELECT run_id FROM precomputed WHERE kind = ? AND symbol = ? ORDER BY run_id DESC LIMIT ?)",
+                (kind, symbol, kind, symbol, KEEP_VERSIONS),
+            )
+
+    def latest(self, kind: str, symbol: str, max_age: float = None) -> Optional[Dict]:
+        """{"value", "run_id", "computed_at"} of the newest usable result, or None."""
+        max_age = self.max_age if max_age is None else max_age
+        row = self._connect().execute(
+            "SELECT payload, run_id, computed_at FROM precomputed WHERE kind = ? AND symbol = ? AND format_version = ? "
+            "ORDER BY run_id DESC LIMIT 1", (kind, symbol, FORMAT_VERSION),
+        ).fetchone()
+        if row is None or time.time() - row[2] > max_age:
+            return None
+        return {"value": json.loads(zlib.decompress(row[0])), "run_id": row[1], "computed_at": row[2]}
+
+    def get_or_compute(self, kind: str, symbol: str, compute: Callable[[], Any]) -> Any:
+        """The precomputed value if fresh, else compute() (the on-demand path; not stored)."""
+        result = self.latest(kind, symbol)
+        if result is not None:
+            self.hits += 1
+            return result["value"]
+        self.misses += 1
+        return compute()
+
+    def start_run(self, stocks: int) -> int:
+        run_id = time.time_ns() // 1000   # Microseconds: unique and ordered across runs
+        with self._connect() as conn:
+            conn.execute("INSERT INTO precompute_runs (run_id, started_at, stocks) VALUES (?, ?, ?)",
+                         (run_id, time.time(), stocks))
+        return run_id
+
+    def finish_run(self, run_id: int, results: int, failures: int):
+        with self._connect() as conn:
+            conn.execute("UPDATE precompute_runs SET finished_at = ?, results = ?, failures = ? WHERE run_id = ?",
+                         (time.time(), results, failures, run_id))
+
+    def runs(self, limit: int = 5) -> List[Dict]:
+        cursor = self._connect().execute("SELECT * FROM precompute_runs ORDER BY run_id DESC LIMIT ?", (limit,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> dict:
+        entries, stored = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM precomputed").fetchone()
+        return {"entries": entries, "compressed_bytes": stored, "hits": self.hits, "misses": self.misses}
+
+def precompute_stock(stock_info: Dict, fetcher, store: PrecomputedStore, run_id: int) -> Dict[str, str]:
+    """
+    Computes and stores one stock's summary, analyzed news and default price chart.
+    Returns {kind: error} for the parts that failed (empty when all were stored).
+    """
+    # Imported here so the store itself (read by the UI) does not pull in the feature modules
+    import plotly.io as pio
+    from .chat import analyze_news_sentiment, generate_stock_summary
+    from .visualizations import create_candlestick_chart
+
+    symbol, errors = stock_info["symbol"], {}
+    try:
+        summary = generate_stock_summary(stock_info)
+        if summary.startswith(("Could not generate AI summary", "Gemini API key is not configured")):
+            raise RuntimeError(summary)
+        store.put("summary", symbol, run_id, summary)
+    except Exception as e:
+        errors["summary"] = str(e)
+    try:
+        news = fetcher.get_hybrid_news(stock_info)
+        analyzed = analyze_news_sentiment(news)
+        if news and not analyzed:
+            raise RuntimeError("sentiment analysis returned no results")
+        store.put("sentiment", symbol, run_id, analyzed)
+    except Exception as e:
+        errors["sentiment"] = str(e)
+    try:
+        fig = create_candlestick_chart(symbol, stock_info["name"], CHART_PERIOD)
+        if fig is None:
+            raise RuntimeError("no price data")
+        store.put(f"chart:{CHART_PERIOD}", symbol, run_id, pio.to_json(fig, validate=False))
+    except Exception as e:
+        errors[f"chart:{CHART_PERIOD}"] = str(e)
+    return errors
+
+def precompute_universe(stocks: List[Dict], fetcher, store: PrecomputedStore,
+                        max_workers: int = BATCH_WORKERS) -> Dict:
+    """
+    precompute_stock for every stock on a bounded thread pool, recorded as one run.
+    Returns the run summary: run_id, counts, "status" ({symbol: {kind: error}} in completion
+    order, empty for stocks fully stored) and "errors" (the stocks with failures).
+    """
+    run_id = store.start_run(len(stocks))
+    start, status = time.perf_counter(), {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precompute") as pool:
+        futures = {pool.submit(precompute_stock, stock, fetcher, store, run_id): stock["symbol"] for stock in stocks}
+        for future in as_completed(futures):
+            try:
+                status[futures[future]] = future.result()
+            except Exception as e:
+                # Nothing reliable was stored for this stock: count every kind as failed
+                status[futures[future]] = dict.fromkeys(KINDS, str(e))
+    errors = {symbol: stock_errors for symbol, stock_errors in status.items() if stock_errors}
+    failures = sum(len(stock_errors) for stock_errors in errors.values())
+    results = len(KINDS) * len(stocks) - failures
+    store.finish_run(run_id, results, failures)
+    return {"run_id": run_id, "stocks": len(stocks), "results": results, "failures": failures,
+            "seconds": time.perf_counter() - start, "status": status, "errors": errors}
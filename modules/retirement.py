@@ -0,0 +1,341 @@
+import numpy as np
+import pandas as pd
+
+# --- Assumptions ---
+# Expected annual portfolio return (and its volatility) before retirement for each risk profile.
+RISK_PROFILES = {
+    "Conservative": {"expected_return": 0.07, "volatility": 0.06},
+    "Moderate": {"expected_return": 0.10, "volatility": 0.12},
+    "Aggressive": {"expected_return": 0.12, "volatility": 0.18},
+}
+# Retirement expenses relative to today's expenses (in today's money).
+LIFESTYLE_MULTIPLIERS = {"Basic": 0.8, "Comfortable": 1.0, "Luxurious": 1.5}
+POST_RETIREMENT_RETURN = 0.07   # Corpus shifts to a debt-heavy allocation after retirement
+POST_RETIREMENT_VOLATILITY = 0.05
+INFLATION_UNCERTAINTY = 0.01   # Std. dev. of each path's long-run inflation rate around the assumption
+LIFE_EXPECTANCY = 85            # The plan must fund expenses up to this age
+MAX_AGE = 100                   # Drawdown is simulated this far to report when money runs out
+
+def _inputs(user_data: dict) -> dict:
+    """Normalizes the retirement form's user_data dict into annual decimal inputs."""
+    return {
+        "current_age": int(user_data["current_age"]),
+        "retirement_age": int(user_data["retirement_age"]),
+        "annual_salary": 12.0 * user_data["monthly_salary_inr"],
+        "annual_expenses": 12.0 * user_data["monthly_expenses_inr"],
+        "current_savings": float(user_data["current_savings_inr"]),
+        "salary_growth": user_data["expected_salary_growth_percent"] / 100.0,
+        "inflation": user_data["expected_inflation_percent"] / 100.0,
+        "pre_return": RISK_PROFILES.get(user_data.get("risk_appetite"), RISK_PROFILES["Moderate"])["expected_return"],
+        "pre_volatility": RISK_PROFILES.get(user_data.get("risk_appetite"), RISK_PROFILES["Moderate"])["volatility"],
+        "lifestyle": LIFESTYLE_MULTIPLIERS.get(user_data.get("retirement_lifestyle"), 1.0),
+    }
+
+def _accumulate(start: float, flows: np.ndarray, growth: np.ndarray) -> np.ndarray:
+    """
+    End-of-year balances of B = B * growth[t] + flows[t], in closed form:
+    B[t] = G[t] * (start + sum_{j<=t} flows[j] / G[j]) with G[t] = growth[0] * ... * growth[t].
+    Works on the last axis, so it also vectorizes across paths. The closed form divides
+    by G, so a zero growth factor (a -100% year) falls back to the plain recurrence.
+    """
+    cumulative = np.cumprod(growth, axis=-1)
+    if np.all(cumulative > 0):
+        return cumulative * (start + np.cumsum(flows / cumulative, axis=-1))
+    balances = np.empty(np.broadcast_shapes(flows.shape, growth.shape), dtype=np.result_type(flows, growth))
+    balance = start
+    for t in range(balances.shape[-1]):
+        balance = balance * growth[..., t] + flows[..., t]
+        balances[..., t] = balance
+    return balances
+
+def project_retirement(user_data: dict) -> dict:
+    """
+    Deterministic year-by-year retirement projection from the planner form's user_data.
+
+    Working years: salary grows at the expected rate, expenses grow with inflation and the
+    difference is invested at the risk profile's expected return. Retirement years: the
+    corpus earns POST_RETIREMENT_RETURN while inflation-adjusted expenses (scaled by the
+    lifestyle) are withdrawn at the start of each year.
+
+    Returns {"summary": {...scalars...}, "yearly": {...arrays indexed by age...}}.
+    """
+    p = _inputs(user_data)
+    working_years = p["retirement_age"] - p["current_age"]
+    if working_years <= 0:
+        raise ValueError("Retirement age must be greater than current age.")
+    drawdown_years = MAX_AGE - p["retirement_age"]
+
+    # --- Accumulation phase ---
+    t = np.arange(working_years)
+    salary = p["annual_salary"] * (1 + p["salary_growth"]) ** t
+    expenses = p["annual_expenses"] * (1 + p["inflation"]) ** t
+    savings = salary - expenses
+    corpus_path = _accumulate(p["current_savings"], savings, np.full(working_years, 1 + p["pre_return"]))
+    corpus_at_retirement = float(corpus_path[-1])
+
+    # --- Drawdown phase (withdrawals at the start of each year) ---
+    k = np.arange(drawdown_years)
+    first_year_expenses = p["annual_expenses"] * (1 + p["inflation"]) ** working_years * p["lifestyle"]
+    retirement_expenses = first_year_expenses * (1 + p["inflation"]) ** k
+    discount = (1 + POST_RETIREMENT_RETURN) ** k
+    pv_withdrawals = np.cumsum(retirement_expenses / discount)
+    years_funded = int(np.searchsorted(pv_withdrawals, corpus_at_retirement, side="right"))
+    drawdown_path = np.maximum(discount * (1 + POST_RETIREMENT_RETURN) * (corpus_at_retirement - pv_withdrawals), 0.0)
+
+    required_years = LIFE_EXPECTANCY - p["retirement_age"]
+    required_corpus = float(pv_withdrawals[required_years - 1]) if required_years > 0 else 0.0
+    ages = np.arange(p["current_age"] + 1, MAX_AGE + 1)
+
+    return {
+        "summary": {
+            "working_years": working_years,
+            "expected_return_percent": p["pre_return"] * 100,
+            "post_retirement_return_percent": POST_RETIREMENT_RETURN * 100,
+            "final_annual_salary": float(salary[-1]),
+            "total_contributions": float(savings.sum()),
+            "corpus_at_retirement": corpus_at_retirement,
+            "first_year_retirement_expenses": float(first_year_expenses),
+            "required_corpus": required_corpus,
+            "surplus_or_shortfall": corpus_at_retirement - required_corpus,
+            "years_funded": years_funded,
+            "money_lasts_until_age": p["retirement_age"] + years_funded,
+            "life_expectancy": LIFE_EXPECTANCY,
+            "on_track": years_funded >= required_years,
+        },
+        "yearly": {
+            "age": ages,
+            "salary": np.concatenate([salary, np.zeros(drawdown_years)]),
+            "expenses": np.concatenate([expenses, retirement_expenses]),
+            "savings": np.concatenate([savings, -retirement_expenses]),
+            "corpus": np.concatenate([corpus_path, drawdown_path]),
+        },
+    }
+
+def projection_table(projection: dict) -> pd.DataFrame:
+    """Year-by-year projection as a DataFrame for display."""
+    return pd.DataFrame(projection["yearly"]).set_index("age")
+
+# --- Monte Carlo simulation ---
+DEFAULT_SIMULATION_PATHS = 100_000
+SIMULATION_CHUNK_SIZE = 25_000  # Paths simulated per block; bounds the per-year vectors to ~100 KB each
+BAND_SAMPLE_PATHS = 20_000      # Trajectories kept for the percentile bands (spread across blocks)
+BAND_PERCENTILES = (10, 50, 90)
+
+def _simulate_chunk(p: dict, n_paths: int, working_years: int, horizon: int, rng, keep: int) -> tuple:
+    """
+    Simulates n_paths corpus trajectories (end-of-year balances up to LIFE_EXPECTANCY).
+    Each year's return is random; each path also draws its own long-run inflation rate,
+    which dominates retirement outcomes far more than year-to-year inflation noise.
+    Contributions are made at year end while working; withdrawals at the start of each
+    retirement year, and an exhausted corpus stays at zero.
+
+    Steps year by year over (n_paths,) vectors, updated in place, so no (paths x years)
+    temporaries are built. Returns (balance at retirement, final balance, the full
+    trajectories of the first keep paths). Computed in float32: the paths feed percentiles
+    and a probability, not an account statement.
+    """
+    salary = (p["annual_salary"] * (1 + p["salary_growth"]) ** np.arange(working_years)).astype(np.float32)
+    inflation = rng.standard_normal(n_paths, dtype=np.float32)
+    inflation *= INFLATION_UNCERTAINTY
+    inflation += 1.0 + p["inflation"]
+    expenses = np.full(n_paths, p["annual_expenses"], dtype=np.float32)
+    balance = np.full(n_paths, p["current_savings"], dtype=np.float32)
+    growth = np.empty(n_paths, dtype=np.float32)
+    trajectories = np.empty((keep, horizon), dtype=np.float32)
+    at_retirement = None
+    for year in range(horizon):
+        working = year < working_years
+        rng.standard_normal(n_paths, dtype=np.float32, out=growth)
+        growth *= p["pre_volatility"] if working else POST_RETIREMENT_VOLATILITY
+        growth += 1.0 + (p["pre_return"] if working else POST_RETIREMENT_RETURN)
+        np.maximum(growth, 0.0, out=growth)  # A year cannot lose more than 100%
+        if working:
+            balance *= growth
+            balance += salary[year]
+            balance -= expenses
+        else:
+            if year == working_years:
+                expenses *= p["lifestyle"]
+            balance -= expenses
+            balance *= growth
+            np.maximum(balance, 0.0, out=balance)
+        if year == working_years - 1:
+            at_retirement = balance.copy()
+        trajectories[:, year] = balance[:keep]
+        expenses *= inflation
+    return at_retirement, balance, trajectories
+
+def simulate_retirement(user_data: dict, n_paths: int = DEFAULT_SIMULATION_PATHS,
+                        chunk_size: int = SIMULATION_CHUNK_SIZE, seed: int | None = 0) -> dict:
+    """
+    Monte Carlo version of project_retirement. Annual returns are drawn around the risk
+    profile's expected return with its volatility, inflation rates around the user's assumption.
+
+    Paths are simulated in blocks of chunk_size, so peak memory is bounded by the block
+    size rather than n_paths. The success probability and the at-retirement percentiles use
+    every path; the per-age bands use a BAND_SAMPLE_PATHS subsample taken from each block.
+
+    Returns {"summary": {success_probability, corpus percentiles at retirement, ...},
+             "bands": {"age": ..., "p10": ..., "p50": ..., "p90": ...}}.
+    A fixed seed keeps results reproducible (and therefore cacheable).
+    """
+    p = _inputs(user_data)
+    working_years = p["retirement_age"] - p["current_age"]
+    if working_years <= 0:
+        raise ValueError("Retirement age must be greater than current age.")
+    if p["retirement_age"] > LIFE_EXPECTANCY:
+        raise ValueError(f"Retirement age must not exceed the life expectancy of {LIFE_EXPECTANCY}.")
+    horizon = LIFE_EXPECTANCY - p["current_age"]
+    rng = np.random.default_rng(seed)
+
+    successes = 0
+    at_retirement = np.empty(n_paths, dtype=np.float32)
+    band_samples = []
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        keep = min(stop - start, max(1, (stop - start) * BAND_SAMPLE_PATHS // n_paths))
+        retired, final, trajectories = _simulate_chunk(p, stop - start, working_years, horizon, rng, keep)
+        successes += int(np.count_nonzero(final > 0))
+        at_retirement[start:stop] = retired
+        band_samples.append(trajectories)
+
+    bands = np.percentile(np.concatenate(band_samples), BAND_PERCENTILES, axis=0)
+    retirement_bands = np.percentile(at_retirement, BAND_PERCENTILES)
+    return {
+        "summary": {
+            "paths": n_paths,
+            "risk_appetite": user_data.get("risk_appetite"),
+            "success_probability": successes / n_paths,
+            **{f"corpus_at_retirement_p{q}": float(v) for q, v in zip(BAND_PERCENTILES, retirement_bands)},
+        },
+        "bands": {
+            "age": np.arange(p["current_age"] + 1, LIFE_EXPECTANCY + 1),
+            **{f"p{q}": band for q, band in zip(BAND_PERCENTILES, bands)},
+        },
+    }
+
+# --- Goal seeking and sensitivity ---
+SENSITIVITY_RETURN_OFFSETS = np.arange(-0.04, 0.0401, 0.01)  # Around the risk profile's expected return
+
+def _required_corpus(p: dict, retirement_ages: np.ndarray) -> np.ndarray:
+    """
+    Present value at retirement of the expenses up to LIFE_EXPECTANCY, for each retirement age.
+    Same convention as project_retirement: withdrawals at the start of each year.
+    """
+    working_years = retirement_ages - p["current_age"]
+    k = np.arange(max(LIFE_EXPECTANCY - int(retirement_ages.min()), 1))
+    first_year_expenses = p["annual_expenses"] * (1 + p["inflation"]) ** working_years * p["lifestyle"]
+    factors = ((1 + p["inflation"]) / (1 + POST_RETIREMENT_RETURN)) ** k
+    funded = k[None, :] < (LIFE_EXPECTANCY - retirement_ages)[:, None]
+    return first_year_expenses * (factors * funded).sum(axis=1)
+
+def _corpus_at_retirement(p: dict, retirement_ages: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """
+    Corpus at each retirement age (rows) for each annual return (columns), in one broadcast:
+    start * (1+r)^W + sum_{t<W} savings[t] * (1+r)^(W-1-t).
+    """
+    working_years = (retirement_ages - p["current_age"])[:, None, None]
+    t = np.arange(int(working_years.max()))
+    savings = p["annual_salary"] * (1 + p["salary_growth"]) ** t - p["annual_expenses"] * (1 + p["inflation"]) ** t
+    growth = 1 + returns[None, :, None]
+    compounding = np.where(t < working_years, growth ** np.maximum(working_years - 1 - t, 0), 0.0)
+    return p["current_savings"] * growth[..., 0] ** working_years[..., 0] + (compounding * savings).sum(axis=-1)
+
+def required_monthly_investment(user_data: dict) -> dict:
+    """
+    Monthly investment (today, stepped up each year with salary growth) that exactly funds
+    expenses until LIFE_EXPECTANCY at the chosen retirement age. The corpus is linear in the
+    contributions, so this is solved in closed form rather than by iteration.
+    """
+    p = _inputs(user_data)
+    working_years = p["retirement_age"] - p["current_age"]
+    if working_years <= 0:
+        raise ValueError("Retirement age must be greater than current age.")
+    t = np.arange(working_years)
+    growth = 1 + p["pre_return"]
+    required = float(_required_corpus(p, np.array([p["retirement_age"]]))[0])
+    # Corpus per unit of first-year annual contribution, with contributions growing like the salary
+    annuity_factor = float(((1 + p["salary_growth"]) ** t * growth ** (working_years - 1 - t)).sum())
+    gap = required - p["current_savings"] * growth ** working_years
+    monthly = max(gap / annuity_factor / 12.0, 0.0)
+    current = (p["annual_salary"] - p["annual_expenses"]) / 12.0
+    return {
+        "required_corpus": required,
+        "required_monthly_investment": monthly,
+        "current_monthly_investment": current,
+        "additional_monthly_investment": max(monthly - current, 0.0),
+    }
+
+def sensitivity_grid(user_data: dict, retirement_ages=None, returns=None) -> dict:
+    """
+    Funded ratio (corpus at retirement / required corpus) for every retirement age x
+    pre-retirement return pair, evaluated as a single broadcast array computation.
+    Defaults: every age from next year to LIFE_EXPECTANCY - 1, and the risk profile's
+    return +/- 4 percentage points.
+    """
+    p = _inputs(user_data)
+    if retirement_ages is None:
+        retirement_ages = np.arange(p["current_age"] + 1, LIFE_EXPECTANCY)
+    if returns is None:
+        returns = p["pre_return"] + SENSITIVITY_RETURN_OFFSETS
+    retirement_ages = np.asarray(retirement_ages, dtype=int)
+    returns = np.asarray(returns, dtype=float)
+    if retirement_ages.size == 0 or retirement_ages.min() <= p["current_age"]:
+        raise ValueError("Retirement ages must be greater than current age.")
+    corpus = _corpus_at_retirement(p, retirement_ages, returns)
+    required = _required_corpus(p, retirement_ages)[:, None]
+    return {
+        "retirement_age": retirement_ages,
+        "return_percent": returns * 100,
+        "corpus_at_retirement": corpus,
+        "required_corpus": np.broadcast_to(required, corpus.shape),
+        "funded_ratio": np.divide(corpus, required, out=np.full(corpus.shape, np.inf), where=required > 0),
+    }
+
+def earliest_retirement_age(user_data: dict) -> int | None:
+    """
+    Earliest age at which the projected corpus covers expenses until LIFE_EXPECTANCY.
+    The candidate ages are few, so every one is evaluated in a single vectorized scan
+    (no bisection needed). Returns None if no age before LIFE_EXPECTANCY works.
+    """
+    p = _inputs(user_data)
+    grid = sensitivity_grid(user_data, returns=[p["pre_return"]])
+    feasible = np.flatnonzero(grid["funded_ratio"][:, 0] >= 1.0)
+    return int(grid["retirement_age"][feasible[0]]) if feasible.size else None
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+
+    sample = {
+        "current_age": 30, "retirement_age": 60, "monthly_salary_inr": 75000, "monthly_expenses_inr": 40000,
+        "current_savings_inr": 1000000, "expected_salary_growth_percent": 8, "risk_appetite": "Moderate",
+        "investment_experience": "Intermediate", "retirement_lifestyle": "Comfortable", "expected_inflation_percent": 6,
+    }
+    result = project_retirement(sample)
+    for key, value in result["summary"].items():
+        print(f"  {key}: {value:,.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+    runs = 10000
+    start = time.perf_counter()
+    for _ in range(runs):
+        project_retirement(sample)
+    print(f"project_retirement: {(time.perf_counter() - start) * 1e6 / runs:.1f} µs per call")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        goal = required_monthly_investment(sample)
+        earliest = earliest_retirement_age(sample)
+        grid = sensitivity_grid(sample)
+    print(f"goal seek + {grid['funded_ratio'].size}-cell sensitivity grid: {(time.perf_counter() - start):.3f} ms per call; "
+          f"required monthly investment ₹{goal['required_monthly_investment']:,.0f}, earliest retirement age {earliest}")
+
+    for profile in RISK_PROFILES:
+        start = time.perf_counter()
+        simulation = simulate_retirement({**sample, "risk_appetite": profile})
+        elapsed = (time.perf_counter() - start) * 1000
+        summary = simulation["summary"]
+        print(f"simulate_retirement ({profile}, {summary['paths']:,} paths): {elapsed:.0f} ms, "
+              f"success={summary['success_probability']:.1%}, p10/p50/p90 at retirement="
+              f"{summary['corpus_at_retirement_p10'] / 1e7:.2f}/{summary['corpus_at_retirement_p50'] / 1e7:.2f}/"
+              f"{summary['corpus_at_retirement_p90'] / 1e7:.2f} Cr")
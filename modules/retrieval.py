@@ -0,0 +1,297 @@
+import math
+import re
+import time
+from collections import Counter, defaultdict
+import numpy as np
+
+# --- Configuration ---
+# Defaults used by doc_qa.user_input; every value can be overridden per query.
+DEFAULT_K = 5
+DEFAULT_FETCH_K = 20
+DEFAULT_ALPHA = 0.5          # Weight of the vector score in the fused score (1 - alpha goes to BM25)
+DEFAULT_MMR_LAMBDA = 0.7     # 1.0 = pure relevance, 0.0 = pure diversity
+DEFAULT_MAX_CONTEXT_TOKENS = 6000
+
+# Keeps figures such as "1,234.5", "fy24" and "q2" together as single tokens.
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cases text and splits it into word/number tokens for lexical search."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for the context budget."""
+    return max(1, len(text) // 4)
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory list of chunks, stored as per-term postings.
+    """
+    def __init__(self, texts: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(texts)
+        self.doc_lengths = np.zeros(self.n_docs, dtype=np.float32)
+        postings = defaultdict(lambda: ([], []))
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                ids, tfs = postings[term]
+                ids.append(doc_id)
+                tfs.append(tf)
+        self.avg_doc_length = float(self.doc_lengths.mean()) if self.n_docs else 0.0
+        self.postings = {
+            term: (np.asarray(ids, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (self.n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            for term, (ids, _) in self.postings.items()
+        }
+
+    def score(self, query: str) -> np.ndarray:
+        """Returns the BM25 score of every chunk for the query."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        if not self.n_docs:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            ids, tfs = self.postings[term]
+            scores[ids] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + norm[ids])
+        return scores
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """Rescales scores to [0, 1] so lexical and vector scores can be fused."""
+    if values.size == 0:
+        return values
+    lo, hi = float(values.min()), float(values.max())
+    if hi - lo < 1e-12:
+        return np.ones_like(values) if hi > 0 else np.zeros_like(values)
+    return (values - lo) / (hi - lo)
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, mmr_lambda: float) -> list[int]:
+    """
+    Maximal Marginal Relevance: greedily picks candidates that are relevant but
+    not redundant with what has already been selected.
+    """
+    n = relevance.size
+    if n == 0:
+        return []
+    similarity = vectors @ vectors.T
+    selected = [int(np.argmax(relevance))]
+    max_sim = similarity[selected[0]].copy()
+    while len(selected) < min(k, n):
+        mmr = mmr_lambda * relevance - (1 - mmr_lambda) * max_sim
+        mmr[selected] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        max_sim = np.maximum(max_sim, similarity[best])
+    return selected
+
+def apply_token_budget(texts: list[str], max_tokens: int, count_tokens=estimate_tokens) -> list[int]:
+    """
+    Keeps chunks (in ranked order) while they fit in the token budget.
+    The first chunk is always kept so the model never gets an empty context.
+    """
+    kept, used = [], 0
+    for i, text in enumerate(texts):
+        cost = count_tokens(text)
+        if kept and used + cost > max_tokens:
+            continue
+        kept.append(i)
+        used += cost
+    return kept
+
+class HybridRetriever:
+    """
+    Fuses BM25 and FAISS scores over the chunks of a LangChain FAISS store,
+    then diversifies the result with MMR and trims it to a token budget.
+    """
+    def __init__(self, vector_store, count_tokens=estimate_tokens):
+        self.vector_store = vector_store
+        self.count_tokens = count_tokens
+        self.index = vector_store.index
+        self.ids = [vector_store.index_to_docstore_id[i] for i in range(self.index.ntotal)]
+        self.documents = [vector_store.docstore.search(doc_id) for doc_id in self.ids]
+        self.bm25 = BM25Index([doc.page_content for doc in self.documents])
+
+    def _vectors(self, positions: np.ndarray) -> np.ndarray:
+        """Reconstructs and L2-normalizes the stored embeddings for the given positions."""
+        vectors = np.vstack([self.index.reconstruct(int(i)) for i in positions]).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embeds and L2-normalizes a query with the store's embedding model."""
+        query_vector = np.asarray(self.vector_store._embed_query(query), dtype=np.float32)
+        return query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+
+    def metadata_mask(self, doc_filter: dict) -> np.ndarray:
+        """
+        Boolean mask over stored chunks whose metadata matches every key of doc_filter.
+        A filter value may be a single value or a list/set of accepted values.
+        """
+        mask = np.ones(len(self.documents), dtype=bool)
+        for key, accepted in doc_filter.items():
+            accepted = set(accepted) if isinstance(accepted, (list, tuple, set)) else {accepted}
+            mask &= np.fromiter((doc.metadata.get(key) in accepted for doc in self.documents),
+                                dtype=bool, count=len(self.documents))
+        return mask
+
+    def search_with_scores(self, query: str, k: int = DEFAULT_K, fetch_k: int = DEFAULT_FETCH_K,
+                           alpha: float = DEFAULT_ALPHA, mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+                           use_mmr: bool = True, allowed: np.ndarray | None = None,
+                           query_vector: np.ndarray | None = None) -> list[tuple]:
+        """
+        Returns up to k (Document, fused_score) pairs, best first, without a token budget.
+        `allowed` is an optional boolean mask restricting the search to some chunks.
+        """
+        if not self.documents:
+            return []
+        n_allowed = len(self.documents) if allowed is None else int(allowed.sum())
+        if n_allowed == 0:
+            return []
+        fetch_k = max(fetch_k, k)
+
+        # 1. Candidate generation from both retrievers
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        candidates = set()
+        if alpha > 0:
+            # Over-fetch in proportion to the filter's selectivity so enough allowed chunks survive
+            search_k = min(len(self.documents), math.ceil(fetch_k * len(self.documents) / n_allowed))
+            _, found = self.index.search(query_vector.reshape(1, -1), search_k)
+            found = [int(i) for i in found[0] if i >= 0 and (allowed is None or allowed[i])]
+            candidates.update(found[:fetch_k])
+        bm25_scores = self.bm25.score(query)
+        if allowed is not None:
+            bm25_scores[~allowed] = 0
+        if alpha < 1:
+            candidates.update(int(i) for i in _top_k(bm25_scores, fetch_k) if bm25_scores[i] > 0)
+        if not candidates:
+            return []
+        positions = np.fromiter(candidates, dtype=np.int64)
+
+        # 2. Score fusion on the shared candidate set
+        vectors = self._vectors(positions)
+        fused = alpha * _min_max(vectors @ query_vector) + (1 - alpha) * _min_max(bm25_scores[positions])
+
+        # 3. Diversification
+        if use_mmr:
+            order = mmr_select(fused, vectors, k, mmr_lambda)
+        else:
+            order = list(_top_k(fused, k))
+        return [(self.documents[positions[i]], float(fused[i])) for i in order]
+
+    def search(self, query: str, k: int = DEFAULT_K, fetch_k: int = DEFAULT_FETCH_K,
+               alpha: float = DEFAULT_ALPHA, mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+               max_context_tokens: int = DEFAULT_MAX_CONTEXT_TOKENS, use_mmr: bool = True,
+               doc_filter: dict | None = None) -> list:
+        """Returns the selected LangChain Documents, best first, trimmed to the token budget."""
+        allowed = self.metadata_mask(doc_filter) if doc_filter else None
+        ranked = [doc for doc, _ in self.search_with_scores(query, k, fetch_k, alpha, mmr_lambda, use_mmr, allowed)]
+        kept = apply_token_budget([doc.page_content for doc in ranked], max_context_tokens, self.count_tokens)
+        return [ranked[i] for i in kept]
+
+def benchmark_retrieval(retriever: HybridRetriever, questions: list[dict], k: int = DEFAULT_K) -> dict:
+    """
+    Measures latency and hit rate on a question set. Each question is a dict
+    {"question": ..., "answer": ...}; a hit means a retrieved chunk contains the answer text.
+    """
+    modes = {
+        "vector": dict(alpha=1.0, use_mmr=False),
+        "bm25": dict(alpha=0.0, use_mmr=False),
+        "hybrid": dict(alpha=DEFAULT_ALPHA, use_mmr=False),
+        "hybrid+mmr": dict(alpha=DEFAULT_ALPHA, use_mmr=True),
+    }
+    report = {}
+    for mode, params in modes.items():
+        latencies, hits = [], 0
+        for item in questions:
+            start = time.perf_counter()
+            docs = retriever.search(item["question"], k=k, **params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            answer = item["answer"].lower()
+            hits += any(answer in doc.page_content.lower() for doc in docs)
+        report[mode] = {
+            "hit_rate": hits / max(len(questions), 1),
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "p95_ms": float(np.percentile(latencies, 95)) if latencies else 0.0,
+        }
+    return report
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import argparse
+    import json
+    import zlib
+    from langchain_core.embeddings import Embeddings
+    from langchain_community.vectorstores import FAISS
+
+    class HashingEmbeddings(Embeddings):
+        """Offline bag-of-words hashing embeddings so the benchmark needs no API key."""
+        def __init__(self, dim: int = 256):
+            self.dim = dim
+
+        def _embed(self, text):
+            vector = np.zeros(self.dim, dtype=np.float32)
+            for token in tokenize(text):
+                vector[zlib.crc32(token.encode()) % self.dim] += 1.0
+            return (vector / max(float(np.linalg.norm(vector)), 1e-12)).tolist()
+
+        def embed_documents(self, texts):
+            return [self._embed(t) for t in texts]
+
+        def embed_query(self, text):
+            return self._embed(text)
+
+    parser = argparse.ArgumentParser(description="Benchmark hybrid retrieval for Doc Chat.")
+    parser.add_argument("--index", help="Path to a saved FAISS index (uses Gemini embeddings).")
+    parser.add_argument("--questions", help="JSON file with a list of {question, answer} objects.")
+    args = parser.parse_args()
+
+    if args.index:
+        import os
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=os.environ.get("GEMINI_API_KEY"))
+        store = FAISS.load_local(args.index, embeddings, allow_dangerous_deserialization=True)
+    else:
+        # Synthetic annual-report-like corpus with near-duplicate boilerplate chunks
+        rng = np.random.default_rng(7)
+        segments = ["revenue", "margin", "capex", "guidance", "headcount", "debt", "dividend", "EBITDA"]
+        chunks = []
+        for year in range(2015, 2025):
+            for segment in segments:
+                value = rng.integers(100, 9999)
+                chunks.append(f"In FY{str(year)[2:]} the company reported {segment} of {value} crore. "
+                              f"Management discussed {segment} trends across divisions and the outlook for the year.")
+                chunks.append(f"Management discussed {segment} trends across divisions and the outlook for the year. "
+                              f"Forward-looking statements involve risks and uncertainties.")
+        store = FAISS.from_texts(chunks, embedding=HashingEmbeddings())
+
+    if args.questions:
+        with open(args.questions) as f:
+            questions = json.load(f)
+    else:
+        questions = []
+        for doc_id in store.index_to_docstore_id.values():
+            text = store.docstore.search(doc_id).page_content
+            match = re.search(r"In (FY\d+) the company reported (\w+) of (\d+)", text)
+            if match:
+                questions.append({"question": f"What was {match.group(2)} in {match.group(1)}?", "answer": match.group(3)})
+
+    retriever = HybridRetriever(store)
+    print(f"Benchmarking {len(questions)} questions over {len(retriever.documents)} chunks...")
+    for mode, stats in benchmark_retrieval(retriever, questions).items():
+        print(f"  {mode:<11} hit_rate={stats['hit_rate']:.2%}  p50={stats['p50_ms']:.2f} ms  p95={stats['p95_ms']:.2f} ms")
@@ -0,0 +1,105 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# --- Configuration ---
+DEFAULT_WAIT_SECONDS = 30.0    # How long followers wait on an in-flight call before giving up on it
+
+class FlightTimeout(TimeoutError):
+    """Raised to a follower whose in-flight call did not finish within its timeout."""
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller (the leader) runs the
+    function, callers arriving while it runs (followers) wait for it and share its result
+    or exception. Nothing is remembered once the call finishes; pair it with a cache for that.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = DEFAULT_WAIT_SECONDS) -> Any:
+        """
+        func() run once for all concurrent callers with this key. A follower that waits
+        longer than timeout seconds gets FlightTimeout (the leader keeps running).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise FlightTimeout(f"In-flight call for {key!r} did not finish within {timeout} s.")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers,
+                    "timeouts": self.timeouts}
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    flights = SingleFlight()
+    upstream_calls = []
+
+    def fetch(ticker):
+        upstream_calls.append(ticker)
+        time.sleep(0.2)   # Stands in for a Gemini call or yf.download
+        return f"summary of {ticker}"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(64) as pool:
+        results = list(pool.map(lambda i: flights.do(f"TICK{i % 4}", lambda: fetch(f"TICK{i % 4}")), range(256)))
+    print(f"256 concurrent requests for 4 tickers: {len(upstream_calls)} upstream calls in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms; {flights.stats()}")
+
+    def slow():
+        time.sleep(1.0)
+        return "late"
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flights.do, "SLOW", slow)
+        time.sleep(0.05)
+        try:
+            flights.do("SLOW", slow, timeout=0.1)
+        except FlightTimeout as e:
+            print(f"Follower gave up: {e}")
+        print(f"Leader still finished: {leader.result()!r}")
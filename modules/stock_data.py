@@ -1,7 +1,9 @@
-import yfinance as yf
 import plotly.graph_objects as go
 import pandas as pd
 from modules.database import get_stock_info, search_stocks
+from modules.lazy_imports import lazy_import
+
+yf = lazy_import("yfinance")
 
 def get_stock_data(ticker, period="1mo"):
     """Fetches historical stock data for a given ticker."""
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# --- Configuration ---
+ALL = "All"   # Filter value meaning "no restriction", as shown in the dashboard's select boxes
+TOP_N = 15    # Companies kept per filter for the "Top Companies by Market Cap" chart
+
+class StockUniverse:
+    """
+    The stock database as a DataFrame with categorical country and sector columns, plus an
+    aggregate cube holding every dashboard figure for each (country, sector) filter,
+    "All" included. The universe is static, so the cube is built once and every dashboard
+    render becomes a dictionary lookup instead of a filter/aggregate pass over the frame.
+    """
+    def __init__(self, stocks: List[Dict], top_n: int = TOP_N):
+        self.df = pd.DataFrame(stocks)
+        self.df["country"] = self.df["country"].astype("category")
+        self.df["sector"] = self.df["sector"].astype("category")
+        self.top_n = top_n
+        self.countries = [ALL] + sorted(self.df["country"].cat.categories)
+        self.sectors = [ALL] + sorted(self.df["sector"].cat.categories)
+        self._stocks_by_name = {stock["name"]: stock for stock in stocks}
+        # Content hash of the columns the dashboard charts use; cached figures are keyed by it
+        self.data_version = int(pd.util.hash_pandas_object(
+            self.df[["name", "symbol", "country", "sector", "market_cap_usd_b", "pe_ratio"]], index=False
+        ).sum())
+        self.cube = self._build_cube()
+
+    def _build_cube(self) -> Dict[tuple, Dict]:
+        """Aggregates for every (country, sector) pair; filters matching no stock are left out."""
+        country_codes = self.df["country"].cat.codes.to_numpy()
+        sector_codes = self.df["sector"].cat.codes.to_numpy()
+        # Code -1 never occurs, so it stands for "All" and matches every row
+        country_options = [(ALL, -1)] + [(c, i) for i, c in enumerate(self.df["country"].cat.categories)]
+        sector_options = [(ALL, -1)] + [(s, i) for i, s in enumerate(self.df["sector"].cat.categories)]
+        market_caps = self.df["market_cap_usd_b"].to_numpy(dtype=float)
+        pe_ratios = self.df["pe_ratio"].to_numpy(dtype=float)
+        order = np.argsort(-market_caps, kind="stable")
+
+        cube = {}
+        for country, country_code in country_options:
+            country_mask = country_codes == country_code if country_code >= 0 else np.ones(len(self.df), dtype=bool)
+            for sector, sector_code in sector_options:
+                mask = country_mask & (sector_codes == sector_code) if sector_code >= 0 else country_mask
+                if not mask.any():
+                    continue
+                subset = self.df[mask]
+                top = self.df.iloc[order[mask[order]][:self.top_n]]
+                cube[(country, sector)] = {
+                    "count": int(mask.sum()),
+                    "mean_market_cap": float(np.nanmean(market_caps[mask])),
+                    "mean_pe": float(np.nanmean(pe_ratios[mask])) if not np.isnan(pe_ratios[mask]).all() else float("nan"),
+                    "top_by_market_cap": top[["name", "market_cap_usd_b"]].assign(sector=top["sector"].astype(str)),
+                    "sector_counts": subset["sector"].astype(str).value_counts(),
+                    "company_names": sorted(subset["name"].unique()),
+                }
+        return cube
+
+    def aggregate(self, country: str = ALL, sector: str = ALL) -> Optional[Dict]:
+        """Precomputed figures for a filter, or None when no stock matches it."""
+        return self.cube.get((country, sector))
+
+    def get_stock(self, name: str) -> Optional[Dict]:
+        """Full stock record (including news) by company name."""
+        return self._stocks_by_name.get(name)
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import time
+    from .database import COMPREHENSIVE_STOCKS_DATABASE
+
+    stocks = (
+        [{**data, "symbol": symbol, "country": "India"} for symbol, data in COMPREHENSIVE_STOCKS_DATABASE["INDIAN_STOCKS"].items()]
+        + [{**data, "symbol": symbol, "country": "USA"} for symbol, data in COMPREHENSIVE_STOCKS_DATABASE["US_STOCKS"].items()]
+    )
+    start = time.perf_counter()
+    universe = StockUniverse(stocks)
+    print(f"Built cube of {len(universe.cube)} filters for {len(stocks)} stocks in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    all_stocks_df = pd.DataFrame(stocks)
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        filtered_df = all_stocks_df.copy()
+        filtered_df = filtered_df[filtered_df['country'] == "India"]
+        filtered_df = filtered_df[filtered_df['sector'] == filtered_df['sector'].iloc[0]]
+        filtered_df.shape[0], filtered_df['market_cap_usd_b'].mean(), filtered_df['pe_ratio'].mean()
+        filtered_df.nlargest(TOP_N, 'market_cap_usd_b'), filtered_df['sector'].value_counts()
+        sorted(filtered_df['name'].unique())
+    print(f"Per-render filtering: {(time.perf_counter() - start) * 1e6 / runs:.0f} µs")
+    start = time.perf_counter()
+    sector = stocks[0]["sector"]
+    for _ in range(runs):
+        universe.aggregate("India", sector)
+    print(f"Cube lookup: {(time.perf_counter() - start) * 1e6 / runs:.2f} µs")
@@ -0,0 +1,173 @@
+import math
+import time
+import numpy as np
+from .lazy_imports import lazy_import
+
+faiss = lazy_import("faiss")
+
+# --- Configuration ---
+# Below FLAT_MAX_VECTORS exact search is fast enough; up to HNSW_MAX_VECTORS a graph
+# index gives the best latency; beyond that IVF keeps build time and memory in check.
+# PQ is only used in the IVF range: below it, it loses more recall than its memory saves.
+FLAT_MAX_VECTORS = 10_000
+HNSW_MAX_VECTORS = 250_000
+HNSW_NEIGHBORS = 32
+DEFAULT_RECALL_TARGET = 0.95
+DEFAULT_RECALL_K = 10
+# Query-time parameters tried, in order, until the recall target is met.
+NPROBE_CANDIDATES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+EF_SEARCH_CANDIDATES = [16, 32, 48, 64, 96, 128, 192, 256, 384, 512, 1024]
+QUANTIZATION_OPTIONS = (None, "sq8", "pq")
+# Training sample: SQ/PQ codebooks need a fixed-size sample (PQ at least 39 x 256 vectors);
+# IVF also needs ~40 vectors per list, so nlist is capped by the largest sample.
+TRAIN_SAMPLE_VECTORS = 50_000
+TRAIN_VECTORS_PER_LIST = 40
+MAX_TRAIN_VECTORS = 200_000
+
+def _pq_subquantizers(dim: int) -> int:
+    """
+    Largest PQ sub-quantizer count <= dim/2 that divides the dimension (8 bits per code).
+    Two dimensions per byte is ~8x smaller than float32; four per byte caps recall@10 near 0.7.
+    """
+    for m in range(max(1, dim // 2), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+def choose_index_spec(n_vectors: int, dim: int, quantization: str | None = None) -> str:
+    """
+    Returns a faiss.index_factory string for the corpus size. quantization is None,
+    "sq8" (8-bit scalar, ~4x smaller) or "pq" (product quantization, ~8x smaller, recall@10
+    around 0.9). Small corpora always stay exact: their memory footprint is already negligible.
+    Below HNSW_MAX_VECTORS "pq" falls back to SQ8.
+    """
+    if quantization not in QUANTIZATION_OPTIONS:
+        raise ValueError(f"Unknown quantization '{quantization}'. Expected one of {QUANTIZATION_OPTIONS}.")
+    if n_vectors < FLAT_MAX_VECTORS:
+        return "Flat"
+    if n_vectors < HNSW_MAX_VECTORS:
+        return f"HNSW{HNSW_NEIGHBORS}_SQ8" if quantization else f"HNSW{HNSW_NEIGHBORS}"
+    # ~4 sqrt(n) lists, but never more than the training sample can fill
+    max_lists = min(n_vectors, MAX_TRAIN_VECTORS) // TRAIN_VECTORS_PER_LIST
+    nlist = int(max(16, min(4 * math.sqrt(n_vectors), max_lists)))
+    encodings = {None: "Flat", "sq8": "SQ8", "pq": f"PQ{_pq_subquantizers(dim)}"}
+    return f"IVF{nlist},{encodings[quantization]}"
+
+def _search_param_name(index) -> str | None:
+    """Name of the query-time knob ('nprobe' or 'efSearch') for the index, if any."""
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        return "nprobe"
+    if isinstance(base, faiss.IndexHNSW):
+        return "efSearch"
+    return None
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """Fraction of the true k nearest neighbours returned by the approximate search."""
+    k = truth.shape[1]
+    hits = sum(len(set(f[:k]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+def tune_search_params(index, vectors: np.ndarray, recall_target: float = DEFAULT_RECALL_TARGET,
+                       k: int = DEFAULT_RECALL_K, n_queries: int = 200, seed: int = 0) -> dict:
+    """
+    Raises nprobe / efSearch until recall@k on a sample of stored vectors meets the target.
+    The cheapest setting that meets it is left applied to the index.
+    """
+    param = _search_param_name(index)
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+    queries = vectors[sample] + rng.normal(0, 1e-3, size=(len(sample), vectors.shape[1])).astype(np.float32)
+    exact = faiss.IndexFlat(vectors.shape[1], index.metric_type)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    if param is None:
+        _, found = index.search(queries, k)
+        return {"param": None, "value": None, "recall": recall_at_k(found, truth)}
+
+    params = faiss.ParameterSpace()
+    candidates = NPROBE_CANDIDATES if param == "nprobe" else EF_SEARCH_CANDIDATES
+    if param == "nprobe":
+        candidates = [c for c in candidates if c <= faiss.downcast_index(index).nlist]
+    best = None
+    for value in candidates:
+        params.set_index_parameter(index, param, value)
+        _, found = index.search(queries, k)
+        recall = recall_at_k(found, truth)
+        if best is None or recall > best["recall"]:
+            best = {"param": param, "value": value, "recall": recall}
+        if recall >= recall_target:
+            return {"param": param, "value": value, "recall": recall}
+    print(f"[WARN] Recall target {recall_target:.2f} not reachable; using {param}={best['value']} (recall {best['recall']:.3f}).")
+    params.set_index_parameter(index, param, best["value"])
+    return best
+
+def build_index(vectors: np.ndarray, quantization: str | None = None, recall_target: float = DEFAULT_RECALL_TARGET,
+                metric=None, spec: str | None = None):
+    """
+    Builds the index type chosen for the corpus size (or an explicit factory spec),
+    trains it when needed and tunes its query-time parameters to the recall target.
+    Vectors keep their insertion order as ids, matching LangChain's FAISS wrapper.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    metric = faiss.METRIC_L2 if metric is None else metric
+    n_vectors, dim = vectors.shape
+    spec = spec or choose_index_spec(n_vectors, dim, quantization)
+    print(f"[INFO] Building FAISS index '{spec}' for {n_vectors} vectors (dim={dim})...")
+    index = faiss.index_factory(dim, spec, metric)
+    if isinstance(faiss.downcast_index(index), faiss.IndexIVFPQ):
+        # Polysemous codes only serve Hamming-filtered search, which is never enabled; skip the slow training
+        faiss.downcast_index(index).do_polysemous_training = False
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        nlist = getattr(faiss.downcast_index(index), "nlist", 0)
+        train_size = min(n_vectors, max(TRAIN_SAMPLE_VECTORS, min(TRAIN_VECTORS_PER_LIST * nlist, MAX_TRAIN_VECTORS)))
+        index.train(vectors[rng.choice(n_vectors, size=train_size, replace=False)])
+    index.add(vectors)
+    if isinstance(faiss.downcast_index(index), faiss.IndexIVF):
+        # Lets the hybrid retriever reconstruct stored vectors for fusion and MMR
+        faiss.downcast_index(index).make_direct_map()
+    tuning = tune_search_params(index, vectors, recall_target)
+    print(f"[SUCCESS] Index '{spec}' ready: {tuning['param']}={tuning['value']}, recall@{DEFAULT_RECALL_K}={tuning['recall']:.3f}")
+    return index
+
+def index_memory_bytes(index) -> int:
+    """Serialized size of the index, a close proxy for its resident memory."""
+    return int(faiss.serialize_index(index).nbytes)
+
+# Example Usage (for benchmarking)
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark auto-selected FAISS indexes on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=64, help="Embedding dimension (Gemini embedding-001 uses 768).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--quantization", nargs="+", default=["none", "sq8"], choices=["none", "sq8", "pq"],
+                        help="Quantization modes to benchmark (pq training is slow on large corpora).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'vectors':>9} {'index':<18} {'build s':>8} {'query ms':>9} {'memory MB':>10} {'recall@10':>10}")
+    for n_vectors in args.sizes:
+        # Clustered data behaves more like real embeddings than uniform noise
+        centers = rng.normal(size=(max(8, n_vectors // 500), args.dim)).astype(np.float32)
+        vectors = centers[rng.integers(0, len(centers), n_vectors)] + 0.3 * rng.normal(size=(n_vectors, args.dim)).astype(np.float32)
+        queries = vectors[rng.choice(n_vectors, args.queries, replace=False)] + 0.05 * rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(vectors)
+        _, truth = exact.search(queries, DEFAULT_RECALL_K)
+
+        for mode in args.quantization:
+            quantization = None if mode == "none" else mode
+            spec = choose_index_spec(n_vectors, args.dim, quantization)
+            start = time.perf_counter()
+            index = build_index(vectors, quantization=quantization)
+            build_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            _, found = index.search(queries, DEFAULT_RECALL_K)
+            query_ms = (time.perf_counter() - start) * 1000 / args.queries
+            print(f"{n_vectors:>9} {spec:<18} {build_seconds:>8.2f} {query_ms:>9.3f} "
+                  f"{index_memory_bytes(index) / 1e6:>10.1f} {recall_at_k(found, truth):>10.3f}")
@@ -1,85 +1,168 @@
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-import streamlit as st
+from plotly.subplots import make_subplots
+from .cache import cached
+from .config import report_error
+from .lazy_imports import lazy_import
+from .figure_cache import figure_cache
+from .downsampling import PERIOD_LABELS, downsample_line, downsample_ohlc
+from .indicators import ATR_PERIOD, EMA_SPAN, PANEL_INDICATORS, RSI_PERIOD, SMA_WINDOWS, compute_indicators
 
-@st.cache_data(ttl=900) # Cache live stock data for 15 minutes
-def create_candlestick_chart(ticker: str, company_name: str):
+yf = lazy_import("yfinance")
+px = lazy_import("plotly.express")
+
+@cached(ttl=900) # Cache live stock data for 15 minutes
+def get_price_history(ticker: str, period: str = "3mo") -> pd.DataFrame:
+    """
+    Fetches OHLC history from yfinance. Errors propagate (and are therefore not cached).
+    """
+    print(f"[VIZ] Attempting yf.download for ticker: {ticker}, period: {period}")
+    stock_df = yf.download(ticker, period=period, progress=False)
+    
+    # Flatten multi-level columns if yfinance returns them
+    if isinstance(stock_df.columns, pd.MultiIndex):
+        stock_df.columns = stock_df.columns.droplevel(1)
+    return stock_df
+
+def data_version(df: pd.DataFrame) -> int:
+    """Content hash of a DataFrame, used as the figure cache's data version."""
+    return int(pd.util.hash_pandas_object(df).sum())
+
+@cached() # Keyed by the frame's content, so it is recomputed exactly when the prices change
+def downsample_chart_data(stock_df: pd.DataFrame) -> tuple:
+    """
+    (bars, bar size label, LTTB-reduced daily close or None) for the price chart. Cached apart
+    from the figure, so changing indicators rebuilds the figure without resampling again.
+    """
+    bars, bar_size = downsample_ohlc(stock_df)
+    return bars, bar_size, downsample_line(stock_df['Close']) if len(bars) < len(stock_df) else None
+
+def _add_indicator_traces(fig, stock_df: pd.DataFrame, selected: tuple, downsample: bool):
+    """
+    Adds the selected indicators: price overlays on row 1, RSI/MACD/ATR in their own rows below.
+    Lines are WebGL traces, LTTB-reduced like the close line when the candles are aggregated.
+    """
+    values, _ = compute_indicators(stock_df)
+
+    def line(column, name, row, **style):
+        series = values[column].dropna()
+        if downsample:
+            series = downsample_line(series)
+        fig.add_trace(go.Scattergl(x=series.index, y=series.values, mode="lines", name=name,
+                                   line=dict(width=1, **style)), row=row, col=1)
+
+    for window in SMA_WINDOWS:
+        if f"SMA {window}" in selected:
+            line(f"SMA_{window}", f"SMA {window}", 1)
+    if f"EMA {EMA_SPAN}" in selected:
+        line(f"EMA_{EMA_SPAN}", f"EMA {EMA_SPAN}", 1)
+    if "Bollinger Bands" in selected:
+        for column, name in (("BB_upper", "Bollinger Upper"), ("BB_mid", "Bollinger Mid"), ("BB_lower", "Bollinger Lower")):
+            line(column, name, 1, dash="dot")
+    if "VWAP" in selected and "VWAP" in values.columns:
+        line("VWAP", "VWAP", 1, dash="dash")
+
+    panels = [panel for panel in PANEL_INDICATORS if panel in selected]
+    for row, panel in enumerate(panels, start=2):
+        if panel == "RSI":
+            line(f"RSI_{RSI_PERIOD}", f"RSI {RSI_PERIOD}", row)
+            for level in (30, 70):
+                fig.add_hline(y=level, line_dash="dot", line_color="grey", row=row, col=1)
+        elif panel == "MACD":
+            line("MACD", "MACD", row)
+            line("MACD_signal", "MACD Signal", row)
+        elif panel == "ATR":
+            line(f"ATR_{ATR_PERIOD}", f"ATR {ATR_PERIOD}", row)
+        fig.update_yaxes(title_text=panel, row=row, col=1)
+
+def create_candlestick_chart(ticker: str, company_name: str, period: str = "3mo", indicators: tuple = ()):
     """
     Fetches live historical data from yfinance and creates a candlestick chart.
+    Long ranges are downsampled server-side to fit downsampling.DEFAULT_TARGET_WIDTH_PX
+    (Streamlit does not expose the rendered width): candles are resampled to
+    weekly/monthly/quarterly bars and the daily close is overlaid as an LTTB-reduced
+    WebGL line. indicators toggles overlays/panels from indicators.INDICATOR_OPTIONS,
+    computed on the daily bars. The figure is served from the figure cache until the
+    price data changes.
     Includes robust error handling.
     """
+    indicators = tuple(sorted(indicators))
     print(f"[VIZ] Attempting to fetch live stock data for Ticker: {ticker}, Company: {company_name} from yfinance...")
     try:
-        # Ensure correct ticker format for Indian stocks
-        if ".NS" not in ticker and "India" in company_name:
-             # This logic assumes company_name will imply country. A better check could be based on a country field.
-             pass # In our case, the symbol from DB is already correct.
-        
-        print(f"[VIZ] Attempting yf.download for ticker: {ticker}, period: 3mo")
-        stock_df = yf.download(ticker, period="3mo", progress=False)
-        
-        # Flatten multi-level columns if yfinance returns them
-        if isinstance(stock_df.columns, pd.MultiIndex):
-            stock_df.columns = stock_df.columns.droplevel(1)
-
-        print(f"[VIZ] Type of stock_df for {ticker}: {type(stock_df)}")
+        stock_df = get_price_history(ticker, period)
         
         print(f"[VIZ] DataFrame shape for {ticker}: {stock_df.shape}")
         if stock_df.empty:
             print(f"[WARN] yfinance returned an EMPTY DataFrame for {ticker}. Data fetching FAILED.")
-            st.warning(f"Could not fetch live price data for **{ticker}** from Yahoo Finance. The ticker may be incorrect or the service may be temporarily unavailable.", icon="⚠️")
+            report_error(f"Could not fetch live price data for **{ticker}** from Yahoo Finance. The ticker may be incorrect or the service may be temporarily unavailable.", "warning")
             return None
-        else:
-            print(f"[INFO] Successfully fetched {len(stock_df)} data points for {ticker}. Data fetching SUCCESSFUL.")
-            print(f"[VIZ] stock_df columns for {ticker}: {stock_df.columns.tolist()}")
-            print(f"[VIZ] stock_df dtypes for {ticker}:\n{stock_df.dtypes}")
-            print(f"[VIZ] First 5 rows of Open, High, Low, Close for {ticker}:\n{stock_df[['Open', 'High', 'Low', 'Close']].head()}")
-
-        fig = go.Figure(data=[go.Candlestick(
-            x=stock_df.index,
-            open=stock_df['Open'],
-            high=stock_df['High'],
-            low=stock_df['Low'],
-            close=stock_df['Close'],
-            name='Price'
-        )])
-        
-        fig.update_layout(
-            title=f'{company_name} Stock Performance (Last 3 Months)',
-            yaxis_title='Stock Price',
-            xaxis_rangeslider_visible=False,
-            template="plotly_dark"
-        )
-        print(f"[SUCCESS] Candlestick chart created for {ticker}.")
-        return fig
+        print(f"[INFO] Successfully fetched {len(stock_df)} data points for {ticker}. Data fetching SUCCESSFUL.")
+
+        def build():
+            bars, bar_size, close = downsample_chart_data(stock_df)
+            panels = [panel for panel in PANEL_INDICATORS if panel in indicators]
+            fig = make_subplots(
+                rows=1 + len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                row_heights=[0.6] + [0.4 / len(panels)] * len(panels) if panels else [1.0]
+            )
+            fig.add_trace(go.Candlestick(
+                x=bars.index,
+                open=bars['Open'],
+                high=bars['High'],
+                low=bars['Low'],
+                close=bars['Close'],
+                name=f'Price ({bar_size})'
+            ), row=1, col=1)
+            downsampled = close is not None
+            if downsampled:
+                fig.add_trace(go.Scattergl(x=close.index, y=close.values, mode="lines", name="Daily Close",
+                                           line=dict(width=1, color="rgba(255, 255, 255, 0.6)")), row=1, col=1)
+            if indicators:
+                _add_indicator_traces(fig, stock_df, indicators, downsampled)
+            
+            fig.update_layout(
+                title=f'{company_name} Stock Performance ({PERIOD_LABELS.get(period, period)}, {bar_size} bars)',
+                yaxis_title='Stock Price',
+                xaxis_rangeslider_visible=False,
+                template="plotly_dark",
+                height=450 + 150 * len(panels)
+            )
+            print(f"[SUCCESS] Candlestick chart created for {ticker}: {len(stock_df)} days drawn as {len(bars)} {bar_size} bars.")
+            return fig
+
+        return figure_cache.get_or_build("candlestick", (ticker, company_name, period, indicators),
+                                         data_version(stock_df), build)
     except Exception as e:
         print(f"[ERROR] yfinance failed for {ticker}: {e}. Data fetching FAILED.")
-        st.error(f"An error occurred while fetching live stock data: {e}", icon="🚨")
+        report_error(f"An error occurred while fetching live stock data: {e}")
         return None
 
-def create_sentiment_pie_chart(analyzed_news: list):
+def create_sentiment_pie_chart(analyzed_news: list, cache_key: str = None):
     """
     Creates a pie chart from the news sentiment data.
+    Cached per cache_key (e.g. the ticker) until the sentiment counts change.
     """
     if not analyzed_news:
         return None
     
-    print("[VIZ] Creating sentiment pie chart...")
     df = pd.DataFrame(analyzed_news)
     sentiment_counts = df['sentiment'].value_counts().reset_index()
     
-    fig = px.pie(
-        sentiment_counts,
-        names='sentiment',
-        values='count',
-        title='Hybrid News Sentiment Breakdown',
-        color='sentiment',
-        color_discrete_map={'Positive': '#2ca02c', 'Negative': '#d62728', 'Neutral': '#7f7f7f'}
-    )
-    fig.update_layout(template="plotly_dark", legend_title_text='Sentiment')
-    return fig
+    def build():
+        print("[VIZ] Creating sentiment pie chart...")
+        fig = px.pie(
+            sentiment_counts,
+            names='sentiment',
+            values='count',
+            title='Hybrid News Sentiment Breakdown',
+            color='sentiment',
+            color_discrete_map={'Positive': '#2ca02c', 'Negative': '#d62728', 'Neutral': '#7f7f7f'}
+        )
+        fig.update_layout(template="plotly_dark", legend_title_text='Sentiment')
+        return fig
+
+    version = tuple(zip(sentiment_counts['sentiment'], sentiment_counts['count']))
+    return figure_cache.get_or_build("sentiment_pie", cache_key, version, build)
 
 def create_news_sentiment_df(analyzed_news: list) -> pd.DataFrame:
     """
@@ -93,3 +176,71 @@ def create_news_sentiment_df(analyzed_news: list) -> pd.DataFrame:
     # Ensure all columns are present and in order
     df = df.reindex(columns=['headline', 'sentiment', 'summary', 'date', 'source'], fill_value="N/A")
     return df[['headline', 'sentiment', 'summary', 'date', 'source']]
+
+def create_retirement_projection_chart(projection: dict):
+    """
+    Creates an area chart of the projected corpus by age, marking the retirement age.
+    """
+    yearly = projection["yearly"]
+    summary = projection["summary"]
+    retirement_age = int(yearly["age"][0]) - 1 + summary["working_years"]
+    fig = go.Figure(go.Scatter(
+        x=yearly["age"],
+        y=yearly["corpus"],
+        mode="lines",
+        fill="tozeroy",
+        name="Projected Corpus",
+        line=dict(color="#00ff7f")
+    ))
+    fig.add_vline(x=retirement_age, line_dash="dash", line_color="grey", annotation_text="Retirement")
+    fig.add_vline(x=summary["life_expectancy"], line_dash="dot", line_color="grey", annotation_text="Life Expectancy")
+    fig.update_layout(
+        title="Projected Retirement Corpus by Age",
+        xaxis_title="Age",
+        yaxis_title="Corpus (₹)",
+        template="plotly_dark"
+    )
+    return fig
+
+def create_retirement_fan_chart(simulation: dict):
+    """
+    Creates a fan chart of simulated corpus outcomes: p10-p90 band around the median path.
+    """
+    bands = simulation["bands"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=bands["age"], y=bands["p90"], mode="lines", line=dict(width=0), name="90th percentile", showlegend=False))
+    fig.add_trace(go.Scatter(
+        x=bands["age"], y=bands["p10"], mode="lines", line=dict(width=0), fill="tonexty",
+        fillcolor="rgba(0, 255, 127, 0.2)", name="10th-90th percentile"
+    ))
+    fig.add_trace(go.Scatter(x=bands["age"], y=bands["p50"], mode="lines", line=dict(color="#00ff7f"), name="Median"))
+    fig.update_layout(
+        title=f"Simulated Corpus Range ({simulation['summary']['paths']:,} scenarios)",
+        xaxis_title="Age",
+        yaxis_title="Corpus (₹)",
+        template="plotly_dark"
+    )
+    return fig
+
+def create_retirement_sensitivity_heatmap(grid: dict):
+    """
+    Creates a heatmap of the funded ratio (corpus / required corpus) by retirement age and return.
+    Cells at or above 100% are fully funded.
+    """
+    funded_percent = (grid["funded_ratio"] * 100).clip(max=300)  # Keep the colour scale readable
+    fig = go.Figure(go.Heatmap(
+        x=[f"{r:.0f}%" for r in grid["return_percent"]],
+        y=grid["retirement_age"],
+        z=funded_percent,
+        zmid=100,
+        colorscale="RdYlGn",
+        colorbar=dict(title="Funded %"),
+        hovertemplate="Retire at %{y}<br>Return %{x}<br>Funded %{z:.0f}%<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Funded Ratio by Retirement Age and Annual Return",
+        xaxis_title="Expected Annual Return (pre-retirement)",
+        yaxis_title="Retirement Age",
+        template="plotly_dark"
+    )
+    return fig
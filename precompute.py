@@ -0,0 +1,55 @@
+"""
+Batch precomputation of the Dashboard's per-stock results (AI summary, analyzed news, default
+price chart) for the whole stock universe, so the most-viewed pages are served instantly.
+Run it from cron or any scheduler more often than FINCHAT_PRECOMPUTED_MAX_AGE:
+
+    python precompute.py [--workers 4] [--symbols RELIANCE.NS AAPL ...]
+    python precompute.py --status
+
+Results go to the versioned PrecomputedStore (modules/precomputed.py) that the app reads
+first; anything missing or stale is generated on demand as before. With
+FINCHAT_CACHE_BACKEND=shared the job also warms the cache the app replicas share.
+"""
+import argparse
+import sys
+from datetime import datetime
+from modules.data_fetcher import EnhancedFinancialDataFetcher
+from modules.precomputed import BATCH_WORKERS, PrecomputedStore, precompute_universe
+
+def print_status(store: PrecomputedStore):
+    for run in store.runs():
+        started = datetime.fromtimestamp(run["started_at"]).isoformat(timespec="seconds")
+        state = "running" if run["finished_at"] is None else f"{run['finished_at'] - run['started_at']:.0f} s"
+        print(f"run {run['run_id']} started {started} ({state}): {run['stocks']} stocks, "
+              f"{run['results']} results, {run['failures']} failures")
+    print(f"Store: {store.stats()}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute summaries, sentiment and charts for every stock.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Stocks processed concurrently.")
+    parser.add_argument("--symbols", nargs="+", help="Only these symbols (default: the whole universe).")
+    parser.add_argument("--status", action="store_true", help="Show recent runs and exit.")
+    args = parser.parse_args()
+
+    store = PrecomputedStore()
+    if args.status:
+        print_status(store)
+        sys.exit(0)
+
+    fetcher = EnhancedFinancialDataFetcher()
+    stocks = fetcher.get_all_stocks()
+    if args.symbols:
+        unknown = set(args.symbols) - {stock["symbol"] for stock in stocks}
+        if unknown:
+            sys.exit(f"Unknown symbol(s): {', '.join(sorted(unknown))}")
+        stocks = [stock for stock in stocks if stock["symbol"] in args.symbols]
+
+    run = precompute_universe(stocks, fetcher, store, max_workers=args.workers)
+    for symbol, stock_errors in run["status"].items():
+        if stock_errors:
+            print(f"[WARN] PRECOMPUTE: {symbol}: {stock_errors}")
+        else:
+            print(f"[SUCCESS] PRECOMPUTE: {symbol} stored.")
+    print(f"Run {run['run_id']}: {run['stocks']} stocks in {run['seconds']:.1f} s with {args.workers} workers, "
+          f"{run['results']} results stored, {run['failures']} failed")
+    sys.exit(1 if run["failures"] else 0)
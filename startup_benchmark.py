@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark: imports app.py (which renders the Home page in bare mode) in fresh
+interpreters, prints an import-time profile, and exits non-zero if the median cold start
+exceeds the budget or a heavy dependency was imported eagerly.
+
+    python startup_benchmark.py [--runs 5] [--budget-ms 2000] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# --- Configuration ---
+COLD_START_BUDGET_MS = float(os.environ.get("FINCHAT_COLD_START_BUDGET_MS", "2000"))
+# Dependencies only some pages need; they must load lazily (modules/lazy_imports.py)
+HEAVY_MODULES = ("google.generativeai", "langchain_google_genai", "langchain_community", "faiss", "pypdf", "docx",
+                 "yfinance", "finnhub", "googletrans", "PIL.Image", "plotly.express")
+
+CHILD_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+wall_ms = (time.perf_counter() - start) * 1000
+from modules.lazy_imports import import_report
+heavy = json.loads(sys.argv[1])
+print(json.dumps({"wall_ms": wall_ms, "eager": [m for m in heavy if m in sys.modules], "lazy": import_report()}))
+"""
+
+def run_cold_start(heavy_modules=HEAVY_MODULES) -> dict:
+    """One cold import of app.py in a fresh interpreter, with -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT, json.dumps(list(heavy_modules))],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app.py failed:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["imports"] = parse_importtime(result.stderr)
+    return report
+
+def parse_importtime(stderr: str) -> list:
+    """(module, self_us, cumulative_us, depth) for each -X importtime line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us), (len(name) - len(name.lstrip())) // 2))
+    return rows
+
+def print_profile(imports: list, top: int):
+    """Top-level packages by cumulative import time, then the slowest modules by self time."""
+    roots = sorted((row for row in imports if row[3] <= 1), key=lambda row: -row[2])[:top]
+    print("\nSlowest top-level imports (cumulative):")
+    for name, _, cumulative_us, _ in roots:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print("\nSlowest modules (self time):")
+    for name, self_us, _, _ in sorted(imports, key=lambda row: -row[1])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure app.py cold start against a budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Rows in the import-time profile.")
+    args = parser.parse_args()
+
+    reports = [run_cold_start() for _ in range(args.runs)]
+    walls = [report["wall_ms"] for report in reports]
+    median = statistics.median(walls)
+    print(f"Cold start of app.py over {args.runs} runs: median {median:.0f} ms "
+          f"(min {min(walls):.0f}, max {max(walls):.0f}); budget {args.budget_ms:.0f} ms")
+    print_profile(reports[walls.index(median)]["imports"] if median in walls else reports[0]["imports"], args.top)
+
+    lazy = reports[0]["lazy"]
+    print(f"\nLazy dependencies loaded during startup: "
+          f"{', '.join(entry['target'] for entry in lazy if entry['loaded']) or 'none'} (of {len(lazy)})")
+    eager = sorted({module for report in reports for module in report["eager"]})
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median cold start {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if eager:
+        failures.append(f"heavy modules imported at startup: {', '.join(eager)}")
+    if failures:
+        print("\n[FAIL] " + "; ".join(failures))
+        sys.exit(1)
+    print("\n[PASS] Cold start within budget; no heavy module imported eagerly.")
@@ -1,46 +1,84 @@
 import requests
 import json
+import asyncio
 from datetime import datetime
-from urllib.parse import quote_plus, urljoin
+from urllib.parse import quote_plus, urljoin, urlparse
 import time
 from typing import List, Dict, Optional
+import aiohttp
 import feedparser
+from modules.article_extractor import extract_markdown, extraction_pool
+from modules.content_cache import ContentCache
 
 # API Keys - Get these for free from the respective services
 BRAVE_API_KEY = "YOUR_BRAVE_API_KEY"  # Get from https://brave.com/search/api/
 SERPAPI_KEY = "YOUR_SERPAPI_KEY"      # Get from https://serpapi.com/
 FIRECRAWL_API_KEY = "YOUR_FIRECRAWL_KEY"  # Get from https://firecrawl.dev/
 
+# Concurrent extraction settings
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+MAX_CONCURRENT_EXTRACTIONS = 8       # Requests in flight across all hosts
+JINA_TIMEOUT, FIRECRAWL_TIMEOUT, PAGE_TIMEOUT = 20, 30, 15
+PREVIEW_WORDS = 300
+# Politeness per contacted host: (max concurrent requests, min seconds between request starts).
+# Extraction APIs take parallel calls; publisher sites fetched directly get one request at a time.
+HOST_POLICIES = {
+    "r.jina.ai": (5, 0.0),
+    "api.firecrawl.dev": (5, 0.0),
+}
+DEFAULT_HOST_POLICY = (1, 1.0)
+
+def _preview(content: str) -> str:
+    """First PREVIEW_WORDS words of extracted content"""
+    words = content.split()
+    return ' '.join(words[:PREVIEW_WORDS]) + ('...' if len(words) > PREVIEW_WORDS else '')
+
+# Each method's raw response -> extracted content, or None if extraction failed.
+# Only extracted content is cached; failures are retried next run.
+
+def _jina_content(text: str) -> Optional[str]:
+    # Jina returns markdown-formatted content, perfect for LLMs
+    return text if text and len(text.strip()) > 100 else None
+
+def _firecrawl_content(data: Dict) -> Optional[str]:
+    if data.get('success') and data.get('data', {}).get('markdown'):
+        return data['data']['markdown']
+    return None
+
+TOO_SHORT = "Content too short or extraction failed"
+
+def _is_usable(result: str) -> bool:
+    return bool(result) and not result.startswith("❌") and not result.startswith("⚠️") and len(result) > 50
+
 class EnhancedNewsScraper:
-    def __init__(self):
+    def __init__(self, cache: Optional[ContentCache] = None):
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            'User-Agent': USER_AGENT
         })
+        # Every extraction method reads through the on-disk content cache
+        self.cache = cache or ContentCache()
+    
+    def _extract_cached(self, url: str, method: str, extract, failure: str) -> str:
+        content = self.cache.get_or_extract(url, method, extract)
+        return _preview(content) if content is not None else failure
     
     def jina_extract_content(self, url: str) -> str:
         """
         Use Jina Reader API for LLM-optimized content extraction (FREE)
         No API key required - just prepend the URL
         """
-        try:
+        def extract():
             jina_url = f"https://r.jina.ai/{url}"
             print(f"    🤖 Using Jina AI to extract content...")
             
-            response = self.session.get(jina_url, timeout=20)
+            response = self.session.get(jina_url, timeout=JINA_TIMEOUT)
             response.raise_for_status()
             
-            content = response.text
-            
-            # Jina returns markdown-formatted content, perfect for LLMs
-            if content and len(content.strip()) > 100:
-                # Limit to first 300 words for preview
-                words = content.split()[:300]
-                result = ' '.join(words)
-                return result + ('...' if len(content.split()) > 300 else '')
-            
-            return "Content too short or extraction failed"
-            
+            return _jina_content(response.text)
+        
+        try:
+            return self._extract_cached(url, "jina", extract, TOO_SHORT)
         except Exception as e:
             return f"❌ Jina extraction failed: {str(e)[:100]}"
     
@@ -51,7 +89,7 @@ class EnhancedNewsScraper:
         if FIRECRAWL_API_KEY == "YOUR_FIRECRAWL_KEY":
             return "⚠️ FireCrawl API key not configured"
         
-        try:
+        def extract():
             firecrawl_url = "https://api.firecrawl.dev/v0/scrape"
             headers = {
                 'Authorization': f'Bearer {FIRECRAWL_API_KEY}',
@@ -65,26 +103,38 @@ class EnhancedNewsScraper:
             }
             
             print(f"    🔥 Using FireCrawl to extract content...")
-            response = self.session.post(firecrawl_url, json=payload, headers=headers, timeout=30)
+            response = self.session.post(firecrawl_url, json=payload, headers=headers, timeout=FIRECRAWL_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
-            if data.get('success') and data.get('data', {}).get('markdown'):
-                content = data['data']['markdown']
-                words = content.split()[:300]
-                result = ' '.join(words)
-                return result + ('...' if len(content.split()) > 300 else '')
-            
-            return "FireCrawl extraction failed"
-            
+            return _firecrawl_content(response.json())
+        
+        try:
+            return self._extract_cached(url, "firecrawl", extract, "FireCrawl extraction failed")
         except Exception as e:
             return f"❌ FireCrawl error: {str(e)[:100]}"
     
+    def local_extract_content(self, url: str) -> str:
+        """
+        Fetch the page itself and extract the article locally (readability scoring in a
+        process pool) - no third-party hop
+        """
+        def extract():
+            print(f"    🌐 Fetching page and extracting locally...")
+            response = self.session.get(url, timeout=PAGE_TIMEOUT)
+            response.raise_for_status()
+            return extraction_pool().submit(extract_markdown, response.text).result()
+        
+        try:
+            return self._extract_cached(url, "local", extract, TOO_SHORT)
+        except Exception as e:
+            return f"❌ Local extraction failed: {str(e)[:100]}"
+    
     def extract_with_multiple_methods(self, url: str) -> str:
         """
         Try multiple extraction methods in order of preference
         """
         methods = [
+            ("Local", lambda: self.local_extract_content(url)),
             ("Jina AI (Free)", lambda: self.jina_extract_content(url)),
             ("FireCrawl", lambda: self.firecrawl_extract_content(url)),
         ]
@@ -92,13 +142,134 @@ class EnhancedNewsScraper:
         for method_name, method_func in methods:
             try:
                 result = method_func()
-                if result and not result.startswith("❌") and not result.startswith("⚠️") and len(result) > 50:
+                if _is_usable(result):
                     return f"[{method_name}] {result}"
             except Exception:
                 continue
         
         return "❌ All extraction methods failed"
 
+class PoliteScheduler:
+    """
+    Admits requests under a global concurrency cap and a per-host policy (HOST_POLICIES):
+    at most N requests in flight per host and a minimum gap between request starts.
+    Replaces fixed sleeps after every article: only requests to the same host wait.
+    """
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_EXTRACTIONS):
+        self.global_slots = asyncio.Semaphore(max_concurrent)
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.next_start: Dict[str, float] = {}
+
+    def _policy(self, host: str):
+        return HOST_POLICIES.get(host, DEFAULT_HOST_POLICY)
+
+    async def _wait_turn(self, host: str):
+        min_interval = self._policy(host)[1]
+        loop = asyncio.get_running_loop()
+        start = max(loop.time(), self.next_start.get(host, 0.0))
+        self.next_start[host] = start + min_interval   # Reserve the slot before sleeping
+        await asyncio.sleep(start - loop.time())
+
+    async def run(self, url: str, request):
+        """Awaits request() once url's host and the global cap admit it"""
+        host = urlparse(url).hostname or ""
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self._policy(host)[0])
+        async with self.host_slots[host]:
+            await self._wait_turn(host)
+            async with self.global_slots:
+                return await request()
+
+class AsyncArticleExtractor:
+    """
+    Extracts many articles concurrently: each article tries local extraction of the fetched
+    page, then Jina, then FireCrawl, and every request goes through one PoliteScheduler,
+    so total time approaches the slowest single article rather than the sum.
+    """
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_EXTRACTIONS, cache: Optional[ContentCache] = None):
+        self.max_concurrent = max_concurrent
+        self.cache = cache or ContentCache()
+
+    async def _extract_cached(self, url: str, method: str, extract, failure: str) -> str:
+        """Same cache as EnhancedNewsScraper; only misses are scheduled for the network."""
+        content = self.cache.get(url, method)
+        if content is None:
+            content = await extract()
+            if content is None:
+                return failure
+            self.cache.put(url, method, content)
+        return _preview(content)
+
+    async def _get_text(self, session, url: str, timeout: float, **kwargs) -> str:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def jina_extract_content(self, session, scheduler: PoliteScheduler, url: str) -> str:
+        jina_url = f"https://r.jina.ai/{url}"
+
+        async def extract():
+            return _jina_content(await scheduler.run(jina_url, lambda: self._get_text(session, jina_url, JINA_TIMEOUT)))
+
+        try:
+            return await self._extract_cached(url, "jina", extract, TOO_SHORT)
+        except Exception as e:
+            return f"❌ Jina extraction failed: {str(e)[:100] or type(e).__name__}"
+
+    async def firecrawl_extract_content(self, session, scheduler: PoliteScheduler, url: str) -> str:
+        if FIRECRAWL_API_KEY == "YOUR_FIRECRAWL_KEY":
+            return "⚠️ FireCrawl API key not configured"
+        firecrawl_url = "https://api.firecrawl.dev/v0/scrape"
+
+        async def request():
+            async with session.post(
+                firecrawl_url, timeout=aiohttp.ClientTimeout(total=FIRECRAWL_TIMEOUT),
+                json={'url': url, 'formats': ['markdown'], 'onlyMainContent': True},
+                headers={'Authorization': f'Bearer {FIRECRAWL_API_KEY}'},
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        async def extract():
+            return _firecrawl_content(await scheduler.run(firecrawl_url, request))
+
+        try:
+            return await self._extract_cached(url, "firecrawl", extract, "FireCrawl extraction failed")
+        except Exception as e:
+            return f"❌ FireCrawl error: {str(e)[:100] or type(e).__name__}"
+
+    async def local_extract_content(self, session, scheduler: PoliteScheduler, url: str) -> str:
+        async def extract():
+            page_html = await scheduler.run(url, lambda: self._get_text(session, url, PAGE_TIMEOUT))
+            return await asyncio.get_running_loop().run_in_executor(extraction_pool(), extract_markdown, page_html)
+
+        try:
+            return await self._extract_cached(url, "local", extract, TOO_SHORT)
+        except Exception as e:
+            return f"❌ Local extraction failed: {str(e)[:100] or type(e).__name__}"
+
+    async def extract_with_multiple_methods(self, session, scheduler: PoliteScheduler, url: str) -> str:
+        methods = [
+            ("Local", self.local_extract_content),
+            ("Jina AI (Free)", self.jina_extract_content),
+            ("FireCrawl", self.firecrawl_extract_content),
+        ]
+        for method_name, method in methods:
+            result = await method(session, scheduler, url)
+            if _is_usable(result):
+                return f"[{method_name}] {result}"
+        return "❌ All extraction methods failed"
+
+    async def _extract_all(self, urls: List[str]) -> List[str]:
+        scheduler = PoliteScheduler(self.max_concurrent)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
+        async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT}) as session:
+            return await asyncio.gather(*(self.extract_with_multiple_methods(session, scheduler, url) for url in urls))
+
+    def extract_many(self, urls: List[str]) -> List[str]:
+        """Extracted content for each URL, in order"""
+        return asyncio.run(self._extract_all(urls)) if urls else []
+
 class EnhancedLinkFetcher:
     def __init__(self):
         self.session = requests.Session()
@@ -239,7 +410,6 @@ def comprehensive_financial_news_search(query: str, max_articles: int = 10, extr
     Main function that combines enhanced link fetching with LLM-based content extraction
     """
     link_fetcher = EnhancedLinkFetcher()
-    scraper = EnhancedNewsScraper()
     
     # Get articles from multiple search engines
     articles = link_fetcher.get_comprehensive_links(query, max_articles)
@@ -252,6 +422,12 @@ def comprehensive_financial_news_search(query: str, max_articles: int = 10, extr
     results.append("🤖 Using AI-powered content extraction")
     results.append("=" * 80)
     
+    if extract_full_content:
+        print(f"  🤖 AI-extracting content from {len(articles)} articles concurrently...")
+        start = time.perf_counter()
+        extracted = AsyncArticleExtractor().extract_many([article['url'] for article in articles])
+        print(f"  ✅ Extraction finished in {time.perf_counter() - start:.1f}s")
+    
     for i, article in enumerate(articles, 1):
         article_info = f"""📰 Article {i}:
 - Title: {article['title']}
@@ -260,10 +436,7 @@ def comprehensive_financial_news_search(query: str, max_articles: int = 10, extr
 - URL: {article['url']}"""
         
         if extract_full_content:
-            print(f"  🤖 AI-extracting content from article {i}/{len(articles)}...")
-            extracted_content = scraper.extract_with_multiple_methods(article['url'])
-            article_info += f"\n- 📄 AI-Extracted Content:\n  {extracted_content}"
-            time.sleep(2)  # Be respectful to APIs
+            article_info += f"\n- 📄 AI-Extracted Content:\n  {extracted[i - 1]}"
         elif article.get('description'):
             article_info += f"\n- 📄 Description: {article['description']}"
         
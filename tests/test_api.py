@@ -0,0 +1,57 @@
+import pytest
+from starlette.testclient import TestClient
+import api
+from modules.news_store import NewsStore
+
+RETIREMENT_USER = {
+    "current_age": 30, "retirement_age": 60, "monthly_salary_inr": 100000, "monthly_expenses_inr": 50000,
+    "current_savings_inr": 1000000, "expected_salary_growth_percent": 6, "expected_inflation_percent": 6,
+}
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "RUN_NEWS_INGESTER", False)
+    monkeypatch.setattr(api, "NewsStore", lambda: NewsStore(str(tmp_path / "news.db")))
+    with TestClient(api.app) as client:
+        yield client
+
+def test_health_and_stock_filters(client):
+    assert client.get("/health").json()["stocks"] > 0
+    stocks = client.get("/stocks", params={"country": "USA"}).json()["stocks"]
+    assert stocks and all(stock["country"] == "USA" for stock in stocks)
+
+def test_invalid_json_and_missing_fields_are_400(client):
+    response = client.post("/chat", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    assert client.post("/chat", json=["question"]).status_code == 400
+    response = client.post("/chat", json={})
+    assert response.status_code == 400 and "question" in response.json()["error"]
+
+def test_unknown_symbol_and_empty_overview_are_404(client):
+    assert client.post("/news/sentiment", json={"symbol": "NOPE"}).status_code == 404
+    assert client.get("/stocks/overview", params={"country": "Atlantis"}).status_code == 404
+    assert client.post("/news/sentiment", json={}).status_code == 400
+
+def test_retirement_input_errors_are_400(client):
+    response = client.post("/retirement/plan", json={"user_data": {**RETIREMENT_USER, "retirement_age": 25}})
+    assert response.status_code == 400
+    assert "Retirement age" in response.json()["error"]
+    response = client.post("/retirement/plan", json={"user_data": {**RETIREMENT_USER, "current_age": "thirty"}})
+    assert response.status_code == 400
+    response = client.post("/retirement/plan", json={"user_data": {"current_age": 30}})
+    assert response.status_code == 400 and "retirement_age" in response.json()["error"]
+
+def test_streamed_chat_holds_a_call_slot(client, monkeypatch):
+    free_slots = []
+
+    def fake_stream(question, fetcher, file_context=""):
+        free_slots.append(api._call_slots._value)
+        yield "part one, "
+        free_slots.append(api._call_slots._value)
+        yield "part two"
+
+    monkeypatch.setattr(api, "stream_comprehensive_response", fake_stream)
+    response = client.post("/chat", params={"stream": "true"}, json={"question": "Outlook for TCS?"})
+    assert response.text == "part one, part two"
+    assert free_slots == [api.MAX_CONCURRENT_CALLS - 1] * 2
+    assert api._call_slots._value == api.MAX_CONCURRENT_CALLS
@@ -0,0 +1,148 @@
+import inspect
+import io
+import pandas as pd
+import pytest
+from modules import cache as cache_module
+from modules.cache import MISS, DiskCache, MemoryCache, SharedCache, cached, call_key, set_cache
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def backend():
+    backend = MemoryCache()
+    set_cache(backend)
+    yield backend
+    set_cache(None)
+
+def key_of(func, *args, **kwargs):
+    return call_key(inspect.signature(func), args, kwargs)
+
+def test_call_key_normalizes_arguments():
+    def f(ticker, period="3mo", options=None, _session=None):
+        pass
+    assert key_of(f, "TCS.NS") == key_of(f, ticker="TCS.NS", period="3mo")
+    assert key_of(f, "TCS.NS", _session=object()) == key_of(f, "TCS.NS", _session=object())
+    assert key_of(f, "TCS.NS", options={"a": 1, "b": 2}) == key_of(f, "TCS.NS", options={"b": 2, "a": 1})
+    assert key_of(f, "TCS.NS") != key_of(f, "INFY.NS")
+    assert key_of(f, "TCS.NS", "1y") != key_of(f, "TCS.NS", "3mo")
+    signature = inspect.signature(f)
+    assert call_key(signature, ("TCS.NS",), {}, "v1") != call_key(signature, ("TCS.NS",), {}, "v2")
+
+def test_call_key_hashes_frames_and_files_by_content():
+    def f(data):
+        pass
+    frame = pd.DataFrame({"Close": [1.0, 2.0]})
+    assert key_of(f, frame) == key_of(f, frame.copy())
+    assert key_of(f, frame) != key_of(f, frame.assign(Close=[1.0, 3.0]))
+    first, second = io.BytesIO(b"report"), io.BytesIO(b"report")
+    first.name = second.name = "report.pdf"
+    assert key_of(f, first) == key_of(f, second)
+    second = io.BytesIO(b"other")
+    second.name = "report.pdf"
+    assert key_of(f, first) != key_of(f, second)
+
+def test_memory_cache_ttl_lru_and_clear(clock):
+    memory = MemoryCache(max_bytes=400)
+    memory.set("ns", "short", "x", ttl=10)
+    memory.set("ns", "forever", "y")
+    clock.now += 9
+    assert memory.get("ns", "short") == (True, "x")
+    clock.now += 2
+    assert memory.get("ns", "short") == MISS and memory.get("ns", "forever") == (True, "y")
+    for i in range(10):
+        memory.set("ns", f"big{i}", "z" * 100)
+    assert memory.stats()["bytes"] <= 400 and memory.get("ns", "big0") == MISS and memory.get("ns", "big9")[0]
+    memory.set("other", "k", 1)
+    memory.clear("ns")
+    assert memory.get("ns", "big9") == MISS and memory.get("other", "k") == (True, 1)
+
+def test_disk_cache_persists_and_expires(tmp_path, clock):
+    DiskCache(str(tmp_path)).set("ns", "k", {"value": 1}, ttl=60)
+    disk = DiskCache(str(tmp_path))
+    assert disk.get("ns", "k") == (True, {"value": 1})
+    clock.now += 61
+    assert disk.get("ns", "k") == MISS and not list(tmp_path.joinpath("ns").glob("*.pkl"))
+
+def test_disk_lease_is_exclusive_until_released_or_expired(tmp_path, clock):
+    first, second = DiskCache(str(tmp_path)), DiskCache(str(tmp_path))
+    token = first.acquire_lease("ns", "k", ttl=30)
+    assert token and second.acquire_lease("ns", "k", ttl=1000) is None
+    second.release_lease("ns", "k", "not-the-owner")
+    assert second.acquire_lease("ns", "k") is None
+    clock.now += 31   # The holder's own TTL, not the caller's, decides expiry
+    stolen = second.acquire_lease("ns", "k")
+    assert stolen and stolen != token
+    first.release_lease("ns", "k", token)   # A lapsed holder cannot release the new lease
+    assert first.acquire_lease("ns", "k") is None
+    second.release_lease("ns", "k", stolen)
+    assert first.acquire_lease("ns", "k")
+
+def test_cached_returns_copies_skips_errors_and_honours_ttl(backend, clock):
+    calls = []
+
+    @cached(ttl=60)
+    def fetch(ticker, _session=None):
+        calls.append(ticker)
+        if ticker == "BAD":
+            raise RuntimeError("upstream down")
+        return {"ticker": ticker, "prices": [1, 2]}
+
+    first = fetch("TCS", _session="a")
+    first["prices"].append(3)
+    assert fetch("TCS", _session="b") == {"ticker": "TCS", "prices": [1, 2]} and calls == ["TCS"]
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            fetch("BAD")
+    assert calls == ["TCS", "BAD", "BAD"]
+    clock.now += 61
+    fetch("TCS")
+    fetch.clear()
+    fetch("TCS")
+    assert calls.count("TCS") == 3
+
+def test_shared_cache_is_visible_across_instances_and_expires(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    writer, reader = SharedCache(path), SharedCache(path)
+    writer.set("ns", "small", [1, 2, 3], ttl=60)
+    writer.set("ns", "large", "x" * 10_000)
+    assert reader.get("ns", "small") == (True, [1, 2, 3])
+    assert reader.get("ns", "large") == (True, "x" * 10_000)
+    assert reader.stats()["bytes"] < 1000   # The large pickle is stored compressed
+    clock.now += 61
+    assert reader.get("ns", "small") == MISS and reader.get("ns", "large")[0]
+
+def test_shared_cache_evicts_least_recently_read(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "SHARED_EVICTION_INTERVAL", 1)
+    shared = SharedCache(str(tmp_path / "cache.db"), max_bytes=350)
+    for i in range(3):
+        shared.set("ns", f"k{i}", bytes(100 + i))   # ~110-byte pickles, below the compression threshold
+        clock.now += 120
+    assert shared.get("ns", "k0")[0]   # Refreshes k0's access time
+    clock.now += 120
+    shared.set("ns", "k3", bytes(100))
+    assert shared.get("ns", "k1") == MISS
+    assert all(shared.get("ns", key)[0] for key in ("k0", "k2", "k3"))
+
+def test_shared_lease_is_exclusive_until_released_or_expired(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    first, second = SharedCache(path), SharedCache(path)
+    token = first.acquire_lease("ns", "k", ttl=30)
+    assert token and second.acquire_lease("ns", "k") is None
+    second.release_lease("ns", "k", "not-the-owner")
+    assert second.acquire_lease("ns", "k") is None
+    clock.now += 31
+    stolen = second.acquire_lease("ns", "k")
+    assert stolen
+    first.release_lease("ns", "k", token)
+    assert first.acquire_lease("ns", "k") is None
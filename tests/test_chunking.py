@@ -0,0 +1,63 @@
+import io
+import pytest
+import modules.chunking as chunking_module
+from modules.chunking import DEFAULT_TOKENIZER_PATH, chunk_pages, count_tokens, load_tokenizer
+from modules.doc_qa import get_document_pages
+
+TEXT = "Revenue rose 12.5% to ₹1,234 crore (FY24), while EBITDA margins narrowed; the board's outlook is cautious."
+
+def test_count_tokens_matches_the_tokenizer():
+    tokenizer = load_tokenizer()
+    if tokenizer is None:
+        pytest.skip("tokenizer not available")
+    assert count_tokens(TEXT) == len(tokenizer.encode(TEXT, add_special_tokens=False).ids)
+
+def test_chunks_respect_budget_and_track_pages():
+    pages = [(page, "\n\n".join(f"Paragraph {page}.{i}: {TEXT}" for i in range(6))) for page in range(1, 11)]
+    chunks = chunk_pages(pages, max_tokens=200, overlap_tokens=40)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        meta = chunk["metadata"]
+        assert meta["token_count"] == count_tokens(chunk["text"]) <= 200
+        assert meta["page_start"] <= meta["page_end"]
+    assert [chunk["metadata"]["chunk_id"] for chunk in chunks] == list(range(len(chunks)))
+    assert chunks[0]["metadata"]["page_start"] == 1 and chunks[-1]["metadata"]["page_end"] == 10
+    # Overlap: each chunk starts with the previous chunk's last paragraph
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk["text"].split("\n\n")[0] == previous["text"].split("\n\n")[-1]
+
+def test_oversized_paragraph_is_windowed_on_word_boundaries():
+    words = " ".join(f"w{i}" for i in range(1000))
+    chunks = chunk_pages([(3, words)], max_tokens=100, overlap_tokens=10)
+    assert len(chunks) > 5
+    assert all(chunk["metadata"]["token_count"] <= 100 for chunk in chunks)
+    assert all(chunk["text"].split()[0].startswith("w") for chunk in chunks)
+    assert chunks[-1]["text"].endswith("w999")
+
+def test_empty_pages_give_no_chunks():
+    assert chunk_pages([(1, ""), (2, "  \n\n  ")]) == []
+
+def test_docx_paragraphs_become_separate_chunking_units():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    for i in range(6):
+        document.add_paragraph(f"Paragraph {i}: {TEXT}")
+    upload = io.BytesIO()
+    document.save(upload)
+    upload.seek(0)
+    upload.name = "report.docx"
+    pages = get_document_pages(upload)
+    assert [page for page, _ in pages] == [1]
+    paragraphs = [f"Paragraph {i}: {TEXT}" for i in range(6)]
+    chunks = chunk_pages(pages, max_tokens=80, overlap_tokens=0)
+    # Each paragraph fits the budget on its own, so chunks hold whole paragraphs, never pieces
+    assert [unit for chunk in chunks for unit in chunk["text"].split("\n\n")] == paragraphs
+
+def test_word_count_memo_is_bounded(monkeypatch):
+    if load_tokenizer() is None:
+        pytest.skip("tokenizer not available")
+    monkeypatch.setattr(chunking_module, "WORD_CACHE_MAX_WORDS", 50)
+    for batch in range(5):
+        text = " ".join(f"word{batch}x{i}" for i in range(30))
+        assert count_tokens(text) == len(load_tokenizer().encode(text, add_special_tokens=False).ids)
+        assert len(chunking_module._word_token_counts[DEFAULT_TOKENIZER_PATH]) <= 50
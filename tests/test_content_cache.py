@@ -0,0 +1,85 @@
+import base64
+import os
+import pytest
+import modules.content_cache as content_cache_module
+from modules.content_cache import ContentCache, cache_key, canonicalize_url
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(content_cache_module.time, "time", clock)
+    return clock
+
+def incompressible(n_bytes: int) -> str:
+    return base64.b64encode(os.urandom(n_bytes)).decode()
+
+def stored_sum(cache: ContentCache) -> int:
+    return cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM extracted_content").fetchone()[0]
+
+@pytest.mark.parametrize("url", [
+    "https://www.example.com/markets/story?utm_source=twitter&utm_medium=social",
+    "https://www.example.com/markets/story?fbclid=abc&GCLID=x#comments",
+    "HTTPS://WWW.Example.COM:443/markets/story/",
+    "https://www.example.com/markets/story#section-2",
+])
+def test_trivially_different_urls_share_a_canonical_form(url):
+    assert canonicalize_url(url) == "https://www.example.com/markets/story"
+    assert cache_key(url, "jina") == cache_key("https://www.example.com/markets/story", "jina")
+
+def test_canonical_urls_keep_what_changes_the_page():
+    assert canonicalize_url("https://example.com/a?page=2&id=7&utm_campaign=x") == "https://example.com/a?id=7&page=2"
+    assert canonicalize_url("http://example.com:8080/") == "http://example.com:8080/"
+    assert canonicalize_url("https://example.com/Markets/Story") == "https://example.com/Markets/Story"
+    assert cache_key("https://example.com/a", "jina") != cache_key("https://example.com/a", "newspaper")
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ContentCache(str(tmp_path / "content.db"), ttl=60)
+    cache.put("https://example.com/a", "jina", "body")
+    clock.now += 59
+    assert cache.get("https://example.com/a?utm_source=x", "jina") == "body"
+    clock.now += 2
+    assert cache.get("https://example.com/a", "jina") is None
+    assert cache.get_or_extract("https://example.com/a", "jina", lambda: "fresh") == "fresh"
+    assert cache.get("https://example.com/a", "jina") == "fresh"
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_least_recently_read_entries_are_evicted_by_size(tmp_path, clock):
+    cache = ContentCache(str(tmp_path / "content.db"), max_bytes=10_000)
+    for name in "abc":
+        clock.now += 1
+        cache.put(f"https://example.com/{name}", "jina", incompressible(3_000))
+    clock.now += 1
+    assert cache.get("https://example.com/a", "jina") is not None   # a is now more recent than b
+    clock.now += 1
+    cache.put("https://example.com/d", "jina", incompressible(3_000))
+    kept = {name for name in "abcd" if cache.get(f"https://example.com/{name}", "jina") is not None}
+    assert kept == {"a", "c", "d"}
+    assert cache._stored_bytes(cache._connect()) == stored_sum(cache) == cache.stats()["compressed_bytes"] <= 10_000
+
+def test_eviction_runs_only_past_the_cap(tmp_path, clock, monkeypatch):
+    cache = ContentCache(str(tmp_path / "content.db"), max_bytes=10_000)
+    evictions = []
+    real_evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda conn, now: evictions.append(now) or real_evict(conn, now))
+    for i in range(3):
+        cache.put(f"https://example.com/{i}", "jina", incompressible(3_000))
+    cache.put("https://example.com/0", "jina", incompressible(2_000))     # replacing keeps the total right
+    assert evictions == [] and cache._stored_bytes(cache._connect()) == stored_sum(cache)
+    cache.put("https://example.com/3", "jina", incompressible(3_000))
+    assert len(evictions) == 1 and stored_sum(cache) <= 10_000
+
+def test_size_total_is_seeded_for_existing_stores(tmp_path):
+    path = str(tmp_path / "content.db")
+    cache = ContentCache(path)
+    cache.put("https://example.com/a", "jina", incompressible(1_000))
+    conn = cache._connect()
+    with conn:
+        conn.execute("DROP TABLE extracted_content_size")   # as in a store created before the running total
+    reopened = ContentCache(path)
+    assert reopened._stored_bytes(reopened._connect()) == stored_sum(reopened) > 0
@@ -0,0 +1,71 @@
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from modules import corpus as corpus_module
+from modules.corpus import DocumentCorpus
+from modules.retrieval import tokenize
+from modules.vector_index import build_index
+
+class HashingEmbeddings(Embeddings):
+    def _embed(self, text):
+        vector = np.zeros(64, dtype=np.float32)
+        for token in tokenize(text):
+            vector[zlib.crc32(token.encode()) % 64] += 1.0
+        return (vector / max(float(np.linalg.norm(vector)), 1e-12)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+def report_chunks(year):
+    return [{"text": f"Annual report {year}: {topic} details for fiscal {year}.",
+             "metadata": {"chunk_id": i, "page_start": i + 1, "page_end": i + 1}}
+            for i, topic in enumerate(["revenue", "margin", "capex", "dividend"])]
+
+def test_concurrent_adds_and_search(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus_module, "SHARD_CAPACITY", 10)   # Two documents per shard
+    corpus = DocumentCorpus(HashingEmbeddings(), path=str(tmp_path / "corpus"))
+    years = list(range(2010, 2020))
+    with ThreadPoolExecutor(4) as pool:
+        added = list(pool.map(lambda year: corpus.add_document(f"r{year}", f"Report {year}", year, report_chunks(year)),
+                              years + years[:3]))
+    assert sum(added) == len(years)
+    assert set(corpus.documents) == {f"r{year}" for year in years}
+    shards = corpus.manifest["shards"]
+    assert len(shards) == 5 and sorted(d for s in shards for d in s["doc_ids"]) == sorted(corpus.documents)
+
+    reloaded = DocumentCorpus(HashingEmbeddings(), path=str(tmp_path / "corpus"))
+    assert reloaded.manifest == corpus.manifest
+
+    # Every shard's best chunk gets the same RRF score, so ask for one result per shard
+    unfiltered = corpus.search("dividend details 2013", k=5, use_mmr=False)
+    assert (2013, "dividend") in {(doc.metadata["year"], doc.page_content.split()[3]) for doc in unfiltered}
+    filtered = corpus.search("dividend details", years=[2015], k=4)
+    assert filtered and {doc.metadata["year"] for doc in filtered} == {2015}
+
+def test_add_reloads_nothing_and_later_searches_reuse_cached_shards(tmp_path, monkeypatch):
+    corpus = DocumentCorpus(HashingEmbeddings(), path=str(tmp_path / "corpus"))
+    for year in (2010, 2011):
+        corpus.add_document(f"r{year}", f"Report {year}", year, report_chunks(year))
+    corpus.search("capex details")
+    loads = []
+    original = corpus._load_store
+    monkeypatch.setattr(corpus, "_load_store", lambda name: loads.append(name) or original(name))
+    corpus.add_document("r2012", "Report 2012", 2012, report_chunks(2012))
+    results = corpus.search("capex details 2012", k=1, use_mmr=False)
+    assert results[0].metadata["doc_id"] == "r2012"
+    assert loads == []
+    assert corpus._retriever("shard_0000").index.ntotal == 12
+
+def test_shards_use_the_index_build_index_chooses(tmp_path, monkeypatch):
+    specs = []
+    monkeypatch.setattr(corpus_module, "build_index",
+                        lambda vectors, quantization=None: specs.append(len(vectors)) or build_index(vectors, quantization))
+    corpus = DocumentCorpus(HashingEmbeddings(), path=str(tmp_path / "corpus"))
+    corpus.add_document("r2010", "Report 2010", 2010, report_chunks(2010))
+    assert specs == [4]
+    reloaded = DocumentCorpus(HashingEmbeddings(), path=str(tmp_path / "corpus"))
+    assert reloaded.search("revenue details 2010", k=1)[0].metadata["doc_id"] == "r2010"
@@ -0,0 +1,59 @@
+from modules.dedup import NearDuplicateIndex, merge_news, normalize_headline
+from modules.news_ingester import NewsIngester
+from modules.news_store import MAX_ARTICLES_PER_TICKER, NewsStore
+
+def test_strips_known_or_matching_publisher_suffix_only():
+    assert normalize_headline("TCS Q2 profit rises 10% - Reuters") == "tcs q2 profit rises 10%"
+    assert normalize_headline("TCS Q2 profit rises 10% - Kotak Street", source="Kotak Street") == "tcs q2 profit rises 10%"
+    assert normalize_headline("Infosys Q2 - what to expect") == "infosys q2 what to expect"
+    assert normalize_headline("Infosys Q2 - what to expect", source="Mint") == "infosys q2 what to expect"
+
+def test_syndicated_copies_merge_across_sources():
+    articles = [{"headline": "Reliance shares jump 4% after strong results - Mint", "source": "Mint"},
+                {"headline": "Reliance shares jump 4% after strong results - Local Daily", "source": "Local Daily"},
+                {"headline": "Reliance shares jump 4% after strong results | CNBC", "source": "CNBC"}]
+    assert merge_news(articles) == articles[:1]
+
+def test_merge_news_keeps_priority_and_does_not_mutate():
+    first = [{"headline": "Wipro wins 500 crore government contract"}]
+    second = [{"headline": "Wipro wins 500 crore government contract - Reuters"}, {"headline": "Tesla cuts guidance by 5%"}]
+    merged = merge_news(first, second)
+    assert merged == [first[0], second[1]] and merged[0] is not first[0]
+
+def test_different_figures_are_different_stories():
+    index = NearDuplicateIndex()
+    assert index.add(1, "TCS Q2 profit rises 12%") is None
+    assert index.add(2, "TCS Q2 profit rises 13%") is None
+    assert index.add(3, "TCS Q2 profit rises 12% - Bloomberg") == 1
+
+def test_reordered_headline_is_the_same_story():
+    index = NearDuplicateIndex()
+    assert index.add(1, "Infosys shares jump 5% after strong results") is None
+    assert index.add(2, "Shares of Infosys jump 5% after strong results") == 1
+    assert index.add(3, "After strong results, Infosys shares reportedly jump 5%") == 1
+
+def test_different_subjects_are_different_stories():
+    index = NearDuplicateIndex()
+    assert index.add(1, "TCS Q2 profit rises 10%") is None
+    assert index.add(2, "Infosys Q2 profit rises 10%") is None
+    assert index.add(3, "HDFC Bank shares fall 3% on weak demand") is None
+    assert index.add(4, "ICICI Bank shares fall 3% on weak demand") is None
+
+def test_remove_and_retain_evict_items():
+    index = NearDuplicateIndex()
+    index.add("a", "Apple announces 90 billion buyback")
+    index.add("b", "Tesla cuts guidance by 5%")
+    assert index.remove("a") and not index.remove("a")
+    assert index.add("c", "Apple announces 90 billion buyback - CNBC") is None
+    assert index.retain({"c"}) == 1 and len(index) == 1 and "c" in index
+    assert index.find("Tesla cuts guidance by 5%") is None
+
+def test_ingester_evicts_stories_pruned_from_the_store(tmp_path):
+    store = NewsStore(str(tmp_path / "news.db"))
+    ingester = NewsIngester(store, [])
+    articles = [{"headline": f"Wipro wins order number {i} from client {i}", "published_ts": i,
+                 "link": f"http://example.com/{i}"} for i in range(MAX_ARTICLES_PER_TICKER + 30)]
+    store.upsert_articles("WIPRO.NS", ingester._assign_stories("WIPRO.NS", articles))
+    assert len(ingester._stories) == MAX_ARTICLES_PER_TICKER + 30
+    assert ingester.prune_stories() == 30
+    assert len(ingester._stories) == MAX_ARTICLES_PER_TICKER == len(store.get_story_ids())
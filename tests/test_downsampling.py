@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import visualizations
+from modules.downsampling import PX_PER_CANDLE, downsample_line, downsample_ohlc, lttb, resample_ohlc
+
+def daily_bars(days: int, start: str = "2020-01-01") -> pd.DataFrame:
+    index = pd.bdate_range(start, periods=days)
+    close = 100 + np.arange(days, dtype=float)
+    return pd.DataFrame({"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(days, 10)}, index=index)
+
+def test_weekly_bars_aggregate_ohlcv_and_are_labelled_by_last_trading_day():
+    df = daily_bars(10, "2024-03-25").drop(pd.Timestamp("2024-03-29"))   # Good Friday: week ends on Thursday
+    bars = resample_ohlc(df, "W-FRI")
+    assert list(bars.index) == [pd.Timestamp("2024-03-28"), pd.Timestamp("2024-04-05")]
+    first_week = df.loc[:"2024-03-28"]
+    assert bars.iloc[0].to_dict() == {"Open": first_week["Open"].iloc[0], "High": first_week["High"].max(),
+                                      "Low": first_week["Low"].min(), "Close": first_week["Close"].iloc[-1],
+                                      "Volume": 40}
+    assert bars["Volume"].sum() == df["Volume"].sum()
+
+def test_empty_periods_are_dropped_and_volume_is_optional():
+    df = daily_bars(60).drop(columns="Volume")
+    df = df[(df.index < "2020-02-01") | (df.index >= "2020-03-01")]   # No trading in February
+    bars = resample_ohlc(df, "ME")
+    assert list(bars.columns) == ["Open", "High", "Low", "Close"]
+    assert [ts.month for ts in bars.index] == [1, 3]
+
+@pytest.mark.parametrize("days, label", [(150, "daily"), (900, "weekly"), (3000, "monthly"), (6000, "quarterly")])
+def test_finest_rule_that_fits_the_width_is_chosen(days, label):
+    df = daily_bars(days)
+    bars, chosen = downsample_ohlc(df, target_width_px=900)
+    assert chosen == label
+    # Bar counts are estimated from trading days; partial first and last bars may add one each
+    assert len(bars) <= 900 // PX_PER_CANDLE + 2 or label == "quarterly"
+    assert bars["High"].max() == df["High"].max() and bars["Low"].min() == df["Low"].min()
+    assert bars.index[-1] == df.index[-1] and bars["Close"].iloc[-1] == df["Close"].iloc[-1]
+
+def test_lttb_keeps_endpoints_and_extremes():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[1234] = 5.0
+    selected = lttb(np.arange(5000), y, 300)
+    assert len(selected) == 300 and selected[0] == 0 and selected[-1] == 4999
+    assert np.all(np.diff(selected) > 0) and 1234 in selected
+    series = pd.Series(y[:100], index=pd.bdate_range("2020-01-01", periods=100))
+    assert downsample_line(series, 900) is series
+
+def test_chart_frames_are_cached_by_content(monkeypatch):
+    calls = []
+    monkeypatch.setattr(visualizations, "downsample_ohlc", lambda df: calls.append(1) or downsample_ohlc(df))
+    visualizations.downsample_chart_data.clear()
+    df = daily_bars(3000)
+    bars, label, close = visualizations.downsample_chart_data(df)
+    again = visualizations.downsample_chart_data(df.copy())
+    assert len(calls) == 1 and label == "monthly" and again[0].equals(bars) and len(close) <= 900
+    visualizations.downsample_chart_data(df.assign(Close=df["Close"] + 1))
+    assert len(calls) == 2
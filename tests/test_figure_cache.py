@@ -0,0 +1,91 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+from modules.cache import MemoryCache, SharedCache, set_cache
+from modules.figure_cache import FigureCache
+
+class Builder:
+    """Counts builds of a small line figure whose JSON size is fixed by n_points."""
+    def __init__(self, n_points: int = 50):
+        self.n_points = n_points
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return go.Figure(go.Scatter(x=list(range(self.n_points)), y=[i * 1.5 for i in range(self.n_points)]))
+
+@pytest.fixture
+def backend():
+    backend = MemoryCache()
+    set_cache(backend)
+    yield backend
+    set_cache(None)
+
+def spec_size(builder: Builder) -> int:
+    size = len(pio.to_json(builder(), validate=False))
+    builder.calls = 0
+    return size
+
+def test_hits_return_independent_figures(backend):
+    cache, build = FigureCache(), Builder()
+    first = cache.get_or_build("line", "AAPL", 1, build)
+    second = cache.get_or_build("line", "AAPL", 1, build)
+    assert build.calls == 1 and cache.stats()["hits"] == 1
+    second.update_layout(title="changed")
+    assert cache.get_or_build("line", "AAPL", 1, build).layout.title.text is None
+    assert second.to_plotly_json()["data"] == first.to_plotly_json()["data"]
+
+def test_least_recently_used_figures_are_evicted_by_bytes(backend):
+    build = Builder()
+    size = spec_size(build)
+    cache = FigureCache(max_bytes=int(size * 2.5))
+    for key in ("A", "B"):
+        cache.get_or_build("line", key, 1, build)
+    cache.get_or_build("line", "A", 1, build)            # A is now more recent than B
+    cache.get_or_build("line", "C", 1, build)
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 2 * size <= cache.max_bytes
+    calls = build.calls
+    cache.get_or_build("line", "A", 1, build)
+    cache.get_or_build("line", "C", 1, build)
+    assert build.calls == calls                          # A and C kept
+    cache.get_or_build("line", "B", 1, build)
+    assert build.calls == calls + 1                      # B was evicted
+
+def test_figures_larger_than_the_cache_are_not_kept(backend):
+    build = Builder()
+    cache = FigureCache(max_bytes=spec_size(build) - 1)
+    assert cache.get_or_build("line", "A", 1, build) is not None
+    assert cache.stats()["entries"] == cache.stats()["bytes"] == 0
+
+def test_a_new_data_version_drops_the_stale_one(backend):
+    cache, build = FigureCache(), Builder()
+    cache.get_or_build("line", "AAPL", 1, build)
+    cache.get_or_build("line", "MSFT", 1, build)
+    cache.get_or_build("line", "AAPL", 2, build)
+    assert cache.stats()["entries"] == 2                 # AAPL v2 and MSFT v1
+    cache.get_or_build("line", "AAPL", 1, build)         # v1 was dropped, so it is rebuilt
+    assert build.calls == 4
+    cache.get_or_build("line", "AAPL", 2, build, theme="plotly_white")
+    assert build.calls == 5                              # themes are separate entries
+
+def test_figures_are_published_to_a_shared_backend(tmp_path):
+    path = str(tmp_path / "cache.db")
+    set_cache(SharedCache(path))
+    try:
+        build = Builder()
+        FigureCache().get_or_build("line", "AAPL", 1, build)
+        set_cache(SharedCache(path))                     # another replica on the same file
+        other = FigureCache()
+        fig = other.get_or_build("line", "AAPL", 1, build)
+        assert build.calls == 1 and other.stats()["misses"] == 1
+        assert list(fig.data[0].y) == [i * 1.5 for i in range(build.n_points)]
+        other.get_or_build("line", "AAPL", 2, build)     # a new version is built, not shared
+        assert build.calls == 2
+    finally:
+        set_cache(None)
+
+def test_per_process_backend_does_not_share(backend):
+    build = Builder()
+    FigureCache().get_or_build("line", "AAPL", 1, build)
+    FigureCache().get_or_build("line", "AAPL", 1, build)
+    assert build.calls == 2
@@ -0,0 +1,51 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from modules.finnhub_fixtures import FinnhubFixtureServer, synthetic_fixtures
+from modules.finnhub_news import FinnhubNewsClient, TokenBucket
+
+TICKERS = ["AAPL", "MSFT", "TSLA", "NVDA"]
+END = datetime.now(timezone.utc).date() - timedelta(days=5)   # Complete days: cached for good
+START = END - timedelta(days=20)
+
+@pytest.fixture
+def server():
+    with FinnhubFixtureServer(synthetic_fixtures(TICKERS, START, END)) as server:
+        yield server
+
+def client(server, tmp_path, name="finnhub.db", bucket=None):
+    return FinnhubNewsClient(api_key="fixture", base_url=server.url, cache_path=str(tmp_path / name),
+                             bucket=bucket or TokenBucket(rate_per_minute=60_000, burst=100))
+
+def test_shifted_window_only_requests_new_days(server, tmp_path):
+    news = client(server, tmp_path)
+    week = news.company_news("AAPL", END - timedelta(days=6), END)
+    assert len(week) == 7 * 3 and server.requests == [("AAPL", (END - timedelta(days=6)).isoformat(), END.isoformat())]
+    assert [a["datetime"] for a in week] == sorted((a["datetime"] for a in week), reverse=True)
+
+    shifted = news.company_news("AAPL", END - timedelta(days=8), END)
+    assert len(shifted) == 9 * 3
+    assert server.requests[1:] == [("AAPL", (END - timedelta(days=8)).isoformat(), (END - timedelta(days=7)).isoformat())]
+    news.company_news("AAPL", END - timedelta(days=8), END)
+    assert len(server.requests) == 2 and news.requests_made == 2
+
+def test_rate_limited_request_is_retried(tmp_path):
+    with FinnhubFixtureServer(synthetic_fixtures(TICKERS, START, END), quota_per_minute=2, quota_window=0.3) as server:
+        news = client(server, tmp_path)
+        results = [news.company_news(ticker, END - timedelta(days=1), END) for ticker in TICKERS[:3]]
+    assert server.rate_limited >= 1 and all(len(articles) == 6 for articles in results)
+    assert [request[0] for request in server.requests] == TICKERS[:3]
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)   # 10 per second after a burst of 2
+    start = time.monotonic()
+    waited = sum(bucket.acquire() for _ in range(7))
+    elapsed = time.monotonic() - start
+    assert 0.45 <= elapsed < 2.0 and waited == pytest.approx(elapsed, abs=0.1)
+
+def test_fan_out_matches_per_ticker_calls(server, tmp_path):
+    sequential = client(server, tmp_path, "sequential.db")
+    expected = {ticker: sequential.company_news(ticker, START, END) for ticker in TICKERS}
+    fanned = client(server, tmp_path, "fanned.db").company_news_many(TICKERS + ["AAPL"], START, END)
+    assert list(fanned) == TICKERS and fanned == expected
+    assert client(server, tmp_path, "other.db").company_news_many(["UNKNOWN"], START, END) == {"UNKNOWN": []}
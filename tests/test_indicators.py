@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.indicators import MAX_WINDOW, compute_indicators, update_indicators
+
+def make_ohlcv(n_days: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_days)))
+    spread = close * rng.uniform(0.002, 0.02, n_days)
+    return pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread, "Close": close,
+                         "Volume": rng.integers(1e5, 1e7, n_days).astype(float)},
+                        index=pd.bdate_range("2024-01-01", periods=n_days))
+
+def assert_matches_full_compute(df: pd.DataFrame, n_new: int):
+    base, state = compute_indicators(df.iloc[:-n_new])
+    ohlcv, updated, _ = update_indicators(df.iloc[:-n_new], base, state, df.iloc[-n_new:])
+    full, _ = compute_indicators(df)
+    pd.testing.assert_frame_equal(ohlcv, df)
+    assert list(updated.columns) == list(full.columns)
+    assert updated.index.equals(full.index)
+    np.testing.assert_allclose(updated.to_numpy(), full.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+@pytest.mark.parametrize("n_new", [1, 5, MAX_WINDOW + 3])
+def test_appending_bars_matches_a_full_recompute(n_new):
+    assert_matches_full_compute(make_ohlcv(300), n_new)
+
+@pytest.mark.parametrize("n_days, n_new", [(8, 1), (8, 4), (MAX_WINDOW - 2, 6), (MAX_WINDOW + 10, 12)])
+def test_history_shorter_than_the_longest_window(n_days, n_new):
+    # Rolling windows that cannot fill yet must stay NaN, and fill once the bars arrive
+    assert_matches_full_compute(make_ohlcv(n_days), n_new)
+
+def test_zero_volume_bars_leave_vwap_undefined_until_volume_trades():
+    df = make_ohlcv(60)
+    df.iloc[:3, df.columns.get_loc("Volume")] = 0.0     # no volume at all yet: VWAP undefined
+    df.iloc[-4:-2, df.columns.get_loc("Volume")] = 0.0  # zero-volume bars among the appended ones
+    assert_matches_full_compute(df, 5)
+    base, state = compute_indicators(df.iloc[:2])
+    _, updated, _ = update_indicators(df.iloc[:2], base, state, df.iloc[2:5])
+    assert updated["VWAP"].iloc[:3].isna().all() and updated["VWAP"].iloc[3:].notna().all()
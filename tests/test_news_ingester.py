@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import modules.news_ingester as ingester_module
+from modules.news_ingester import LEASE_NAME, NewsIngester
+from modules.news_store import NewsStore
+
+def test_lease_is_exclusive_until_released_or_expired(tmp_path):
+    path = str(tmp_path / "news.db")
+    first, second = NewsStore(path), NewsStore(path)   # as two processes sharing the file
+    assert first.acquire_lease("job", "a", ttl=60)
+    assert not second.acquire_lease("job", "b", ttl=60)
+    assert first.acquire_lease("job", "a", ttl=60)     # the holder renews
+    first.release_lease("job", "b")                    # only the holder can release
+    assert not second.acquire_lease("job", "b", ttl=60)
+    first.release_lease("job", "a")
+    assert second.acquire_lease("job", "b", ttl=0.05)
+    time.sleep(0.1)
+    assert first.acquire_lease("job", "a", ttl=60)     # b's lease lapsed
+
+def test_only_the_lease_holder_polls(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingester_module, "LEASE_RETRY_SECONDS", 0.02)
+    monkeypatch.setattr(ingester_module, "IDLE_CHECK_SECONDS", 0.02)
+    path = str(tmp_path / "news.db")
+    polls = {}
+    def counting(ingester):
+        def run_once():
+            polls[ingester.lease_holder] = polls.get(ingester.lease_holder, 0) + 1
+            return {}
+        return run_once
+    replicas = [NewsIngester(NewsStore(path), []) for _ in range(3)]
+    for replica in replicas:
+        monkeypatch.setattr(replica, "run_once", counting(replica))
+        replica.start()
+    time.sleep(0.3)
+    assert len(polls) == 1
+    leader = next(replica for replica in replicas if replica.lease_holder in polls)
+    leader.stop(timeout=5)
+    polls.clear()
+    time.sleep(0.3)
+    # A standby takes over once the leader releases the lease
+    assert len(polls) == 1 and leader.lease_holder not in polls
+    for replica in replicas:
+        replica.stop(timeout=5)
+    assert NewsStore(path).acquire_lease(LEASE_NAME, "after", ttl=60)
+
+ETAG, MODIFIED = '"v1"', "Mon, 19 Oct 2026 08:00:00 GMT"
+RSS = ("<rss version='2.0'><channel>"
+       + "".join(f"<item><title>Acme headline {i}</title><link>http://example.com/acme/{i}</link></item>" for i in range(3))
+       + "</channel></rss>").encode()
+
+@pytest.fixture
+def feed_server():
+    """An aiohttp feed server on its own event-loop thread (NewsIngester.poll runs its own asyncio.run)."""
+    state = {"requests": [], "status": 200}
+    async def feed(request):
+        state["requests"].append(dict(request.headers))
+        if state["status"] != 200:
+            return web.Response(status=state["status"])
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        return web.Response(body=RSS, content_type="application/rss+xml",
+                            headers={"ETag": ETAG, "Last-Modified": MODIFIED})
+    app = web.Application()
+    app.router.add_get("/acme", feed)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = TestServer(app)
+    asyncio.run_coroutine_threadsafe(server.start_server(), loop).result()
+    yield server, state
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+@pytest.fixture
+def ingester(tmp_path, feed_server, monkeypatch):
+    server, _ = feed_server
+    store = NewsStore(str(tmp_path / "news.db"))
+    ingester = NewsIngester(store, [{"symbol": "ACME", "name": "Acme Corp"}], interval=60)
+    store.register_feed("ACME", str(server.make_url("/acme")))
+    parses, writers = [], set()
+    real_parse, real_update = ingester_module.feedparser.parse, store.update_feed
+    def parse(body):
+        parses.append(body)
+        return real_parse(body)
+    def update_feed(*args, **kwargs):
+        writers.add(threading.current_thread().name)
+        return real_update(*args, **kwargs)
+    monkeypatch.setattr(ingester_module, "feedparser", SimpleNamespace(parse=parse))
+    monkeypatch.setattr(store, "update_feed", update_feed)
+    ingester.parses, ingester.writers = parses, writers
+    yield ingester
+    ingester.stop()
+
+def test_second_poll_is_conditional_and_304_skips_parsing(ingester, feed_server):
+    _, state = feed_server
+    assert ingester.run_once() == {"ACME": 3}
+    feed = ingester.store.get_feed("ACME")
+    assert (feed["etag"], feed["modified"], feed["last_status"]) == (ETAG, MODIFIED, 200)
+    assert ingester.run_once() == {}                       # not due again for an interval
+    assert ingester.refresh_all() == {"ACME": 0}
+    assert state["requests"][1]["If-None-Match"] == ETAG
+    assert state["requests"][1]["If-Modified-Since"] == MODIFIED
+    assert len(ingester.parses) == 1
+    feed = ingester.store.get_feed("ACME")
+    assert feed["last_status"] == 304 and feed["etag"] == ETAG and feed["next_poll_at"] > time.time()
+    assert len(ingester.store.get_articles("ACME")) == 3
+    # Store writes happen on the worker threads, not the event loop's
+    assert ingester.writers and all(name.startswith("news-worker") for name in ingester.writers)
+
+def test_error_response_backs_off_before_the_next_poll(ingester, feed_server):
+    _, state = feed_server
+    state["status"] = 503
+    before = time.time()
+    assert ingester.run_once() == {"ACME": 0}
+    feed = ingester.store.get_feed("ACME")
+    assert (feed["failures"], feed["last_status"]) == (1, 503)
+    assert feed["next_poll_at"] >= before + 0.9 * 2 * ingester.interval
+    state["status"] = 200
+    assert ingester.run_once() == {}
+    assert len(state["requests"]) == 1                     # still backing off: no request made
+    assert ingester.refresh_all() == {"ACME": 3}
+    assert ingester.store.get_feed("ACME")["failures"] == 0
@@ -0,0 +1,56 @@
+import time
+import pytest
+import modules.precomputed as precomputed_module
+from modules.precomputed import KEEP_VERSIONS, KINDS, PrecomputedStore, precompute_universe
+
+@pytest.fixture
+def store(tmp_path):
+    return PrecomputedStore(str(tmp_path / "precomputed.db"), max_age=60)
+
+def test_rows_of_other_format_versions_are_ignored(store, monkeypatch):
+    store.put("summary", "AAPL", 1, "old shape")
+    assert store.latest("summary", "AAPL")["value"] == "old shape"
+    monkeypatch.setattr(precomputed_module, "FORMAT_VERSION", precomputed_module.FORMAT_VERSION + 1)
+    assert store.latest("summary", "AAPL") is None
+    assert store.get_or_compute("summary", "AAPL", lambda: "on demand") == "on demand"
+    store.put("summary", "AAPL", 2, "new shape")
+    assert store.get_or_compute("summary", "AAPL", lambda: "on demand") == "new shape"
+    assert (store.hits, store.misses) == (1, 1)
+
+def test_only_the_newest_runs_are_kept(store):
+    for run_id in range(1, KEEP_VERSIONS + 3):
+        store.put("summary", "AAPL", run_id, f"run {run_id}")
+    store.put("summary", "MSFT", 1, "other symbol")
+    run_ids = [row[0] for row in store._connect().execute(
+        "SELECT run_id FROM precomputed WHERE symbol = 'AAPL' ORDER BY run_id DESC")]
+    assert run_ids == list(range(KEEP_VERSIONS + 2, 2, -1))
+    assert store.latest("summary", "AAPL")["value"] == f"run {KEEP_VERSIONS + 2}"
+    assert store.latest("summary", "MSFT")["value"] == "other symbol"
+
+def test_results_older_than_max_age_fall_back_to_compute(store, monkeypatch):
+    store.put("sentiment", "AAPL", 1, [{"headline": "h"}])
+    assert store.get_or_compute("sentiment", "AAPL", lambda: "fresh") == [{"headline": "h"}]
+    real_time = time.time
+    monkeypatch.setattr(precomputed_module.time, "time", lambda: real_time() + 61)
+    assert store.get_or_compute("sentiment", "AAPL", lambda: "fresh") == "fresh"
+    assert store.latest("sentiment", "AAPL", max_age=3600) is not None
+
+def test_precompute_universe_counts_failures_per_kind(store, monkeypatch):
+    def fake_precompute_stock(stock_info, fetcher, store, run_id):
+        if stock_info["symbol"] == "BAD":
+            raise RuntimeError("boom")
+        for kind in KINDS:
+            store.put(kind, stock_info["symbol"], run_id, kind)
+        return {"summary": "no key"} if stock_info["symbol"] == "PART" else {}
+    monkeypatch.setattr(precomputed_module, "precompute_stock", fake_precompute_stock)
+    stocks = [{"symbol": symbol} for symbol in ("OK1", "PART", "BAD", "OK2")]
+    run = precompute_universe(stocks, fetcher=None, store=store, max_workers=2)
+    assert set(run["status"]) == {"OK1", "PART", "BAD", "OK2"}
+    assert run["status"]["OK1"] == run["status"]["OK2"] == {}
+    assert run["errors"] == {"PART": {"summary": "no key"}, "BAD": dict.fromkeys(KINDS, "boom")}
+    assert run["failures"] == 1 + len(KINDS)
+    assert run["results"] == len(KINDS) * len(stocks) - run["failures"]
+    recorded = store.runs(limit=1)[0]
+    assert (recorded["run_id"], recorded["stocks"], recorded["results"], recorded["failures"]) == \
+        (run["run_id"], 4, run["results"], run["failures"])
+    assert recorded["finished_at"] is not None
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from modules import retirement
+from modules.retirement import (
+    _accumulate,
+    earliest_retirement_age,
+    project_retirement,
+    required_monthly_investment,
+    sensitivity_grid,
+    simulate_retirement,
+)
+
+USER = {
+    "current_age": 30, "retirement_age": 60, "monthly_salary_inr": 75000, "monthly_expenses_inr": 40000,
+    "current_savings_inr": 1000000, "expected_salary_growth_percent": 8, "risk_appetite": "Moderate",
+    "retirement_lifestyle": "Comfortable", "expected_inflation_percent": 6,
+}
+
+def recurrence(start, flows, growth):
+    balances, balance = [], start
+    for flow, factor in zip(flows, growth):
+        balance = balance * factor + flow
+        balances.append(balance)
+    return np.array(balances)
+
+def test_accumulate_matches_the_recurrence_including_zero_growth():
+    flows, growth = np.array([5.0, -2.0, 3.0, 1.0]), np.array([1.1, 0.9, 1.2, 1.05])
+    np.testing.assert_allclose(_accumulate(10.0, flows, growth), recurrence(10.0, flows, growth))
+    growth[1] = 0.0
+    with np.errstate(all="raise"):
+        np.testing.assert_allclose(_accumulate(10.0, flows, growth), recurrence(10.0, flows, growth))
+
+def test_projection_matches_a_year_by_year_loop():
+    summary = project_retirement(USER)["summary"]
+    balance = USER["current_savings_inr"]
+    for t in range(30):
+        balance = balance * 1.10 + 12 * (75000 * 1.08 ** t - 40000 * 1.06 ** t)
+    assert summary["corpus_at_retirement"] == pytest.approx(balance)
+    # Expenses from 60 to 84, withdrawn at the start of each year, discounted at the post-retirement return
+    first = 12 * 40000 * 1.06 ** 30
+    required = sum(first * 1.06 ** k / 1.07 ** k for k in range(25))
+    assert summary["required_corpus"] == pytest.approx(required)
+    assert summary["on_track"] == (summary["money_lasts_until_age"] >= 85)
+
+def test_required_monthly_investment_exactly_funds_the_goal():
+    goal = required_monthly_investment(USER)
+    balance = USER["current_savings_inr"]
+    for t in range(30):
+        balance = balance * 1.10 + 12 * goal["required_monthly_investment"] * 1.08 ** t
+    assert balance == pytest.approx(goal["required_corpus"])
+
+def test_earliest_retirement_age_is_the_first_funded_age():
+    age = earliest_retirement_age(USER)
+    grid = sensitivity_grid(USER, retirement_ages=[age - 1, age], returns=[0.10])
+    assert grid["funded_ratio"][0, 0] < 1.0 <= grid["funded_ratio"][1, 0]
+    summary = project_retirement({**USER, "retirement_age": age})["summary"]
+    assert grid["corpus_at_retirement"][1, 0] == pytest.approx(summary["corpus_at_retirement"])
+    assert summary["surplus_or_shortfall"] >= 0
+
+def test_invalid_ages_raise_value_error():
+    for function in (project_retirement, simulate_retirement, required_monthly_investment):
+        with pytest.raises(ValueError):
+            function({**USER, "retirement_age": 30})
+    with pytest.raises(ValueError):
+        simulate_retirement({**USER, "retirement_age": 90})
+
+def test_simulation_without_randomness_matches_the_projection(monkeypatch):
+    monkeypatch.setitem(retirement.RISK_PROFILES, "Moderate", {"expected_return": 0.10, "volatility": 0.0})
+    monkeypatch.setattr(retirement, "POST_RETIREMENT_VOLATILITY", 0.0)
+    monkeypatch.setattr(retirement, "INFLATION_UNCERTAINTY", 0.0)
+    summary = simulate_retirement(USER, n_paths=1000, chunk_size=300)["summary"]
+    expected = project_retirement(USER)["summary"]
+    assert summary["corpus_at_retirement_p50"] == pytest.approx(expected["corpus_at_retirement"], rel=1e-4)
+    assert summary["success_probability"] == float(expected["years_funded"] >= 25)
+
+def test_simulation_is_reproducible_and_bands_are_ordered():
+    first, second = simulate_retirement(USER, n_paths=5000), simulate_retirement(USER, n_paths=5000)
+    assert first["summary"] == second["summary"]
+    bands = first["bands"]
+    assert len(bands["age"]) == len(bands["p50"]) == 55
+    assert np.all(bands["p10"] <= bands["p50"]) and np.all(bands["p50"] <= bands["p90"])
+    assert 0.0 <= first["summary"]["success_probability"] <= 1.0
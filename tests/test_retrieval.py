@@ -0,0 +1,78 @@
+import zlib
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from modules.retrieval import BM25Index, HybridRetriever, _min_max, apply_token_budget, mmr_select, tokenize
+
+class HashingEmbeddings(Embeddings):
+    def _embed(self, text):
+        vector = np.zeros(64, dtype=np.float32)
+        for token in tokenize(text):
+            vector[zlib.crc32(token.encode()) % 64] += 1.0
+        return (vector / max(float(np.linalg.norm(vector)), 1e-12)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+CHUNKS = [
+    "Revenue for FY24 was 1,234.5 crore, up 12% year on year.",
+    "Revenue for FY24 was 1,234.5 crore, up 12% year on year.",   # Exact duplicate
+    "EBITDA margin narrowed to 18% on higher input costs.",
+    "The board declared a dividend of 8 rupees per share.",
+    "Capital expenditure guidance for FY25 is 900 crore.",
+    "Employee headcount rose to 52,000 by March.",
+]
+
+def retriever():
+    metadatas = [{"chunk_id": i, "year": 2024 if i < 3 else 2025} for i in range(len(CHUNKS))]
+    return HybridRetriever(FAISS.from_texts(CHUNKS, HashingEmbeddings(), metadatas=metadatas))
+
+def test_tokenize_keeps_figures_together():
+    assert tokenize("Revenue of 1,234.5 crore in FY24, Q2") == ["revenue", "of", "1,234.5", "crore", "in", "fy24", "q2"]
+
+def test_bm25_ranks_term_matches_and_ignores_unknown_terms():
+    scores = BM25Index(CHUNKS).score("dividend per share")
+    assert int(np.argmax(scores)) == 3 and scores[[0, 2, 4, 5]].max() == 0
+    assert not BM25Index(CHUNKS).score("zebra").any()
+    assert BM25Index([]).score("anything").size == 0
+
+def test_min_max_handles_constant_scores():
+    np.testing.assert_allclose(_min_max(np.array([2.0, 4.0, 3.0])), [0.0, 1.0, 0.5])
+    assert _min_max(np.array([3.0, 3.0])).tolist() == [1.0, 1.0]
+    assert _min_max(np.array([0.0, 0.0])).tolist() == [0.0, 0.0]
+
+def test_mmr_skips_redundant_candidates():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    relevance = np.array([1.0, 0.99, 0.5])
+    assert mmr_select(relevance, vectors, 2, mmr_lambda=0.5) == [0, 2]
+    assert mmr_select(relevance, vectors, 2, mmr_lambda=1.0) == [0, 1]
+    assert mmr_select(np.empty(0), np.empty((0, 2)), 3, 0.5) == []
+
+def test_token_budget_keeps_ranked_chunks_that_fit():
+    texts = ["a" * 400, "b" * 4000, "c" * 400]   # 100, 1000 and 100 estimated tokens
+    assert apply_token_budget(texts, 250) == [0, 2]
+    assert apply_token_budget(["x" * 8000], 10) == [0]
+
+def test_fusion_weights_lexical_and_vector_scores():
+    hybrid = retriever()
+    for alpha in (0.0, 0.5, 1.0):
+        results = hybrid.search_with_scores("dividend per share", k=3, alpha=alpha, use_mmr=False)
+        assert results[0][0].metadata["chunk_id"] == 3
+        scores = [score for _, score in results]
+        assert scores == sorted(scores, reverse=True) and 0.0 <= min(scores) and max(scores) <= 1.0
+    # Pure BM25 only proposes chunks sharing a term with the query
+    lexical = hybrid.search_with_scores("dividend", k=5, alpha=0.0, use_mmr=False)
+    assert [doc.metadata["chunk_id"] for doc, _ in lexical] == [3]
+
+def test_mmr_drops_the_duplicate_chunk_and_filters_apply():
+    hybrid = retriever()
+    plain = [doc.metadata["chunk_id"] for doc, _ in hybrid.search_with_scores("FY24 revenue crore", k=2, use_mmr=False)]
+    diverse = [doc.metadata["chunk_id"] for doc, _ in hybrid.search_with_scores("FY24 revenue crore", k=2, mmr_lambda=0.3)]
+    assert sorted(plain) == [0, 1]
+    assert len({0, 1} & set(diverse)) == 1
+    filtered = hybrid.search("FY24 revenue crore", k=5, doc_filter={"year": 2025})
+    assert filtered and all(doc.metadata["year"] == 2025 for doc in filtered)
+    assert hybrid.search("revenue", doc_filter={"year": 1999}) == []
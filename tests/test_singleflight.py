@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from modules.cache import MemoryCache, cached, set_cache
+from modules.singleflight import FlightTimeout, SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flights, calls, release = SingleFlight(), [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"summary": "TCS"}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flights.do, "TCS", fetch) for _ in range(8)]
+        while flights.stats()["followers"] < 7:
+            time.sleep(0.005)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(calls) == 1 and all(result is results[0] for result in results)
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 7, "timeouts": 0}
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flights.do, "K", failing)
+        started.wait(5)
+        follower = pool.submit(flights.do, "K", failing)
+        while flights.stats()["followers"] < 1:
+            time.sleep(0.005)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    assert flights.do("K", lambda: "recovered") == "recovered"
+
+def test_keys_are_independent_and_followers_time_out():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flights.do, "SLOW", slow)
+        started.wait(5)
+        assert flights.do("OTHER", lambda: "fast") == "fast"
+        with pytest.raises(FlightTimeout):
+            flights.do("SLOW", slow, timeout=0.05)
+        release.set()
+        assert leader.result() == "late"
+    assert flights.stats()["timeouts"] == 1 and flights.in_flight() == 0
+
+def test_cached_coalesces_concurrent_misses():
+    set_cache(MemoryCache())
+    calls, release = [], threading.Event()
+
+    @cached(ttl=60)
+    def summary(ticker):
+        calls.append(ticker)
+        release.wait(5)
+        return [ticker]
+
+    try:
+        with ThreadPoolExecutor(6) as pool:
+            futures = [pool.submit(summary, "INFY") for _ in range(6)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+        assert calls == ["INFY"] and results == [["INFY"]] * 6
+        assert len({id(result) for result in results}) == 6   # Each caller gets its own copy
+    finally:
+        set_cache(None)
@@ -0,0 +1,64 @@
+import math
+import pandas as pd
+import pytest
+from modules.database import COMPREHENSIVE_STOCKS_DATABASE
+from modules.stock_universe import ALL, StockUniverse
+
+def database_stocks():
+    return ([{**data, "symbol": symbol, "country": "India"} for symbol, data in COMPREHENSIVE_STOCKS_DATABASE["INDIAN_STOCKS"].items()]
+            + [{**data, "symbol": symbol, "country": "USA"} for symbol, data in COMPREHENSIVE_STOCKS_DATABASE["US_STOCKS"].items()])
+
+def synthetic_stocks():
+    # Tied market caps, missing P/E ratios and a sector whose P/E is missing everywhere
+    rows = [("India", "Banks", 50.0, 12.0), ("India", "Banks", 50.0, None), ("India", "IT", 80.0, 25.0),
+            ("USA", "IT", 80.0, 30.0), ("USA", "IT", 10.0, None), ("USA", "Energy", 20.0, None),
+            ("USA", "Banks", 50.0, 9.5), ("India", "IT", 5.0, 18.0)]
+    return [{"name": f"Company {i}", "symbol": f"C{i}", "country": country, "sector": sector,
+             "market_cap_usd_b": cap, "pe_ratio": pe} for i, (country, sector, cap, pe) in enumerate(rows)]
+
+def filter_then_aggregate(stocks, country, sector, top_n):
+    """The dashboard's per-render path the cube replaced."""
+    df = pd.DataFrame(stocks)
+    if country != ALL:
+        df = df[df["country"] == country]
+    if sector != ALL:
+        df = df[df["sector"] == sector]
+    if df.empty:
+        return None
+    return {
+        "count": df.shape[0],
+        "mean_market_cap": df["market_cap_usd_b"].mean(),
+        "mean_pe": df["pe_ratio"].astype(float).mean(),
+        "top_by_market_cap": df.nlargest(top_n, "market_cap_usd_b")[["name", "market_cap_usd_b", "sector"]],
+        "sector_counts": df["sector"].value_counts(),
+        "company_names": sorted(df["name"].unique()),
+    }
+
+@pytest.mark.parametrize("stocks, top_n", [(database_stocks(), 15), (synthetic_stocks(), 2)], ids=["database", "synthetic"])
+def test_cube_matches_filter_then_aggregate_for_every_filter(stocks, top_n):
+    universe = StockUniverse(stocks, top_n=top_n)
+    countries = {stock["country"] for stock in stocks}
+    sectors = {stock["sector"] for stock in stocks}
+    assert universe.countries == [ALL] + sorted(countries) and universe.sectors == [ALL] + sorted(sectors)
+    for country in universe.countries:
+        for sector in universe.sectors:
+            expected, actual = filter_then_aggregate(stocks, country, sector, top_n), universe.aggregate(country, sector)
+            if expected is None:
+                assert actual is None, (country, sector)
+                continue
+            assert actual["count"] == expected["count"]
+            assert actual["mean_market_cap"] == pytest.approx(expected["mean_market_cap"], rel=1e-12)
+            if math.isnan(expected["mean_pe"]):
+                assert math.isnan(actual["mean_pe"])
+            else:
+                assert actual["mean_pe"] == pytest.approx(expected["mean_pe"], rel=1e-12)
+            pd.testing.assert_frame_equal(actual["top_by_market_cap"].reset_index(drop=True),
+                                          expected["top_by_market_cap"].reset_index(drop=True))
+            assert actual["sector_counts"].to_dict() == expected["sector_counts"].to_dict()
+            assert actual["company_names"] == expected["company_names"]
+
+def test_unknown_filters_match_nothing():
+    universe = StockUniverse(synthetic_stocks())
+    assert universe.aggregate("Japan", ALL) is None
+    assert universe.aggregate("USA", "Retail") is None
+    assert universe.get_stock("Company 3")["symbol"] == "C3"
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import modules.vector_index as vector_index_module
+from modules.vector_index import (HNSW_MAX_VECTORS, MAX_TRAIN_VECTORS, TRAIN_VECTORS_PER_LIST, build_index,
+                                  choose_index_spec, recall_at_k)
+
+faiss = pytest.importorskip("faiss")
+
+DIM = 16
+
+def clustered_vectors(n_vectors: int, n_queries: int = 200, seed: int = 0):
+    """Clustered vectors (closer to real embeddings than uniform noise) and queries near stored ones."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, n_vectors // 500), DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n_vectors)] + 0.3 * rng.normal(size=(n_vectors, DIM)).astype(np.float32)
+    queries = vectors[rng.choice(n_vectors, n_queries, replace=False)] + 0.05 * rng.normal(size=(n_queries, DIM)).astype(np.float32)
+    return vectors, queries
+
+@pytest.mark.parametrize("n_vectors", [HNSW_MAX_VECTORS, 1_000_000, 20_000_000])
+def test_ivf_lists_never_outnumber_the_training_sample(n_vectors):
+    for quantization in (None, "sq8", "pq"):
+        spec = choose_index_spec(n_vectors, 768, quantization)
+        nlist = int(spec.split(",")[0][3:])
+        assert 16 <= nlist and nlist * TRAIN_VECTORS_PER_LIST <= min(n_vectors, MAX_TRAIN_VECTORS)
+    assert choose_index_spec(n_vectors, 768, "pq").endswith(",PQ384")
+
+def test_pq_is_not_used_below_the_ivf_range():
+    assert choose_index_spec(5_000, 768, "pq") == "Flat"
+    assert choose_index_spec(HNSW_MAX_VECTORS - 1, 768, "pq") == choose_index_spec(HNSW_MAX_VECTORS - 1, 768, "sq8")
+    with pytest.raises(ValueError):
+        choose_index_spec(HNSW_MAX_VECTORS, 768, "opq")
+
+# Thresholds scaled down so every spec is built in seconds: (n_vectors, quantization, expected spec,
+# minimum recall@10 on fresh queries, maximum relative reconstruction error)
+SPECS = [
+    (200, None, "Flat", 1.0, 0.0),
+    (1_500, None, "HNSW32", 0.95, 0.0),
+    (1_500, "sq8", "HNSW32_SQ8", 0.9, 0.02),
+    (1_500, "pq", "HNSW32_SQ8", 0.9, 0.02),
+    (12_000, None, "IVF300,Flat", 0.95, 0.0),
+    (12_000, "sq8", "IVF300,SQ8", 0.9, 0.02),
+    (12_000, "pq", "IVF300,PQ8", 0.8, 0.25),
+]
+
+@pytest.mark.parametrize("n_vectors, quantization, spec, min_recall, max_error", SPECS,
+                         ids=[f"{spec}-{n}" for n, _, spec, _, _ in SPECS])
+def test_chosen_index_reconstructs_and_meets_recall(monkeypatch, capfd, n_vectors, quantization, spec,
+                                                   min_recall, max_error):
+    monkeypatch.setattr(vector_index_module, "FLAT_MAX_VECTORS", 300)
+    monkeypatch.setattr(vector_index_module, "HNSW_MAX_VECTORS", 2_000)
+    vectors, queries = clustered_vectors(n_vectors)
+    assert choose_index_spec(n_vectors, DIM, quantization) == spec
+    index = build_index(vectors, quantization=quantization)
+    assert "please provide at least" not in capfd.readouterr().err   # trained on enough points
+
+    ids = np.random.default_rng(1).choice(n_vectors, 50, replace=False)
+    reconstructed = np.stack([index.reconstruct(int(i)) for i in ids])
+    errors = np.linalg.norm(reconstructed - vectors[ids], axis=1) / np.linalg.norm(vectors[ids], axis=1)
+    assert errors.max() <= max_error + 1e-6
+
+    exact = faiss.IndexFlatL2(DIM)
+    exact.add(vectors)
+    _, truth = exact.search(queries, 10)
+    _, found = index.search(queries, 10)
+    assert recall_at_k(found, truth) >= min_recall